@@ -27,6 +27,7 @@ import plotly.graph_objects as go
 import os
 
 from src.autoirrigate import AutoIrrigate
+from src.batch import BatchModel
 from src.irrigation import Irrigation
 from src.model import Model
 from src.parameters import Parameters
@@ -36,9 +37,7 @@ from src.update import Update
 from src.weather import Weather
 from src.custom.plots import WBPlot
 
-def run(base_dir, year, season, month_day, irrig):
-
-    output_dir = os.path.join(base_dir, str(year))
+def setup(year, season, month_day, irrig):
 
     # Specify the model parameters
     par = Parameters(comment = 'DSR Rice for CSSRI Karnal')
@@ -77,40 +76,44 @@ def run(base_dir, year, season, month_day, irrig):
     wth.lat = 29.707983
     wth.wndht = 2
 
-    # Import weather data from csv
-    weather_data = pd.read_csv("./data/CSSRI_daily_weather_ET0.csv")
-
-    # Convert the 'date' column to datetime and extract year and day of year
-    if 'DATE' in weather_data.columns:
-        weather_data['DATE'] = pd.to_datetime(weather_data['DATE'], format='%Y-%m-%d')
-        weather_data['YEAR'] = weather_data['DATE'].dt.year
-        weather_data['DOY'] = weather_data['DATE'].dt.strftime('%j')
-
-    # Create a list of required columns in the correct order
-    required_columns = ['Srad', 'Tmax', 'Tmin', 'Vapr', 'Tdew', 'RHmax', 'RHmin',
-                        'Wndsp', 'Rain', 'ETref', 'MorP']
-
-    # Create an empty DataFrame with all the required columns filled with NaN
-    wth.wdata = pd.DataFrame(columns=required_columns)
-
-    column_mapping = { 'SRAD': 'Srad', 
-                      'TMAX': 'Tmax', 
-                      'TMIN': 'Tmin', 
-                      'VAPR': 'Vapr', 
-                      'TDEW': 'Tdew', 
-                      'RHMAX': 'RHmax', 
-                      'RHMIN': 'RHmin', 
-                      'WNDSP': 'Wndsp', 
-                      'RAIN': 'Rain', 
-                      'ETREF': 'ETref', 
-                      'MORP': 'MorP' }
-
-    for csv_col, wdata_col in column_mapping.items():
-        if csv_col in weather_data.columns:
-            wth.wdata[wdata_col] = weather_data[csv_col]
-
-    wth.wdata['MorP'] = 'M'
-    wth.wdata.index = weather_data['YEAR'].astype(str) + '-' + weather_data['DOY']
+    # Import weather data from csv, or from its binary cache if the csv is
+    # unchanged since the cache was saved
+    weather_file = "./data/CSSRI_daily_weather_ET0.csv"
+    if not wth.loadcache(weather_file):
+        weather_data = pd.read_csv(weather_file)
+
+        # Convert the 'date' column to datetime and extract year and day of year
+        if 'DATE' in weather_data.columns:
+            weather_data['DATE'] = pd.to_datetime(weather_data['DATE'], format='%Y-%m-%d')
+            weather_data['YEAR'] = weather_data['DATE'].dt.year
+            weather_data['DOY'] = weather_data['DATE'].dt.strftime('%j')
+
+        # Create a list of required columns in the correct order
+        required_columns = ['Srad', 'Tmax', 'Tmin', 'Vapr', 'Tdew', 'RHmax', 'RHmin',
+                            'Wndsp', 'Rain', 'ETref', 'MorP']
+
+        # Create an empty DataFrame with all the required columns filled with NaN
+        wth.wdata = pd.DataFrame(columns=required_columns)
+
+        column_mapping = { 'SRAD': 'Srad', 
+                          'TMAX': 'Tmax', 
+                          'TMIN': 'Tmin', 
+                          'VAPR': 'Vapr', 
+                          'TDEW': 'Tdew', 
+                          'RHMAX': 'RHmax', 
+                          'RHMIN': 'RHmin', 
+                          'WNDSP': 'Wndsp', 
+                          'RAIN': 'Rain', 
+                          'ETREF': 'ETref', 
+                          'MORP': 'MorP' }
+
+        for csv_col, wdata_col in column_mapping.items():
+            if csv_col in weather_data.columns:
+                wth.wdata[wdata_col] = weather_data[csv_col]
+
+        wth.wdata['MorP'] = 'M'
+        wth.wdata.index = weather_data['YEAR'].astype(str) + '-' + weather_data['DOY']
+        wth.savecache(weather_file)
 
 
 # ------------------------------------------------------------------------------------- #
@@ -158,6 +161,14 @@ def run(base_dir, year, season, month_day, irrig):
                 fpact='cancel', # What to do if forcast sais rain
                 ieff=100)
 
+    return par, wth, airr, planting_date, planting_doy, harvest_doy
+
+def run(base_dir, year, season, month_day, irrig):
+
+    output_dir = os.path.join(base_dir, str(year))
+    par, wth, airr, planting_date, planting_doy, harvest_doy = \
+        setup(year, season, month_day, irrig)
+
 # ------------------------------------------------------------------------------------- #
 # Main Simulation
 # ------------------------------------------------------------------------------------- #
@@ -312,6 +323,54 @@ def run_simulations(base_dir, years_to_simulate, seasons, month_days, irrigation
     # Concatenate all collected DataFrames into one final DataFrame
     return pd.concat(all_summary_data, ignore_index=True)
 
+def run_simulations_batch(base_dir, years_to_simulate, seasons, month_days, irrigation_levels):
+    start_time = time.time()
+
+    # Set up all scenarios and advance them together in one BatchModel
+    scenarios = []
+    for year in years_to_simulate:
+        for season in seasons:
+            for month_day in month_days:
+                for irrigation_value in irrigation_levels:
+                    scenarios.append((year, season, month_day, irrigation_value) +
+                                     setup(year, season, month_day, irrigation_value))
+
+    # All scenarios read the same weather file
+    wth = scenarios[0][5]
+    bmdl = BatchModel([s[8] for s in scenarios], [s[9] for s in scenarios],
+                      [s[4] for s in scenarios], wth,
+                      autoirr=[s[6] for s in scenarios],
+                      ponded=True,
+                      aq_Ks=True,
+                      comment='DSR -- CSSRI, Karnal')
+    bmdl.run()
+
+    # Per-scenario output files, as written by run()
+    for k, s in enumerate(scenarios):
+        mdl = bmdl.getmodel(k)
+        mdl.savesums(os.path.join(base_dir,f'DSR.{s[0]}.CSSRI.sum'))
+        mdl.savefile(os.path.join(base_dir,f'DSR.{s[0]}.CSSRI.out'))
+
+    daily = bmdl.tolong()
+    daily['Scenario'] = [f'{scenarios[k][0]}-{scenarios[k][1]}-{scenarios[k][2]}-{scenarios[k][3]}'
+                         for k in daily['Scenario']]
+    daily.to_csv(os.path.join(base_dir, 'DSR_daily_SWB_CSSRI.csv'), index=False)
+
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    summary = bmdl.swbdata.round(3)
+    summary.insert(0, 'Irrig_Crit', [s[3] for s in scenarios])
+    summary.insert(0, 'Irrig_Crit_Source', ['madDs' if s[3] != 0 else 'mad' for s in scenarios])
+    summary.insert(0, 'Planting_Date', [s[7] for s in scenarios])
+    summary.insert(0, 'Season', [s[1] for s in scenarios])
+    summary.insert(0, 'Year', [s[0] for s in scenarios])
+    summary.insert(0, 'timestamp', timestamp)
+
+    elapsed_time = time.time() - start_time
+    minutes = int(elapsed_time // 60)
+    seconds = int(elapsed_time % 60)
+    print(f"[{minutes:02}:{seconds:02}] Simulations {len(scenarios)}/{len(scenarios)}")
+    return summary
+
 def main():
     # Setup directories and simulation parameters
     datestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
@@ -330,7 +389,7 @@ def main():
 
 
     # Run simulations and collect results
-    final_df = run_simulations(base_dir, years_to_simulate, seasons, month_days, irrigation_levels)
+    final_df = run_simulations_batch(base_dir, years_to_simulate, seasons, month_days, irrigation_levels)
 
     # Save the final DataFrame to CSV
     final_csv_path = os.path.join(base_dir, f'DSR_120-0.75-delayed_{datestamp}.csv')
@@ -30,7 +30,6 @@ import os
 from src.autoirrigate import AutoIrrigate
 from src.irrigation import Irrigation
 from src.model import Model
-from src.landprep import Landprep
 from src.parameters import Parameters
 from src.soil_profile import SoilProfile
 from src.tools.visualization import Visualization
@@ -121,42 +120,46 @@ def run(base_dir, year, season, month_day, irrig, wdpth):
     wth.lat = 29.707983
     wth.wndht = 2
 
-    # Import weather data from csv
-    weather_data = pd.read_csv("./data/CSSRI_daily_weather_ET0.csv")
-
-    # Convert the 'date' column to datetime and extract year and day of year
-    if 'DATE' in weather_data.columns:
-        weather_data['DATE'] = pd.to_datetime(weather_data['DATE'], format='%Y-%m-%d')
-        weather_data['YEAR'] = weather_data['DATE'].dt.year
-        weather_data['DOY'] = weather_data['DATE'].dt.strftime('%j')
-
-    # Create a list of required columns in the correct order
-    required_columns = ['Srad', 'Tmax', 'Tmin', 'Vapr', 'Tdew', 'RHmax', 'RHmin',
-                        'Wndsp', 'Rain', 'ETref', 'MorP']
-
-    # Create an empty DataFrame with all the required columns filled with NaN
-    wth.wdata = pd.DataFrame(columns=required_columns)
-
-    column_mapping = {
-        'SRAD': 'Srad',
-        'TMAX': 'Tmax',
-        'TMIN': 'Tmin',
-        'VAPR': 'Vapr',
-        'TDEW': 'Tdew',
-        'RHMAX': 'RHmax',
-        'RHMIN': 'RHmin',
-        'WNDSP': 'Wndsp',
-        'RAIN': 'Rain',
-        'ETREF': 'ETref',
-        'MORP': 'MorP'
-    }
-
-    for csv_col, wdata_col in column_mapping.items():
-        if csv_col in weather_data.columns:
-            wth.wdata[wdata_col] = weather_data[csv_col]
-
-    wth.wdata['MorP'] = 'M'
-    wth.wdata.index = weather_data['YEAR'].astype(str) + '-' + weather_data['DOY']
+    # Import weather data from csv, or from its binary cache if the csv is
+    # unchanged since the cache was saved
+    weather_file = "./data/CSSRI_daily_weather_ET0.csv"
+    if not wth.loadcache(weather_file):
+        weather_data = pd.read_csv(weather_file)
+
+        # Convert the 'date' column to datetime and extract year and day of year
+        if 'DATE' in weather_data.columns:
+            weather_data['DATE'] = pd.to_datetime(weather_data['DATE'], format='%Y-%m-%d')
+            weather_data['YEAR'] = weather_data['DATE'].dt.year
+            weather_data['DOY'] = weather_data['DATE'].dt.strftime('%j')
+
+        # Create a list of required columns in the correct order
+        required_columns = ['Srad', 'Tmax', 'Tmin', 'Vapr', 'Tdew', 'RHmax', 'RHmin',
+                            'Wndsp', 'Rain', 'ETref', 'MorP']
+
+        # Create an empty DataFrame with all the required columns filled with NaN
+        wth.wdata = pd.DataFrame(columns=required_columns)
+
+        column_mapping = {
+            'SRAD': 'Srad',
+            'TMAX': 'Tmax',
+            'TMIN': 'Tmin',
+            'VAPR': 'Vapr',
+            'TDEW': 'Tdew',
+            'RHMAX': 'RHmax',
+            'RHMIN': 'RHmin',
+            'WNDSP': 'Wndsp',
+            'RAIN': 'Rain',
+            'ETREF': 'ETref',
+            'MORP': 'MorP'
+        }
+
+        for csv_col, wdata_col in column_mapping.items():
+            if csv_col in weather_data.columns:
+                wth.wdata[wdata_col] = weather_data[csv_col]
+
+        wth.wdata['MorP'] = 'M'
+        wth.wdata.index = weather_data['YEAR'].astype(str) + '-' + weather_data['DOY']
+        wth.savecache(weather_file)
 
 
 # ------------------------------------------------------------------------------------- #
@@ -209,65 +212,40 @@ def run(base_dir, year, season, month_day, irrig, wdpth):
                 # icon=70,
                 ieff=100)
 
-# ------------------------------------------------------------------------------------- #
-# Landprep Simulation
-# ------------------------------------------------------------------------------------- #
-
-    ldp = Landprep(landprep_doy, transplanting_doy, par, wth)
-
-    ldp.run()
-
-    columns = ['Date','Year','DOY','DOW','Day','ETref',
-               'ETc','ETcadj','T','E','p','Ks','h','Zr',
-               'fc','tKcb','Kcb','Kcmax','Kc','Kcadj','Ke','Kr','fw',
-               'few','De','DPe','Irrig','IrrLoss','Rain',
-               'Runoff','DP','TAW','DAW','RAW','Veff','Vp',
-               'Vs','Vr','Ds','Dr','fDr', 'fDs', 'theta0','Se','K']
-
-    ldp_results = ldp.odata
-    ldp_df = pd.DataFrame(ldp_results, columns=columns)
-
-    # Update soil parameters after landprep
-    par.theta0 = ldp_df.iloc[-1]['theta0']
-    par.Wdpud = ldp_df.iloc[-1]['Vp']
-    par.Ksat = ldp_df.iloc[-1]['K']
-
-    ldp.savesums(os.path.join(base_dir,f'TPR.LDP.{year}.CSSRI.sum'))
-    ldp.savefile(os.path.join(base_dir,f'TPR.LDP.{year}.CSSRI.out'))
-
 # ------------------------------------------------------------------------------------- #
 # Main Simulation
 # ------------------------------------------------------------------------------------- #
 
-    #Run the model
-    mdl = Model(transplanting_doy, harvest_doy, par, wth, 
+    #Run land preparation and the crop season as one model run; the crop
+    #season starts from the final puddling state on the transplanting date
+    mdl = Model(landprep_doy, harvest_doy, par, wth, 
                 # irr=irr,
                 autoirr=airr, 
                 ponded=True, 
                 puddled=True,
                 cons_p=True,
                 # aq_Ks=True, 
+                landprep=True,
                 comment = '2018 TPR -- CSSRI, Karnal')
 
     mdl.run()
 
-    mdl.savesums(os.path.join(base_dir,f'TPR.MDL.{year}.CSSRI.sum'))
+    #Seasonal sums of each phase, as from the former Landprep and Model
+    #runs; the daily outputs cover both phases
+    mdl.savesums(os.path.join(base_dir,f'TPR.LDP.{year}.CSSRI.sum'),
+                 phase='landprep')
+    mdl.savesums(os.path.join(base_dir,f'TPR.MDL.{year}.CSSRI.sum'),
+                 phase='crop')
     mdl.savefile(os.path.join(base_dir,f'TPR.MDL.{year}.CSSRI.out'))
 
 # ------------------------------------------------------------------------------------- #
 # Combine Results
 # ------------------------------------------------------------------------------------- #
 
-    mdl_results = mdl.odata
-    mdl_df = pd.DataFrame(mdl_results, columns=columns)
-
-    # Align columns and combine results
-    ldp_df = ldp_df.reindex(columns=columns)  # Add missing columns, filled with NaN
-    mdl_df = mdl_df.reindex(columns=columns)  # Ensure the same column order
-
-    ldp_df['Day'] = range(-len(ldp_df), 0) # reverse the day count order
+    df = mdl.odata.reset_index(drop=True)
 
-    df = pd.concat([ldp_df, mdl_df], ignore_index=True)
+    # Count days from transplanting, negative during land preparation
+    df['Day'] = df['Day'].astype(int) - int(par.Lprp)
 
     required_columns = ['Day', 'Rain', 'Irrig', 'Runoff', 'DP', 'TAW', 'DAW', 'RAW', 'Dr', 'Ds', 'Vp']
 
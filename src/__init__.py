@@ -26,16 +26,24 @@ https://ascelibrary.org/doi/book/10.1061/9780784408056
 
 
 The pyfao56 package contains the following modules:
+    batch.py
+        Lock-step computations for many soil water balance scenarios
     irrigation.py
         I/O tools to define irrigation management schedules
+    kernel.py
+        Optional JIT-compiled daily timestep for model.py
     model.py 
         Equations for daily soil water balance computations
     parameters.py
         I/O tools for required input parameters
     refet.py
         Equations for computing ASCE Standardized Reference ET
+    sweep.py
+        Autoirrigation sweeps sharing common simulation days
     update.py
         I/O tools and methods for state variable updating
+    vangenuchten.py
+        Shared van Genuchten conductivity evaluator for ponded soils
     weather.py
         I/O tools for required weather information
 
@@ -45,9 +53,11 @@ The pyfao56 package contains the following modules:
 """
 
 from .autoirrigate import AutoIrrigate
+from .batch import BatchModel
 from .irrigation import Irrigation
 from .model import Model
 from .parameters import Parameters
 from .soil_profile import SoilProfile
+from .sweep import Sweep
 from .update import Update
 from .weather import Weather
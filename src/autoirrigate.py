@@ -11,11 +11,14 @@ The autoirrigate.py module contains the following:
 12/08/2023 Initial Python framework established for auto irrigation
 02/08/2024 Further development, ideas from Kendall DeJonge & Fared Farag
 02/14/2024 Finalized updates for inclusion in the pyfao56 Python package
+06/29/2025 Read the autoirrigation data block in one vectorized pass
 ########################################################################
 """
 
 import pandas as pd
 import datetime
+import math
+import io
 
 class AutoIrrigate:
     """A class for managing multiple sets of autoirrigation conditions
@@ -113,6 +116,9 @@ class AutoIrrigate:
         Add a set of autoirrigation parameters to self.aidata
     removeset(index)
         Remove a set of autoirrigation parameters from self.aidata
+    compile(start,lastirr=None)
+        Convert self.aidata to a list of typed RuleSet objects for
+        evaluation in the daily model loop
     customload()
         Override this function to customize loading of autoirrigation
         conditions
@@ -243,38 +249,27 @@ class AutoIrrigate:
                 ts = datetime.datetime.strptime(ts,'%m/%d/%Y %H:%M:%S')
                 self.tmstmp = ts
             self.aidata = pd.DataFrame(columns=self.cnames)
-            for i, line in enumerate(lines[endast+2:]):
-                line = line.strip().split()
-                data = list()
-                data.append(line[1])          #start
-                data.append(line[2])          #end
-                data.append(line[3]=='True')  #alre
-                data.append(line[4])          #idow
-                data.append(float(line[5]))   #fpdep
-                data.append(float(line[6]))   #fpday
-                data.append(line[7])          #fpact
-                data.append(float(line[8]))   #mad
-                data.append(float(line[9]))   #madDr
-                data.append(float(line[10]))   #madDs
-                data.append(float(line[11]))   #madVp
-                data.append(float(line[12]))   #wdpth
-                data.append(float(line[13]))  #ksc
-                data.append(float(line[14]))  #dsli
-                data.append(float(line[15]))  #dsle
-                data.append(float(line[16]))  #evnt
-                data.append(float(line[17]))  #icon
-                data.append(float(line[18]))  #itdr
-                data.append(float(line[19]))  #itfdr
-                data.append(float(line[20]))  #ietrd
-                data.append(line[21]=='True') #ietri
-                data.append(line[22]=='True') #ietre
-                data.append(line[23].strip()) #ettyp
-                data.append(float(line[24]))  #iper
-                data.append(float(line[25]))  #ieff
-                data.append(float(line[26]))  #imax
-                data.append(float(line[27]))  #imin
-                data.append(float(line[28]))  #fw
-                self.aidata.loc[i] = data
+            text = ''.join(lines[endast+2:])
+            if text.strip():
+                #Columns as named in the file header; columns missing
+                #from files of earlier versions are NaN. Text columns
+                #keep 'NaN' as written.
+                names = lines[endast+1].split()
+                strs = ['start','end','alre','idow','fpact','ietri',
+                        'ietre','ettyp']
+                floats = [cname for cname in names if cname not in strs]
+                dtypes = {cname: str if cname in strs else float
+                          for cname in names}
+                aidata = pd.read_csv(io.StringIO(text), sep=r'\s+',
+                                     header=None, dtype=dtypes,
+                                     names=['index'] + names,
+                                     keep_default_na=False,
+                                     na_values={cname: ['NaN','nan']
+                                                for cname in floats})
+                for cname in ['alre','ietri','ietre']:
+                    if cname in names:
+                        aidata[cname] = aidata[cname] == 'True'
+                self.aidata = aidata.reindex(columns=self.cnames)
 
     def addset(self,start,end,alre=True,idow='0123456',fpdep=25.,
                fpday=3,fpact='proceed',mad=float('NaN'),
@@ -364,6 +359,70 @@ class AutoIrrigate:
 
         self.aidata.drop(index)
 
+    class RuleSet:
+        """A compiled set of autoirrigation conditions.
+
+        Dates are converted to integer day offsets from the simulation
+        start, thresholds to float, and optional rate modifiers to
+        boolean flags. Missing (NaN) thresholds never fail a
+        comparison, so they do not restrict autoirrigation.
+        """
+
+        __slots__ = ('k','istart','iend','fpdep','fpday','fpact','mad',
+                     'madDr','madDs','madVp','wdpth','ksc','dsli','dsle',
+                     'evnt','icon','itdr','itfdr','useicon','useitdr',
+                     'useitfdr','fw')
+
+    def compile(self,start,lastirr=None):
+        """Compile aidata into RuleSet objects for the model loop.
+
+        Parameters
+        ----------
+        start : datetime
+            Simulation start date, i.e., day offset zero
+        lastirr : datetime, optional
+            Date of the last recorded irrigation event, used for the
+            alre condition (default = None)
+
+        Returns
+        -------
+        rules : list
+            A RuleSet for each row of self.aidata, in the same order
+        """
+
+        rules = []
+        for k, row in enumerate(self.aidata.itertuples(index=False)):
+            ai = self.RuleSet()
+            ai.k = k
+            aistart = datetime.datetime.strptime(row.start,'%Y-%j')
+            aiend = datetime.datetime.strptime(row.end,'%Y-%j')
+            ai.istart = (aistart - start).days
+            ai.iend = (aiend - start).days
+            #Autoirrigate only after the last recorded irrigation
+            if bool(row.alre) and lastirr is not None:
+                ai.istart = max(ai.istart, (lastirr - start).days + 1)
+            ai.fpdep = float(row.fpdep)
+            ai.fpday = int(row.fpday)
+            ai.fpact = str(row.fpact)
+            ai.mad = float(row.mad)
+            ai.madDr = float(row.madDr)
+            ai.madDs = float(row.madDs)
+            ai.madVp = float(row.madVp)
+            ai.wdpth = float(row.wdpth)
+            ai.ksc = float(row.ksc)
+            ai.dsli = float(row.dsli)
+            ai.dsle = float(row.dsle)
+            ai.evnt = float(row.evnt)
+            ai.icon = float(row.icon)
+            ai.itdr = float(row.itdr)
+            ai.itfdr = float(row.itfdr)
+            ai.useicon = not math.isnan(ai.icon)
+            ai.useitdr = not math.isnan(ai.itdr)
+            ai.useitfdr = not math.isnan(ai.itfdr)
+            ai.fw = float(row.fw)
+            rules.append(ai)
+        return rules
+
     def customload(self):
         """Override function to customize loading autoirrigate data."""
 
@@ -0,0 +1,758 @@
+"""
+########################################################################
+The batch.py module contains the BatchModel class, which advances many
+FAO-56 soil water balance scenarios in lock-step using NumPy arrays.
+
+The batch.py module contains the following:
+    BatchModel - A class for running the daily computations of Model
+                 for N scenarios at once
+
+Each scenario is one lane of the state arrays, and the branches of
+Model._advance (ponded, puddled, runoff, aq_Ks, etc.) are evaluated
+for all lanes with boolean masks. Scenarios are aligned by day of the
+simulation, so start and end dates may differ among scenarios.
+
+06/18/2025 Initial batch engine for multi-scenario simulations
+########################################################################
+"""
+
+import pandas as pd
+import numpy as np
+import datetime
+from .model import Model
+from . import vangenuchten
+
+class BatchModel:
+    """A class for running N FAO-56 scenarios in lock-step.
+
+    Arguments given as a sequence must provide one item per scenario;
+    any other argument is shared by all scenarios.
+
+    Attributes
+    ----------
+    startDates : list
+        Simulation start date of each scenario (datetime)
+    endDates : list
+        Simulation end date of each scenario (datetime)
+    pars : list
+        Parameters object of each scenario
+    wth : Weather object
+        Weather data shared by all scenarios
+    irrs : list
+        Irrigation object (or None) of each scenario
+    autoirrs : list
+        AutoIrrigate object (or None) of each scenario
+    upds : list
+        Update object (or None) of each scenario
+    ponded, puddled, roff, cons_p, aq_Ks : ndarray
+        Boolean model options of each scenario, see Model
+    nscen : int
+        Number of scenarios (N)
+    ndays : ndarray
+        Number of simulated days of each scenario
+    cnames : list
+        Column names of the numeric daily outputs (as in Model.odata)
+    ovals : ndarray
+        Daily outputs with shape (N, max(ndays), len(cnames)); days
+        after the end of a scenario are NaN
+    swbdata : DataFrame
+        Seasonal water balance data, one row per scenario (see
+        Model.swbdata)
+
+    Methods
+    -------
+    run()
+        Conduct the simulations and update self.ovals and self.swbdata
+    getodata(k)
+        Return the daily outputs of scenario k as in Model.odata
+    getmodel(k)
+        Return a Model holding the outputs of scenario k, to save them
+        with the Model output methods
+    tolong()
+        Return the daily outputs of all scenarios as a long-format
+        DataFrame
+    """
+
+    def __init__(self, start, end, par, wth, irr=None, autoirr=None,
+                 upd=None, ponded=False, puddled=False, roff=False,
+                 cons_p=False, aq_Ks=False, comment=''):
+        """Initialize the BatchModel class attributes.
+
+        Parameters
+        ----------
+        start : str or sequence of str
+            Simulation start year and doy ('yyyy-ddd')
+        end : str or sequence of str
+            Simulation end year and doy ('yyyy-ddd')
+        par : Parameters object or sequence
+            Parameter data
+        wth : Weather object
+            Weather data
+        irr : Irrigation object or sequence, optional
+            Irrigation data (default = None)
+        autoirr : AutoIrrigate object or sequence, optional
+            Autoirrigation conditions (default = None)
+        upd : Update object or sequence, optional
+            State variable updates (default = None)
+        ponded, puddled, roff, cons_p, aq_Ks : bool or sequence
+            Model options, see Model (default = False)
+        comment : str, optional
+            User-defined file descriptions or metadata (default = '')
+        """
+
+        args = [start, end, par, irr, autoirr, upd, ponded, puddled,
+                roff, cons_p, aq_Ks]
+        sizes = set(len(a) for a in args if isinstance(a,(list,tuple)))
+        if len(sizes) > 1:
+            raise ValueError('Scenario sequences differ in length.')
+        self.nscen = sizes.pop() if sizes else 1
+
+        def lanes(a):
+            if isinstance(a,(list,tuple)):
+                return list(a)
+            return [a] * self.nscen
+
+        self.startDates = [datetime.datetime.strptime(s, '%Y-%j')
+                           for s in lanes(start)]
+        self.endDates = [datetime.datetime.strptime(e, '%Y-%j')
+                         for e in lanes(end)]
+        self.pars = lanes(par)
+        self.wth = wth
+        self.irrs = lanes(irr)
+        self.autoirrs = lanes(autoirr)
+        self.upds = lanes(upd)
+        self.ponded = np.array(lanes(ponded), dtype=bool)
+        self.puddled = np.array(lanes(puddled), dtype=bool)
+        self.roff = np.array(lanes(roff), dtype=bool)
+        self.cons_p = np.array(lanes(cons_p), dtype=bool)
+        self.aq_Ks = np.array(lanes(aq_Ks), dtype=bool)
+        self.ndays = np.array([max((e - s).days + 1, 0) for s, e in
+                               zip(self.startDates, self.endDates)])
+        self.comment = 'Comments: ' + comment.strip()
+        self.tmstmp = datetime.datetime.now()
+        self.cnames = ['ETref','ETc','ETcadj','T','E','p','Ks','h','Zr',
+                       'fc','tKcb','Kcb','Kcmax','Kc','Kcadj','Ke','Kr',
+                       'fw','few','De','DPe','Irrig','IrrLoss','Rain',
+                       'Runoff','DP','TAW','DAW','RAW','Veff','Vp','Vs',
+                       'Vr','Ds','Dr','fDr','fDs','theta0','Se','K']
+        self.ovals = np.empty((self.nscen, 0, len(self.cnames)))
+        self.swbdata = pd.DataFrame()
+
+    def _rules(self):
+        """Compile the autoirrigation conditions of all scenarios.
+
+        Returns
+        -------
+        rules : dict
+            Arrays with shape (N, K) for each RuleSet field, where K is
+            the largest number of sets of any scenario. Missing sets
+            are padded and flagged False in rules['valid'].
+        """
+
+        compiled = []
+        for k in range(self.nscen):
+            autoirr = self.autoirrs[k]
+            if autoirr is None:
+                compiled.append([])
+                continue
+            lastirr = None
+            irr = self.irrs[k]
+            if irr is not None and not irr.idata.empty:
+                lastirr = irr.getlastdate()
+            compiled.append(autoirr.compile(self.startDates[k], lastirr))
+        nset = max([len(c) for c in compiled] + [0])
+        fields = ['istart','iend','fpdep','fpday','mad','madDr','madDs',
+                  'madVp','wdpth','ksc','dsli','dsle','evnt','icon',
+                  'itdr','itfdr','fw']
+        rules = {name: np.full((self.nscen, nset), np.nan)
+                 for name in fields}
+        for name in ['valid','useicon','useitdr','useitfdr']:
+            rules[name] = np.zeros((self.nscen, nset), dtype=bool)
+        #Forecast action: 0 - proceed, 1 - reduce, 2 - cancel or other
+        rules['fpact'] = np.zeros((self.nscen, nset), dtype=int)
+        for k, airules in enumerate(compiled):
+            for ai in airules:
+                for name in fields:
+                    rules[name][k,ai.k] = getattr(ai, name)
+                rules['valid'][k,ai.k] = True
+                rules['useicon'][k,ai.k] = ai.useicon
+                rules['useitdr'][k,ai.k] = ai.useitdr
+                rules['useitfdr'][k,ai.k] = ai.useitfdr
+                if ai.fpact == 'reduce':
+                    rules['fpact'][k,ai.k] = 1
+                elif ai.fpact != 'proceed':
+                    rules['fpact'][k,ai.k] = 2
+        rules['fpday'] = np.where(rules['valid'], rules['fpday'], 1)
+        rules['fpday'] = rules['fpday'].astype(int)
+        return rules
+
+    def _inputs(self, rules):
+        """Collect the daily inputs of all scenarios as arrays.
+
+        Weather, irrigation, and update data are read once for the span
+        of dates covering all scenarios and then gathered for each
+        scenario by day offset.
+
+        Parameters
+        ----------
+        rules : dict
+            Compiled autoirrigation conditions from self._rules(); the
+            forecasted precipitation is added as rules['fcrain'] with
+            shape (max(ndays), N, K)
+
+        Returns
+        -------
+        inp : dict
+            Float arrays with shape (max(ndays), N) for each daily
+            input, with NaN after the end of a scenario
+
+        Raises
+        ------
+        KeyError
+            If a simulated day is missing from the weather data.
+        ValueError
+            If reference ET is missing for a simulated day and cannot
+            be computed from the weather data.
+        """
+
+        nmax = int(self.ndays.max()) if self.nscen > 0 else 0
+        names = ['ETref','Rain','Wndsp','RHmin','Depth','fw','ieff',
+                 'Kcb','h','fc']
+        inp = {name: np.full((nmax, self.nscen), np.nan)
+               for name in names}
+        rules['fcrain'] = np.zeros((nmax,) + rules['valid'].shape)
+        lanes = np.flatnonzero(self.ndays > 0)
+        if lanes.size == 0:
+            return inp
+
+        #Dates spanning all scenarios, plus the longest forecast
+        first = min(self.startDates[k] for k in lanes)
+        last = max(self.endDates[k] for k in lanes)
+        nspan = (last - first).days + 1
+        pad = int(rules['fpday'].max(initial=1)) - 1
+        span = pd.date_range(first, periods=nspan+pad,
+                             freq='D').strftime('%Y-%j')
+        avail = span.isin(self.wth.wdata.index)
+        wdata = self.wth.wdata.reindex(span)
+        wspan = {cname: wdata[cname].to_numpy(dtype=float)
+                 for cname in self.wth.cnames if cname != 'MorP'}
+
+        #Index of each scenario day in the span
+        offsets = np.array([(s - first).days for s in self.startDates])
+        days = np.arange(nmax)[:,None]
+        active = days < self.ndays[None,:]
+        idx = np.where(active, offsets[None,:] + days, 0)
+        missing = active & ~avail[idx]
+        if missing.any():
+            raise KeyError(span[idx[missing][0]])
+
+        #Reference ET with missing values computed; fill_etref() checks
+        #its cached values against the current wdata
+        etref = self.wth.fill_etref().reindex(span).to_numpy()
+        missing = active & np.isnan(etref[idx])
+        if missing.any():
+            raise ValueError('Reference ET is missing for ' +
+                             span[idx[missing][0]] + '.')
+        wndsp = np.where(np.isnan(wspan['Wndsp']), 2.0, wspan['Wndsp'])
+        #Calculate RHmin from dewpoint temperature where missing
+        tmax = wspan['Tmax']
+        tdew = np.where(np.isnan(wspan['Tdew']), wspan['Tmin'],
+                        wspan['Tdew'])
+        #ASCE (2005) Eqs. 7 and 8
+        emax = 0.6108*np.exp((17.27*tmax)/(tmax+237.3))
+        ea   = 0.6108*np.exp((17.27*tdew)/(tdew+237.3))
+        rhmin = np.where(np.isnan(wspan['RHmin']), ea/emax*100.,
+                         wspan['RHmin'])
+        rhmin = np.where(np.isnan(rhmin), 45., rhmin)
+
+        def gather(values, fill=np.nan):
+            return np.where(active, values[idx], fill)
+
+        inp['ETref'] = gather(etref)
+        inp['Rain'] = gather(wspan['Rain'])
+        inp['Wndsp'] = gather(wndsp)
+        inp['RHmin'] = gather(rhmin)
+
+        #Scheduled irrigation events and state variable updates
+        inp['Depth'] = gather(np.zeros(len(span)))
+        inp['ieff'] = gather(np.full(len(span), 100.))
+        spans = {}
+        for k in lanes:
+            for obj, attr, cols in [(self.irrs[k], 'idata',
+                                     ['Depth','fw','ieff']),
+                                    (self.upds[k], 'udata',
+                                     ['Kcb','h','fc'])]:
+                if obj is None or getattr(obj, attr).empty:
+                    continue
+                if id(obj) not in spans:
+                    data = getattr(obj, attr)
+                    spans[id(obj)] = {c: data[c].reindex(span)
+                                      .to_numpy(dtype=float)
+                                      for c in cols}
+                    #Days with a row in the data; a NaN update value
+                    #leaves its variable as computed
+                    spans[id(obj)]['row'] = span.isin(data.index)
+                event = spans[id(obj)]['row'][idx[:,k]] & active[:,k]
+                for c in cols:
+                    inp[c][:,k] = np.where(event,
+                                           spans[id(obj)][c][idx[:,k]],
+                                           inp[c][:,k])
+
+        #Forecasted precipitation, as in Weather.getfcrain
+        rain = np.where(avail, wspan['Rain'], 0.0)
+        rain = np.concatenate([rain, np.zeros(pad)])
+        fpdays = np.unique(rules['fpday'])
+        fcspan = np.zeros((fpdays.size, len(span)))
+        for f, fpday in enumerate(fpdays):
+            for j in range(fpday):
+                fcspan[f] += rain[j:j+len(span)]
+        fpidx = np.searchsorted(fpdays, rules['fpday'])
+        rules['fcrain'] = fcspan[fpidx[None,:,:], idx[:,:,None]]
+        return inp
+
+    def run(self):
+        """Initialize models, conduct simulations, update self.ovals"""
+
+        def lane(name):
+            return np.array([getattr(p, name) for p in self.pars],
+                            dtype=float)
+
+        #Initialize model state, one lane per scenario
+        io = Model.ModelState()
+        io.i = 0
+        for name in ['Kcbini','Kcbmid','Kcbend','Lini','Ldev','Lmid',
+                     'Lend','hini','hmax','thetaFC','thetaWP','theta0',
+                     'thetaS','thetaR','Wdpud','Ksat','Zrini','Zrmax',
+                     'pbase','Ze','REW','CN2']:
+            setattr(io, name, lane(name))
+        io.Bundh = lane('Bundh') * 1000
+        ponded = self.ponded
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            #Total evaporable water (TEW, mm) - FAO-56 Eq. 73
+            io.TEW = 1000. * (io.thetaFC - 0.50 * io.thetaWP) * io.Ze
+            #Initial depth of evaporation (De, mm) - FAO-56 page 153
+            io.De = 1000. * (io.thetaFC - 0.50 * io.thetaWP) * io.Ze
+            #Initial root zone depletion (Dr, mm) - FAO-56 Eq. 87
+            io.Dr = 1000. * (io.thetaFC - io.theta0) * io.Zrini
+            #Initial root zone residual available water (TAW, mm)
+            io.TAW = 1000. * (io.thetaFC - io.thetaWP) * io.Zrini
+            io.l = 0.50
+            io.n = 1.3055
+            io.m = 1 - 1/io.n
+            io.Se = np.clip((io.theta0 - io.thetaR) /
+                            (io.thetaS - io.thetaR), 0, 1)
+            self._kfunc = vangenuchten.Conductivity.get(io.n, io.l)
+            io.K = self._kfunc(io.Se, io.Ksat)
+            io.Veff = 1000 * (io.theta0 - io.thetaWP) * io.Zrini
+
+            #Initial rice settings for ponded lanes
+            DAW = 1000. * (io.thetaS - io.thetaFC) * io.Zrini
+            Vp = np.clip(io.Veff - DAW - io.TAW, 0.0, io.Bundh)
+            Vs = np.clip(io.Veff - Vp - io.TAW, 0.0, DAW)
+            Vr = np.clip(io.Veff - Vp - Vs, 0.0, io.TAW)
+            Ds = np.clip(DAW - Vs, 0.0, DAW)
+            io.DAW = np.where(ponded, DAW, 0.0)
+            io.Vp = np.where(ponded, Vp, 0.0)
+            io.Vs = np.where(ponded, Vs, 0.0)
+            io.Vr = np.where(ponded, Vr, 0.0)
+            io.Ds = np.where(ponded, Ds, 0.0)
+            io.Dr = np.where(ponded, np.clip(io.TAW - Vr, 0.0, DAW),
+                             io.Dr)
+            io.DP = np.where(ponded, np.clip(Vs + Vp, 0.0, io.K), 0.0)
+            io.fDs = np.where(ponded, 1.0 - ((DAW - Ds) / DAW), 0.0)
+
+            #Initial root zone soil water depletion fraction (fDr)
+            io.fDr = 1.0 - ((io.TAW - io.Dr) / io.TAW)
+        io.Ks = np.ones(self.nscen)
+        io.h = io.hini.copy()
+        io.Zr = io.Zrini.copy()
+        io.fc = np.zeros(self.nscen)
+        io.fw = np.ones(self.nscen)
+        io.wndht = self.wth.wndht
+        io.rfcrp = self.wth.rfcrp
+
+        #Compile autoirrigation conditions and collect daily inputs
+        rules = self._rules()
+        inp = self._inputs(rules)
+        io.ilast = np.full(self.nscen, -1)
+        io.evnt = rules['evnt']
+        io.elast = np.full(io.evnt.shape, -1)
+
+        nmax = inp['ETref'].shape[0]
+
+        #Precompute the seasonal crop development curves of each lane
+        crop = {name: np.full((nmax, self.nscen), np.nan)
+                for name in ['tKcb','Kcb','h','Zr']}
+        for k in np.flatnonzero(self.ndays > 0):
+            nk = int(self.ndays[k])
+            lio = Model.ModelState()
+            for name in ['Kcbini','Kcbmid','Kcbend','Lini','Ldev','Lmid',
+                         'Lend','hini','hmax','Zrini','Zrmax']:
+                setattr(lio, name, float(getattr(io, name)[k]))
+            lio.wndht = io.wndht
+            curves = Model._cropcurves(lio, inp['Wndsp'][:nk,k],
+                                       inp['RHmin'][:nk,k],
+                                       inp['Kcb'][:nk,k], inp['h'][:nk,k],
+                                       self.puddled[k])
+            for name in crop:
+                crop[name][:nk,k] = curves[name]
+        ovals = np.full((nmax, len(self.cnames), self.nscen), np.nan)
+        active = np.arange(nmax)[:,None] < self.ndays[None,:]
+        ieff = np.full(self.nscen, 100.)
+
+        with np.errstate(divide='ignore', invalid='ignore',
+                         over='ignore'):
+            while io.i < nmax:
+                #Update ModelState arrays
+                io.ETref = inp['ETref'][io.i]
+                io.rain = inp['Rain'][io.i]
+                io.wndsp = inp['Wndsp'][io.i]
+                io.rhmin = inp['RHmin'][io.i]
+                io.idep = inp['Depth'][io.i]
+                io.fw = np.where(np.isnan(inp['fw'][io.i]), io.fw,
+                                 inp['fw'][io.i])
+                io.ieff = inp['ieff'][io.i]
+                self._autoirrigate(io, rules)
+                io.tKcb = crop['tKcb'][io.i]
+                io.Kcb = crop['Kcb'][io.i]
+                io.h = crop['h'][io.i]
+                io.Zr = crop['Zr'][io.i]
+                io.updfc = inp['fc'][io.i]
+
+                #Advance timestep
+                self._advance(io)
+
+                ovals[io.i] = [
+                    io.ETref, io.ETc, io.ETcadj, io.T, io.E,
+                    io.p, io.Ks, io.h, io.Zr, io.fc,
+                    io.tKcb, io.Kcb, io.Kcmax, io.Kc, io.Kcadj, io.Ke,
+                    io.Kr, io.fw, io.few, io.De, io.DPe,
+                    io.idep, io.irrloss, io.rain, io.runoff,
+                    io.DP, io.TAW, io.DAW, io.RAW, io.Veff, io.Vp,
+                    io.Vs, io.Vr, io.Ds, io.Dr, io.fDr, io.fDs,
+                    io.theta0, io.Se, io.K]
+                ieff = np.where(active[io.i], io.ieff, ieff)
+                io.i += 1
+
+        self.ovals = np.ascontiguousarray(ovals.transpose(2, 0, 1))
+        self.ovals[~active.T] = np.nan
+
+        #Save seasonal water balance data to self.swbdata
+        col = {name: self.ovals[:,:,j]
+               for j, name in enumerate(self.cnames)}
+        last = np.maximum(self.ndays - 1, 0)
+        lanes = np.arange(self.nscen)
+        irrig = np.nan_to_num(col['Irrig'])
+        nirr = (irrig > 0).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.swbdata = pd.DataFrame({
+                'ETref': np.nansum(col['ETref'], axis=1),
+                'ETc': np.nansum(col['ETc'], axis=1),
+                'ETcadj': np.nansum(col['ETcadj'], axis=1),
+                'E': np.nansum(col['E'], axis=1),
+                'T': np.nansum(col['T'], axis=1),
+                'DP': np.nansum(col['DP'], axis=1),
+                'K': np.nanmean(col['K'], axis=1),
+                'Rain': np.nansum(col['Rain'], axis=1),
+                'Runoff': np.nansum(col['Runoff'], axis=1),
+                'Irrig': irrig.sum(axis=1),
+                'IrrLoss': (irrig * ((100 - ieff)/100)[:,None]).sum(axis=1),
+                'Gross_Irrig': (irrig + irrig * 0.3).sum(axis=1),
+                'Num_Irrig': nirr,
+                'Mean_Irrig': np.where(nirr > 0, irrig.sum(axis=1)/nirr,
+                                       np.nan),
+                'Veff_ini': 1000 * (lane('theta0') - io.thetaWP) *
+                            io.Zrini,
+                'Veff_end': col['Veff'][lanes,last],
+                'theta0': col['theta0'][lanes,last],
+            })
+
+    def _autoirrigate(self, io, rules):
+        """Evaluate autoirrigation conditions for all scenarios.
+
+        For each scenario, the first set of conditions that is met sets
+        the autoirrigation depth (io.idep) and fraction wetted (io.fw),
+        in the same manner as Model.run.
+        """
+
+        if rules['valid'].shape[1] == 0:
+            return
+        i = io.i
+        fcrain = rules['fcrain'][i]
+        hit = fcrain >= rules['fpdep']
+        reduceirr = np.where(hit & (rules['fpact'] == 1), fcrain, 0.)
+        ok = rules['valid'] & (i >= rules['istart']) & \
+            (i <= rules['iend']) & ~(hit & (rules['fpact'] == 2))
+        #Evaluate management allowed depletion and critical Ks
+        ok &= ~(io.fDs[:,None] <= rules['madDs'])
+        ok &= ~(io.fDr[:,None] <= rules['mad'])
+        ok &= ~(io.Dr[:,None] >= rules['madDr'])
+        ok &= ~(io.Vp[:,None] >= rules['madVp'])
+        ok &= ~(io.Ks[:,None] >= rules['ksc'])
+        #Evaluate days since last irrigation and watering event
+        ok &= ~(i - io.ilast[:,None] < rules['dsli'])
+        ok &= ~(i - io.elast < rules['dsle'])
+
+        #Default rate refills Dr and Ds plus the water depth
+        rate = (io.Dr + io.Ds)[:,None] + rules['wdpth'] - reduceirr
+        rate = np.where(rate > 0.0, rate, 0.0)
+        #Use a constant rate
+        icon = rules['icon'] - reduceirr
+        rate = np.where(rules['useicon'], np.where(icon > 0.0, icon, 0.0),
+                        rate)
+        #Target a specific root-zone soil water depletion
+        itdr = io.Dr[:,None] - reduceirr - rules['itdr']
+        rate = np.where(rules['useitdr'], np.where(itdr > 0.0, itdr, 0.0),
+                        rate)
+        #Target a fractional root-zone soil water depletion
+        itdr2 = io.TAW[:,None] - io.TAW[:,None]*(1.0 - rules['itfdr'])
+        itfdr = io.Dr[:,None] - reduceirr - itdr2
+        rate = np.where(rules['useitfdr'],
+                        np.where(itfdr > 0.0, itfdr, 0.0), rate)
+
+        #Apply the first set of conditions that is met
+        fire = ok.any(axis=1)
+        first = ok.argmax(axis=1)
+        lanes = np.arange(ok.shape[0])
+        io.fw = np.where(fire, rules['fw'][lanes,first], io.fw)
+        io.idep = np.where(fire, rate[lanes,first], io.idep)
+
+    def _advance(self, io):
+        """Advance all scenarios by one daily timestep.
+
+        The computations follow Model._advance, with boolean masks in
+        place of the per-scenario branches.
+        """
+
+        ponded = self.ponded
+        i = io.i
+
+        #Wind speed and minimum relative humidity for Kcmax
+        #From FAO-56 Tables 11 and 17
+        u2 = io.wndsp * (4.87/np.log(67.8*io.wndht-5.42))
+        u2 = np.clip(u2, 1.0, 6.0)
+        rhmin = np.clip(io.rhmin, 20.0, 80.0)
+
+        #Upper limit crop coefficient (Kcmax) - FAO-56 Eq. 72
+        if io.rfcrp == 'S':
+            io.Kcmax = np.maximum(1.2+(0.04*(u2-2.0)-0.004*(rhmin-45.0))*
+                                  (io.h/3.0)**.3, io.Kcb+0.05)
+        elif io.rfcrp == 'T':
+            io.Kcmax = np.maximum(1.0, io.Kcb + 0.05)
+
+        #Canopy cover fraction (fc, 0.0-0.99) - FAO-56 Eq. 76
+        fc = np.clip(((io.Kcb - io.Kcbini) / (io.Kcmax - io.Kcbini))**
+                     (1.0 + 0.5 * io.h), 0.0, 0.99)
+        io.fc = np.where(fc >= io.fc, fc, io.fc)
+        #Overwrite fc if updates are available
+        io.fc = np.where(io.updfc > 0, io.updfc, io.fc)
+
+        #Losses due to irrigation inefficiency (irrloss, mm)
+        io.irrloss = io.idep * (1 - io.ieff / 100.)
+
+        #Method per ASCE (2016) Eqs. 14-12 to 14-20, page 451-454
+        CN1 = io.CN2/(2.281-0.01281*io.CN2) #ASCE (2016) Eq. 14-14
+        CN3 = io.CN2/(0.427+0.00573*io.CN2) #ASCE (2016) Eq. 14-15
+        CN = (io.De-0.5*io.REW)*CN1
+        CN = CN+(0.7*io.REW+0.3*io.TEW-io.De)*CN3
+        CN = CN/(0.2*io.REW+0.3*io.TEW) #ASCE (2016) Eq. 14-20
+        CN = np.where(io.De >= 0.7*io.REW+0.3*io.TEW, CN1, CN) #Eq. 14-19
+        CN = np.where(io.De <= 0.5*io.REW, CN3, CN) #ASCE (2016) Eq. 14-18
+        storage = 250.*((100./CN)-1.) #ASCE (2016) Eq. 14-12
+        #ASCE (2016) Eq. 14-13
+        runoff = (io.rain-0.2*storage)**2/(io.rain+0.8*storage)
+        runoff = np.minimum(runoff, io.rain)
+        io.runoff = np.where(self.roff & (io.rain > 0.2*storage), runoff,
+                             0.0)
+
+        #Effective irrigation (mm)
+        effirr = io.idep - io.irrloss
+        effirr = np.where(effirr > 0, effirr, 0.0)
+
+        #Track the day of the last irrigation and watering events
+        io.ilast = np.where(io.idep > 0., i, io.ilast)
+        wevnt = io.idep - io.irrloss + io.rain - io.runoff
+        io.elast = np.where(wevnt[:,None] >= io.evnt, i, io.elast)
+
+        #Effective precipitation (mm)
+        effrain = io.rain - io.runoff
+        effrain = np.where(effrain > 0, effrain, 0.0)
+
+        #Fraction soil surface wetted (fw) - FAO-56 Table 20, page 149
+        io.fw = np.where((io.idep <= 0.0) & (io.rain >= 3.0), 1.0, io.fw)
+
+        #Exposed & wetted soil fraction (few, 0.01-1.0) - FAO-56 Eq. 75
+        io.few = np.clip(np.minimum(1.0-io.fc, io.fw), 0.01, 1.0)
+
+        #Evaporation reduction coefficient (Kr, 0-1) - FAO-56 Eq. 74
+        io.Kr = np.where(io.Vs == 0.0,
+                         np.clip((io.TEW-io.De)/(io.TEW-io.REW), 0.0, 1.0),
+                         1.0)
+
+        #Evaporation coefficient (Ke) - FAO-56 Eq. 71
+        io.Ke = np.minimum(io.Kr*(io.Kcmax-io.Kcb), io.few*io.Kcmax)
+
+        #Soil water evaporation (E, mm) - FAO-56 Eq. 69
+        io.E = io.Ke * io.ETref
+
+        #Deep percolation under exposed soil (DPe, mm) - FAO-56 Eq. 79
+        DPe = effrain + effirr/io.fw - io.De
+        io.DPe = np.clip(DPe, 0.0, io.K)
+
+        #Cumulative depth of evaporation (De, mm) - FAO-56 Eqs. 77 & 78
+        De = io.De - effrain - effirr/io.fw + io.E/io.few + io.DPe
+        io.De = np.clip(De, 0.0, io.TEW)
+
+        #Crop coefficient (Kc) - FAO-56 Eq. 69
+        io.Kc = io.Ke + io.Kcb
+
+        #Non-stressed crop evapotranspiration (ETc, mm) - FAO-56 Eq. 69
+        io.ETc = io.Kc * io.ETref
+
+        #Total available water (TAW, mm) - FAO-56 Eq. 82
+        io.TAW = 1000.0 * (io.thetaFC - io.thetaWP) * io.Zr
+
+        #Root zone drainable available water (DAW, mm)
+        io.DAW = np.where(ponded,
+                          1000. * (io.thetaS - io.thetaFC) * io.Zr,
+                          io.DAW)
+
+        #Fraction depleted TAW (p, 0.1-0.8) - FAO-56 p162 and Table 22
+        io.p = np.where(self.cons_p, io.pbase,
+                        np.clip(io.pbase+0.04*(5.0-io.ETc), 0.1, 0.8))
+
+        #Readily available water (RAW, mm) - FAO-56 Equation 83
+        io.RAW = np.where(ponded, io.p * io.thetaS * 1000 * io.Zr,
+                          io.p * io.TAW)
+        SAW = io.DAW + io.TAW
+        Dtot = io.Dr + io.Ds
+
+        #Transpiration reduction factor (Ks, 0.0-1.0)
+        sf = 1.5
+        #Ks method from AquaCrop, ponded lanes
+        Drel = 1.0 - (SAW - Dtot) / (SAW - io.RAW)
+        aqKsp = 1.0-(np.exp(sf*Drel)-1.0)/(np.exp(sf)-1.0)
+        #Ks method from AquaCrop
+        Drel = (io.Dr / io.TAW - io.p)/(1.0 - io.p)
+        aqKs = 1.0-(np.exp(sf*Drel)-1.0)/(np.exp(sf)-1.0)
+        #FAO-56 Eq. 84
+        Ksp = (SAW - Dtot)/(SAW - io.RAW)
+        Ks = (io.TAW-io.Dr)/(io.TAW-io.RAW)
+        Ks = np.select([self.aq_Ks & ponded, self.aq_Ks, ponded],
+                       [aqKsp, aqKs, Ksp], Ks)
+        io.Ks = np.clip(Ks, 0.0, 1.0)
+
+        #Adjusted crop coefficient (Kcadj) - FAO-56 Eq. 80
+        io.Kcadj = io.Ks * io.Kcb + io.Ke
+
+        #Adjusted crop evapotranspiration (ETcadj, mm) - FAO-56 Eq. 80
+        io.ETcadj = io.Kcadj * io.ETref
+
+        #Adjusted crop transpiration (T, mm)
+        io.T = (io.Ks * io.Kcb) * io.ETref
+
+        #Total soil moisture in puddle (Veff, mm)
+        io.Veff = np.maximum(io.Veff + effrain + effirr - io.ETcadj -
+                             io.DP, 0.0)
+
+        #Modify Ksat based on vanGenuchten and previous theta0
+        io.theta0 = io.Veff/(1000*io.Zr) + io.thetaWP
+        io.Se = np.clip((io.theta0 - io.thetaR) /
+                        (io.thetaS - io.thetaR), 0, 1)
+        io.K = self._kfunc(io.Se, io.Ksat)
+
+        #Water balance for ponded lanes
+        Vp = np.clip(io.Veff - io.DAW - io.TAW, 0.0, io.Bundh)
+        Vs = np.clip(io.Veff - Vp - io.TAW, 0.0, io.DAW)
+        Vr = np.clip(io.Veff - Vp - Vs, 0.0, io.TAW)
+        DPp = np.clip(Vs, 0.0, io.K)
+        Ds = np.maximum(0.0, io.DAW - Vs)
+        Drp = np.maximum(0.0, io.TAW - Vr)
+
+        #Deep percolation (DP, mm) - FAO-56 Eq. 88
+        DP = np.maximum(effrain + effirr - io.ETcadj - io.Dr, 0.0)
+        #Root zone soil water depletion (Dr,mm) - FAO-56 Eqs.85 & 86
+        Dr = np.clip(io.Dr - effrain - effirr + io.ETcadj + DP, 0.0,
+                     io.TAW)
+
+        io.Vp = np.where(ponded, Vp, io.Vp)
+        io.Vs = np.where(ponded, Vs, io.Vs)
+        io.Vr = np.where(ponded, Vr, io.Vr)
+        io.DP = np.where(ponded, DPp, DP)
+        io.Ds = np.where(ponded, Ds, io.Ds)
+        io.Dr = np.where(ponded, Drp, Dr)
+        io.fDs = np.where(ponded, 1.0 - ((io.DAW - io.Ds) / io.DAW),
+                          io.fDs)
+
+        #Root zone soil water depletion fraction (fDr, mm/mm)
+        io.fDr = 1.0 - ((io.TAW - io.Dr) / io.TAW)
+
+    def getodata(self, k):
+        """Return the daily outputs of scenario k as in Model.odata.
+
+        Parameters
+        ----------
+        k : int
+            Scenario index
+
+        Returns
+        -------
+        odata : DataFrame
+            Daily outputs indexed by Year-DOY ('yyyy-ddd')
+        """
+
+        nk = int(self.ndays[k])
+        cal = Model._calendar(self.startDates[k], nk)
+        return pd.concat(
+            [cal, pd.DataFrame(self.ovals[k,:nk], index=cal.index,
+                               columns=self.cnames)], axis=1)
+
+    def getmodel(self, k):
+        """Return a Model holding the outputs of scenario k.
+
+        The Model is not run; its odata and swbdata are those of
+        scenario k, so savefile(), savecsv() and savesums() write the
+        same files as a Model run of the scenario.
+
+        Parameters
+        ----------
+        k : int
+            Scenario index
+
+        Returns
+        -------
+        mdl : Model
+            Model of scenario k with odata and swbdata set
+        """
+
+        mdl = Model(self.startDates[k].strftime('%Y-%j'),
+                    self.endDates[k].strftime('%Y-%j'), self.pars[k],
+                    self.wth, irr=self.irrs[k], autoirr=self.autoirrs[k],
+                    upd=self.upds[k], ponded=bool(self.ponded[k]),
+                    puddled=bool(self.puddled[k]),
+                    roff=bool(self.roff[k]), cons_p=bool(self.cons_p[k]),
+                    aq_Ks=bool(self.aq_Ks[k]))
+        mdl.comment = self.comment
+        mdl.odata = self.getodata(k)
+        mdl.swbdata = self.swbdata.iloc[k].to_dict()
+        return mdl
+
+    def tolong(self):
+        """Return the daily outputs of all scenarios in long format.
+
+        Returns
+        -------
+        odata : DataFrame
+            Daily outputs with a 'Scenario' column and one row per
+            scenario and simulated day
+        """
+
+        frames = []
+        for k in range(self.nscen):
+            odata = self.getodata(k)
+            odata.insert(0, 'Scenario', k)
+            frames.append(odata)
+        if not frames:
+            return pd.DataFrame(columns=['Scenario'] + self.cnames)
+        return pd.concat(frames)
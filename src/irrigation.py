@@ -12,11 +12,13 @@ The irrigation.py module contains the following:
 11/04/2021 Finalized updates for inclusion in the pyfao56 Python package
 12/13/2023 Added irrigation efficiency term for each irrigation event
 02/14/2024 Added function to return date of the latest irrigation record
+06/29/2025 Read the irrigation data block in one vectorized pass
 ########################################################################
 """
 
 import pandas as pd
 import datetime
+import io
 
 class Irrigation:
     """A class for managing irrigation data for FAO-56 calculations
@@ -124,6 +126,8 @@ class Irrigation:
         ------
         FileNotFoundError
             If filepath is not found.
+        ValueError
+            If a data row does not have the columns of the header.
         """
 
         try:
@@ -145,19 +149,28 @@ class Irrigation:
                 ts = datetime.datetime.strptime(ts,'%m/%d/%Y %H:%M:%S')
                 self.tmstmp = ts
             self.idata = pd.DataFrame(columns=['Depth','fw','ieff'])
-            for line in lines[endast+2:]:
-                line = line.strip().split()
-                year = line[0][:4]
-                doy = line[0][-3:]
-                key = '{:04d}-{:03d}'.format(int(year),int(doy))
-                data = list()
-                data.append(float(line[1]))
-                data.append(float(line[2]))
-                if len(line) == 3: #v1.2.1 and prior - no efficiency
-                    data.append(100.0)
-                else:
-                    data.append(float(line[3]))
-                self.idata.loc[key] = data
+            text = ''.join(lines[endast+2:])
+            if text.strip():
+                #v1.2.1 and prior - no efficiency column in the header
+                names = ['Year-DOY','Depth','fw','ieff']
+                if 'IrrEff' not in lines[endast+1].split():
+                    names = names[:3]
+                for i, line in enumerate(lines[endast+2:]):
+                    ncols = len(line.split())
+                    if ncols not in [0, len(names)]:
+                        raise ValueError('Irrigation data on line {:d} '
+                                         'has {:d} columns, expected {:d}.'
+                                         .format(endast+3+i, ncols,
+                                                 len(names)))
+                idata = pd.read_csv(io.StringIO(text), sep=r'\s+',
+                                    header=None, names=names,
+                                    dtype={'Year-DOY': str, 'Depth': float,
+                                           'fw': float, 'ieff': float})
+                if 'ieff' not in names:
+                    idata['ieff'] = 100.0
+                keys = idata['Year-DOY'].str
+                idata.index = pd.Index(keys[:4] + '-' + keys[-3:])
+                self.idata = idata[['Depth','fw','ieff']]
 
     def addevent(self, year, doy, depth, fw, ieff=100.0):
         """Add an irrigation event to self.idata
@@ -0,0 +1,549 @@
+"""
+########################################################################
+The kernel.py module contains a compiled alternative to the daily
+timestep of Model._advance, for use when a just-in-time (JIT) compiler
+is available.
+
+The model state is packed into float arrays so the timestep can be
+compiled by Numba (https://numba.pydata.org) into machine code. If
+Numba is not installed, NUMBA is False and Model falls back to its
+pure-Python timestep.
+
+The kernel.py module contains the following:
+    PNAMES - Names of the run constants packed by params()
+    SNAMES - Names of the state variables packed by step()
+    params - function to pack the run constants into a float array
+    advance - function to advance the packed state by one day
+    step - function to advance a Model.ModelState object by one day
+    pack - function to pack the state of a Model.ModelState object
+    unpack - function to copy the packed state to a Model.ModelState
+             object
+    day - function to advance a packed state by one day, keeping it
+          packed between days
+    substep - function to advance the ponded soil water balance by one
+              day in hourly substeps
+
+06/20/2025 Initial JIT kernel for the daily soil water balance
+06/27/2025 Added hourly substeps of the ponded soil water balance
+07/01/2025 Kept the state packed over the season; named array indices
+07/02/2025 Passed van Genuchten l and 1/m to the compiled timesteps
+########################################################################
+"""
+
+import math
+import operator
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+NUMBA = numba is not None
+
+#Run constants, fixed for a simulation
+PNAMES = ('Kcbini','thetaFC','thetaWP','thetaS','thetaR','Ksat','Bundh',
+          'pbase','REW','CN2','TEW','m','l','im','wndht','rfcrp','roff',
+          'cons_p','aq_Ks','ponded','solmthd')
+
+#State variables, read and written each day
+SNAMES = ('ETref','rain','wndsp','rhmin','idep','ieff','updfc','tKcb',
+          'Kcb','h','Zr','Kcmax','fc','fw','few','irrloss','runoff','Kr',
+          'Ke','E','DPe','De','Kc','ETc','TAW','DAW','p','RAW','Ks','Kcadj',
+          'ETcadj','T','Veff','theta0','Se','K','Vp','Vs','Vr','DP','Ds',
+          'Dr','fDs','fDr')
+
+#Index of each run constant in p and of each state variable in s;
+#advance() and Model address the packed arrays only by these names
+P_Kcbini = PNAMES.index('Kcbini')
+P_thetaFC = PNAMES.index('thetaFC')
+P_thetaWP = PNAMES.index('thetaWP')
+P_thetaS = PNAMES.index('thetaS')
+P_thetaR = PNAMES.index('thetaR')
+P_Ksat = PNAMES.index('Ksat')
+P_Bundh = PNAMES.index('Bundh')
+P_pbase = PNAMES.index('pbase')
+P_REW = PNAMES.index('REW')
+P_CN2 = PNAMES.index('CN2')
+P_TEW = PNAMES.index('TEW')
+P_m = PNAMES.index('m')
+P_l = PNAMES.index('l')
+P_im = PNAMES.index('im')
+P_wndht = PNAMES.index('wndht')
+P_rfcrp = PNAMES.index('rfcrp')
+P_roff = PNAMES.index('roff')
+P_cons_p = PNAMES.index('cons_p')
+P_aq_Ks = PNAMES.index('aq_Ks')
+P_ponded = PNAMES.index('ponded')
+P_solmthd = PNAMES.index('solmthd')
+S_ETref = SNAMES.index('ETref')
+S_rain = SNAMES.index('rain')
+S_wndsp = SNAMES.index('wndsp')
+S_rhmin = SNAMES.index('rhmin')
+S_idep = SNAMES.index('idep')
+S_ieff = SNAMES.index('ieff')
+S_updfc = SNAMES.index('updfc')
+S_tKcb = SNAMES.index('tKcb')
+S_Kcb = SNAMES.index('Kcb')
+S_h = SNAMES.index('h')
+S_Zr = SNAMES.index('Zr')
+S_Kcmax = SNAMES.index('Kcmax')
+S_fc = SNAMES.index('fc')
+S_fw = SNAMES.index('fw')
+S_few = SNAMES.index('few')
+S_irrloss = SNAMES.index('irrloss')
+S_runoff = SNAMES.index('runoff')
+S_Kr = SNAMES.index('Kr')
+S_Ke = SNAMES.index('Ke')
+S_E = SNAMES.index('E')
+S_DPe = SNAMES.index('DPe')
+S_De = SNAMES.index('De')
+S_Kc = SNAMES.index('Kc')
+S_ETc = SNAMES.index('ETc')
+S_TAW = SNAMES.index('TAW')
+S_DAW = SNAMES.index('DAW')
+S_p = SNAMES.index('p')
+S_RAW = SNAMES.index('RAW')
+S_Ks = SNAMES.index('Ks')
+S_Kcadj = SNAMES.index('Kcadj')
+S_ETcadj = SNAMES.index('ETcadj')
+S_T = SNAMES.index('T')
+S_Veff = SNAMES.index('Veff')
+S_theta0 = SNAMES.index('theta0')
+S_Se = SNAMES.index('Se')
+S_K = SNAMES.index('K')
+S_Vp = SNAMES.index('Vp')
+S_Vs = SNAMES.index('Vs')
+S_Vr = SNAMES.index('Vr')
+S_DP = SNAMES.index('DP')
+S_Ds = SNAMES.index('Ds')
+S_Dr = SNAMES.index('Dr')
+S_fDs = SNAMES.index('fDs')
+S_fDr = SNAMES.index('fDr')
+
+#Index of the first state variable computed by advance()
+SOUT = SNAMES.index('Kcmax')
+
+#State variables read by Model between timesteps (_irrigate, _track,
+#and _tally), copied from the packed state each day by day()
+SYNC = ('fw','irrloss','runoff','ETc','ETcadj','E','T','DP','K','TAW',
+        'Vp','Ds','Dr','fDs','fDr','Ks')
+SYNCIDX = np.array([SNAMES.index(name) for name in SYNC])
+
+#Daily inputs, in SNAMES order, read from the model state by day()
+INPUTS = operator.attrgetter(*SNAMES[:SOUT])
+
+def params(io, ponded):
+    """Pack the run constants of a model state into a float array.
+
+    Parameters
+    ----------
+    io : Model.ModelState
+        An initialized model state
+    ponded : bool
+        True if the soil water balance is computed for ponded rice
+
+    Returns
+    -------
+    p : ndarray
+        Float array of the constants named in PNAMES
+    """
+
+    #Coded options, and 1/m for the van Genuchten conductivity
+    flags = {'rfcrp': {'S':1.0,'T':2.0}.get(io.rfcrp, 0.0),
+             'roff': float(io.roff is True),
+             'cons_p': float(io.cons_p is True),
+             'aq_Ks': float(io.aq_Ks is True),
+             'ponded': float(bool(ponded)),
+             'solmthd': float(io.solmthd == 'D'),
+             'im': 1.0 / io.m}
+    return np.array([flags[name] if name in flags else getattr(io, name)
+                     for name in PNAMES], dtype=float)
+
+def advance(p, s):
+    """Advance the packed model state by one daily timestep.
+
+    The computations are those of Model._advance, written with scalar
+    math only so that they can be compiled. The crop development
+    variables (tKcb, Kcb, h, Zr) are inputs, as precomputed by Model.
+
+    Parameters
+    ----------
+    p : ndarray
+        Run constants, see PNAMES
+    s : ndarray
+        State variables, see SNAMES; updated in place
+    """
+
+    Kcbini = p[P_Kcbini]
+    thetaFC = p[P_thetaFC]
+    thetaWP = p[P_thetaWP]
+    thetaS = p[P_thetaS]
+    thetaR = p[P_thetaR]
+    Ksat = p[P_Ksat]
+    Bundh = p[P_Bundh]
+    pbase = p[P_pbase]
+    REW = p[P_REW]
+    CN2 = p[P_CN2]
+    TEW = p[P_TEW]
+    m = p[P_m]
+    l = p[P_l]
+    im = p[P_im]
+    wndht = p[P_wndht]
+    rfcrp = p[P_rfcrp]
+    roff = p[P_roff]
+    cons_p = p[P_cons_p]
+    aq_Ks = p[P_aq_Ks]
+    ponded = p[P_ponded]
+    solmthd = p[P_solmthd]
+    ETref = s[S_ETref]
+    rain = s[S_rain]
+    wndsp = s[S_wndsp]
+    rhmin = s[S_rhmin]
+    idep = s[S_idep]
+    ieff = s[S_ieff]
+    updfc = s[S_updfc]
+    tKcb = s[S_tKcb]
+    Kcb = s[S_Kcb]
+    h = s[S_h]
+    Zr = s[S_Zr]
+    Kcmax = s[S_Kcmax]
+    fc = s[S_fc]
+    fw = s[S_fw]
+    De = s[S_De]
+    TAW = s[S_TAW]
+    DAW = s[S_DAW]
+    Veff = s[S_Veff]
+    K = s[S_K]
+    Vp = s[S_Vp]
+    Vs = s[S_Vs]
+    Vr = s[S_Vr]
+    DP = s[S_DP]
+    Ds = s[S_Ds]
+    Dr = s[S_Dr]
+    fDs = s[S_fDs]
+    fDr = s[S_fDr]
+
+    #Wind speed and minimum relative humidity for Kcmax
+    #From FAO-56 Tables 11 and 17
+    u2 = wndsp * (4.87/math.log(67.8*wndht-5.42))
+    u2 = min(max(u2, 1.0), 6.0)
+    rhmin = min(max(rhmin, 20.0), 80.0)
+
+    #Upper limit crop coefficient (Kcmax) - FAO-56 Eq. 72
+    if rfcrp == 1.0:
+        Kcmax = max(1.2+(0.04*(u2-2.0)-0.004*(rhmin-45.0))*(h/3.0)**.3,
+                    Kcb+0.05)
+    elif rfcrp == 2.0:
+        Kcmax = max(1.0, Kcb + 0.05)
+
+    #Canopy cover fraction (fc, 0.0-0.99) - FAO-56 Eq. 76
+    fcnew = ((Kcb-Kcbini)/(Kcmax-Kcbini))**(1.0+0.5*h)
+    fcnew = min(max(fcnew, 0.0), 0.99)
+    if fcnew >= fc: fc = fcnew
+    #Overwrite fc if updates are available
+    if updfc > 0: fc = updfc
+
+    #Losses due to irrigation inefficiency (irrloss, mm)
+    irrloss = idep * (1 - ieff / 100.)
+
+    runoff = 0.0
+    if roff == 1.0:
+        #Method per ASCE (2016) Eqs. 14-12 to 14-20, page 451-454
+        CN1 = CN2/(2.281-0.01281*CN2) #ASCE (2016) Eq. 14-14
+        CN3 = CN2/(0.427+0.00573*CN2) #ASCE (2016) Eq. 14-15
+        if De <= 0.5*REW:
+            CN = CN3 #ASCE (2016) Eq. 14-18
+        elif De >= 0.7*REW+0.3*TEW:
+            CN = CN1 #ASCE (2016) Eq. 14-19
+        else:
+            CN = (De-0.5*REW)*CN1
+            CN = CN+(0.7*REW+0.3*TEW-De)*CN3
+            CN = CN/(0.2*REW+0.3*TEW) #ASCE (2016) Eq. 14-20
+        storage = 250.*((100./CN)-1.) #ASCE (2016) Eq. 14-12
+        if rain > 0.2*storage:
+            #ASCE (2016) Eq. 14-13
+            runoff = (rain-0.2*storage)**2/(rain+0.8*storage)
+            runoff = min(runoff, rain)
+
+    #Effective irrigation and precipitation (mm)
+    effirr = max(0.0, idep - irrloss)
+    effrain = max(0.0, rain - runoff)
+
+    #Fraction soil surface wetted (fw) - FAO-56 Table 20, page 149
+    if idep <= 0.0 and rain >= 3.0:
+        fw = 1.0
+
+    #Exposed & wetted soil fraction (few, 0.01-1.0) - FAO-56 Eq. 75
+    few = min(max(min(1.0-fc, fw), 0.01), 1.0)
+
+    #Evaporation reduction coefficient (Kr, 0-1) - FAO-56 Eq. 74
+    Kr = 1.0
+    if Vs == 0.0:
+        Kr = min(max((TEW-De)/(TEW-REW), 0.0), 1.0)
+
+    #Evaporation coefficient (Ke) - FAO-56 Eq. 71
+    Ke = min(Kr*(Kcmax-Kcb), few*Kcmax)
+
+    #Soil water evaporation (E, mm) - FAO-56 Eq. 69
+    E = Ke * ETref
+
+    #Deep percolation under exposed soil (DPe, mm) - FAO-56 Eq. 79
+    DPe = min(max(effrain + effirr/fw - De, 0.0), K)
+
+    #Cumulative depth of evaporation (De, mm) - FAO-56 Eqs. 77 & 78
+    De = min(max(De - effrain - effirr/fw + E/few + DPe, 0.0), TEW)
+
+    #Crop coefficient (Kc) - FAO-56 Eq. 69
+    Kc = Ke + Kcb
+
+    #Non-stressed crop evapotranspiration (ETc, mm) - FAO-56 Eq. 69
+    ETc = Kc * ETref
+
+    #Total available water (TAW, mm) - FAO-56 Eq. 82
+    TAW = 1000.0 * (thetaFC - thetaWP) * Zr
+
+    if ponded == 1.0:
+        #Root zone drainable available water (DAW, mm)
+        DAW = 1000. * (thetaS - thetaFC) * Zr
+
+    #Fraction depleted TAW (p, 0.1-0.8) - FAO-56 p162 and Table 22
+    if cons_p == 1.0:
+        p_ = pbase
+    else:
+        p_ = min(max(pbase+0.04*(5.0-ETc), 0.1), 0.8)
+
+    #Readily available water (RAW, mm) - FAO-56 Equation 83
+    SAW = DAW + TAW
+    Dtot = Dr + Ds
+    if ponded == 1.0:
+        RAW = p_ * thetaS * 1000 * Zr
+    else:
+        RAW = p_ * TAW
+
+    #Transpiration reduction factor (Ks, 0.0-1.0)
+    sf = 1.5
+    if aq_Ks == 1.0 and ponded == 1.0:
+        #Ks method from AquaCrop
+        Drel = 1.0 - (SAW - Dtot) / (SAW - RAW)
+        Ks = 1.0-(math.exp(sf*Drel)-1.0)/(math.exp(sf)-1.0)
+    elif aq_Ks == 1.0:
+        #Ks method from AquaCrop
+        Drel = (Dr/TAW-p_)/(1.0-p_)
+        Ks = 1.0-(math.exp(sf*Drel)-1.0)/(math.exp(sf)-1.0)
+    elif ponded == 1.0:
+        #FAO-56 Eq. 84
+        Ks = (SAW - Dtot)/(SAW - RAW)
+    else:
+        #FAO-56 Eq. 84
+        Ks = (TAW-Dr)/(TAW-RAW)
+    Ks = min(max(Ks, 0.0), 1.0)
+
+    #Adjusted crop coefficient (Kcadj) - FAO-56 Eq. 80
+    Kcadj = Ks * Kcb + Ke
+
+    #Adjusted crop evapotranspiration (ETcadj, mm) - FAO-56 Eq. 80
+    ETcadj = Kcadj * ETref
+
+    #Adjusted crop transpiration (T, mm)
+    T = (Ks * Kcb) * ETref
+
+    #Total soil moisture in puddle (Veff, mm)
+    Veff = max(Veff + effrain + effirr - ETcadj - DP, 0.0)
+
+    #Modify Ksat based on vanGenuchten and previous theta0
+    theta0 = Veff/(1000*Zr) + thetaWP
+    Se = min(max((theta0 - thetaR)/(thetaS - thetaR), 0.0), 1.0)
+    K = Ksat * Se**l * (1 - (1 - Se**im)**m)**2
+    K = min(max(K, 0.0), Ksat)
+
+    #Water balance methods
+    if solmthd == 1.0:
+        if ponded == 1.0:
+            #Ponding, saturation and residual depths (Vp, Vs, Vr, mm)
+            Vp = min(max(Veff - DAW - TAW, 0.0), Bundh)
+            Vs = min(max(Veff - Vp - TAW, 0.0), DAW)
+            Vr = min(max(Veff - Vp - Vs, 0.0), TAW)
+            #Deep percolation from drainable water (DP, mm)
+            DP = min(max(Vs, 0.0), K)
+            #Root zone saturated and residual depletion (Ds, Dr, mm)
+            Ds = max(0.0, DAW - Vs)
+            Dr = max(0.0, TAW - Vr)
+            #Saturation zone soil water depletion fraction (fDs)
+            fDs = 1.0 - ((DAW - Ds) / DAW)
+        else:
+            #Deep percolation (DP, mm) - FAO-56 Eq. 88
+            DP = max(effrain + effirr - ETcadj - Dr, 0.0)
+            #Root zone soil water depletion (Dr,mm) - FAO-56 Eqs.85 & 86
+            Dr = min(max(Dr - effrain - effirr + ETcadj + DP, 0.0), TAW)
+        #Root zone soil water depletion fraction (fDr, mm/mm)
+        fDr = 1.0 - ((TAW - Dr) / TAW)
+
+    s[S_Kcmax] = Kcmax
+    s[S_fc] = fc
+    s[S_fw] = fw
+    s[S_few] = few
+    s[S_irrloss] = irrloss
+    s[S_runoff] = runoff
+    s[S_Kr] = Kr
+    s[S_Ke] = Ke
+    s[S_E] = E
+    s[S_DPe] = DPe
+    s[S_De] = De
+    s[S_Kc] = Kc
+    s[S_ETc] = ETc
+    s[S_TAW] = TAW
+    s[S_DAW] = DAW
+    s[S_p] = p_
+    s[S_RAW] = RAW
+    s[S_Ks] = Ks
+    s[S_Kcadj] = Kcadj
+    s[S_ETcadj] = ETcadj
+    s[S_T] = T
+    s[S_Veff] = Veff
+    s[S_theta0] = theta0
+    s[S_Se] = Se
+    s[S_K] = K
+    s[S_Vp] = Vp
+    s[S_Vs] = Vs
+    s[S_Vr] = Vr
+    s[S_DP] = DP
+    s[S_Ds] = Ds
+    s[S_Dr] = Dr
+    s[S_fDs] = fDs
+    s[S_fDr] = fDr
+
+def substep(Veff, DPh, effrain, effirr, ETcadj, wrain, wet, Zr, thetaWP,
+            thetaS, thetaR, Ksat, m, l, im, TAW, DAW, Bundh):
+    """Advance the ponded soil water balance by 24 hourly substeps.
+
+    The daily effective rain and ETcadj are spread over the hours by
+    the fractions in wrain and wet, and the effective irrigation is
+    applied in the first hour. Each hour removes the percolation of the
+    previous hour from Veff, and percolation is limited to K/24 from
+    the conductivity at the Veff of the hour.
+
+    Parameters
+    ----------
+    Veff : float
+        Total soil moisture in the puddle at the start of the day (mm)
+    DPh : float
+        Deep percolation of the previous hour (mm)
+    effrain, effirr, ETcadj : float
+        Daily effective rain, effective irrigation, and adjusted crop
+        evapotranspiration (mm)
+    wrain, wet : ndarray
+        Fraction of effrain and ETcadj in each of the 24 hours
+    Zr, thetaWP, thetaS, thetaR, Ksat : float
+        Root depth (m), soil water contents (cm3/cm3), and saturated
+        conductivity (mm/d)
+    m, l, im : float
+        van Genuchten m, pore connectivity l, and 1/m of the
+        conductivity function (vangenuchten.Conductivity)
+    TAW, DAW, Bundh : float
+        TAW, DAW, and bund height (mm) of the day
+
+    Returns
+    -------
+    Veff : float
+        Total soil moisture in the puddle at the end of the day (mm)
+    DPh : float
+        Deep percolation of the last hour (mm)
+    DP : float
+        Deep percolation removed during the day (mm)
+    """
+
+    DP = 0.0
+    for hr in range(24):
+        Veff = Veff + wrain[hr]*effrain - wet[hr]*ETcadj - DPh
+        if hr == 0:
+            Veff = Veff + effirr
+        Veff = max(Veff, 0.0)
+        DP = DP + DPh
+        theta0 = Veff/(1000*Zr) + thetaWP
+        Se = min(max((theta0 - thetaR)/(thetaS - thetaR), 0.0), 1.0)
+        K = Ksat * Se**l * (1 - (1 - Se**im)**m)**2
+        K = min(max(K, 0.0), Ksat)
+        Vp = min(max(Veff - DAW - TAW, 0.0), Bundh)
+        Vs = min(max(Veff - Vp - TAW, 0.0), DAW)
+        DPh = min(max(Vs, 0.0), K/24.)
+    return Veff, DPh, DP
+
+if NUMBA:
+    advance = numba.njit(cache=True)(advance)
+    substep = numba.njit(cache=True)(substep)
+
+def step(io, p, s, func=advance):
+    """Advance a Model.ModelState object by one daily timestep.
+
+    Parameters
+    ----------
+    io : Model.ModelState
+        Model state, updated in place
+    p : ndarray
+        Run constants from params()
+    s : ndarray
+        Work array with one element for each name in SNAMES
+    func : function, optional
+        Timestep function applied to p and s (default = advance)
+    """
+
+    s[:] = [getattr(io, name, 0.0) for name in SNAMES]
+    func(p, s)
+    for name, value in zip(SNAMES[SOUT:], s[SOUT:].tolist()):
+        setattr(io, name, value)
+
+def pack(io, s):
+    """Pack the state variables of a Model.ModelState object into s.
+
+    Parameters
+    ----------
+    io : Model.ModelState
+        Model state
+    s : ndarray
+        Work array with one element for each name in SNAMES, updated in
+        place
+    """
+
+    s[:] = [getattr(io, name, 0.0) for name in SNAMES]
+
+def unpack(io, s):
+    """Copy the state variables computed by advance() from s to io.
+
+    Parameters
+    ----------
+    io : Model.ModelState
+        Model state, updated in place
+    s : ndarray
+        Packed state variables, see SNAMES
+    """
+
+    for name, value in zip(SNAMES[SOUT:], s[SOUT:].tolist()):
+        setattr(io, name, value)
+
+def day(io, p, s, func=advance):
+    """Advance a packed model state by one daily timestep.
+
+    Unlike step(), the state stays packed in s from one day to the
+    next: only the daily inputs are copied from io to s, and only the
+    variables in SYNC are copied back to io. Call pack() before the
+    first day and unpack() wherever the full state of io is needed.
+
+    Parameters
+    ----------
+    io : Model.ModelState
+        Model state with the daily inputs set, updated in place for the
+        variables in SYNC
+    p : ndarray
+        Run constants from params()
+    s : ndarray
+        Packed state variables, see SNAMES; updated in place
+    func : function, optional
+        Timestep function applied to p and s (default = advance)
+    """
+
+    s[:SOUT] = INPUTS(io)
+    s[S_fw] = io.fw
+    func(p, s)
+    for name, value in zip(SYNC, s[SYNCIDX].tolist()):
+        setattr(io, name, value)
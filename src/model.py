@@ -1,6 +1,10 @@
 import pandas as pd
+import numpy as np
 import datetime
 import math
+import operator
+from . import kernel
+from . import vangenuchten
 
 # from .landprep import Landprep
 
@@ -8,7 +12,10 @@ class Model:
 
     def __init__(self, start, end, par, wth, irr=None, autoirr=None,
                  sol=None, upd=None, ponded=False, puddled=False, roff=False,  #NOTE: 'ponded' functionality not yet implemented
-                 cons_p=False, aq_Ks=False, comment=''):
+                 cons_p=False, aq_Ks=False, jit=False, summary=False,
+                 ocols=None, ostep=1, state=None, snapdays=None,
+                 keepstates=False, landprep=False, hourly=False,
+                 comment=''):
 
         self.startDate = datetime.datetime.strptime(start, '%Y-%j')
         self.endDate   = datetime.datetime.strptime(end, '%Y-%j')
@@ -23,6 +30,21 @@ class Model:
         self.roff = roff
         self.cons_p = cons_p
         self.aq_Ks = aq_Ks
+        self.jit = jit
+        self.summary = summary
+        self.ocols = ocols
+        self.ostep = int(ostep)
+        self.istate = state
+        self.snapdays = [] if snapdays is None else list(snapdays)
+        self.keepstates = keepstates
+        self.landprep = landprep
+        self.hourly = hourly
+        self.snapshots = {}
+        self.state = None
+        self.swbdata = {}
+        self.swbphases = {}
+        self._prepsplit = None
+        self._ostart = self.startDate
         self.comment = 'Comments: ' + comment.strip()
         self.tmstmp = datetime.datetime.now()
         self.cnames = ['Date','Year','DOY','DOW','Day','ETref',
@@ -32,6 +54,19 @@ class Model:
                        'Runoff','DP','TAW','DAW','RAW','Veff','Vp',
                        'Vs','Vr','Ds','Dr','fDr', 'fDs', 'theta0','Se','K']
         self.odata = pd.DataFrame(columns=self.cnames)
+        if self.ocols is not None:
+            unknown = [c for c in self.ocols if c not in self.cnames]
+            if unknown:
+                raise ValueError('Unknown output columns: ' +
+                                 ', '.join(unknown))
+        if self.ostep < 1:
+            raise ValueError('ostep must be a positive integer')
+        if self.sol is not None and self.ponded:
+            raise ValueError('The layered soil method (sol) is not '
+                             'available for ponded soils')
+        if self.hourly and not self.ponded:
+            raise ValueError('The hourly timestep is only available '
+                             'for ponded soils')
 
     def __str__(self):
 
@@ -48,22 +83,11 @@ class Model:
 
         ast='*'*72
 
-        keys = ['Year-DOY','Date','Year','DOY','DOW','Day','ETref',
-                'ETc','ETcadj','T','E','p','Ks','h','Zr',
-                'fc','tKcb','Kcb','Kcmax','Kc','Kcadj','Ke','Kr','fw',
-                'few','De','DPe','Irrig','IrrLoss','Rain',
-                'Runoff','DP','TAW','DAW','RAW','Veff','Vp',
-                'Vs','Vr','Ds','Dr','fDr', 'fDs', 'theta0','Se','K']
-
-        header = (
-            f'{keys[0]:>8s}'  # Date
-            f'{keys[1]:>12s}'   # DOY
-            f'{keys[2]:>8s}'   # Day
-            f'{keys[3]:>5s}'   # Day
-            f'{keys[4]:>5s}'   # Day
-            f'{keys[5]:>5s}'   # Day
-            + ''.join(f'{key:>8s}' for key in keys[6:])
-        )
+        #Header for the output columns kept in self.odata
+        keys = ['Year-DOY'] + list(self.odata.columns)
+        widths = {'Year-DOY': 8, 'Date': 12, 'Year': 8, 'DOY': 5,
+                  'DOW': 5, 'Day': 5}
+        header = ''.join(f'{key:>{widths.get(key, 8)}s}' for key in keys)
 
         fmts = {
             # Temporal Data
@@ -158,11 +182,21 @@ class Model:
             self.odata.to_csv(f)
             f.close()
 
-    def savesums(self, filepath='pyfao56.sum'):
+    def savesums(self, filepath='pyfao56.sum', phase=None):
+        #Sums of the whole run, or of one phase of a landprep run
+        swbdata = self.swbdata
+        sdate, edate = self.startDate, self.endDate
+        if phase is not None:
+            if phase not in ['landprep', 'crop']:
+                raise ValueError('Unknown phase: ' + str(phase))
+            swbdata = self.swbphases.get(phase, {})
+            if swbdata:
+                sdate, edate = self._phasedates[phase]
+
         self.tmstmp = datetime.datetime.now()
         timestamp = self.tmstmp.strftime('%Y-%m-%d %H:%M:%S')
-        sdate = self.startDate.strftime('%Y-%m-%d')
-        edate = self.endDate.strftime('%Y-%m-%d')
+        sdate = sdate.strftime('%Y-%m-%d')
+        edate = edate.strftime('%Y-%m-%d')
 
         ast = '*'*72
         s = ('{:s}\n'
@@ -176,12 +210,11 @@ class Model:
             '{:s}\n'
             '{:s}\n'
             ).format(ast,timestamp,sdate,edate,ast,self.comment,ast)
-        if not self.odata.empty:
-            keys = [ 'ETref', 'ETc', 'ETcadj', 'E', 'T', 'DP', 'K', 'Rain',
-                    'Runoff', 'Irrig', 'IrrLoss', 'Gross_Irrig', 'Num_Irrig',
-                    'Mean_Irrig', 'Veff_ini', 'Veff_end', "theta0"]
-            for key in keys:
-                s += '{:8.2f} : {:s}\n'.format(self.swbdata[key],key)
+        #Sums of a finished run; odata may be empty by request (summary
+        #or ocols)
+        if swbdata:
+            for key in self._sumkeys:
+                s += self._sumfmt.format(swbdata[key],key)
 
         try:
             f = open(filepath, 'w')
@@ -191,22 +224,233 @@ class Model:
             f.write(s)
             f.close()
 
+    #Seasonal water balance keys and format written by savesums()
+    _sumkeys = ['ETref', 'ETc', 'ETcadj', 'E', 'T', 'DP', 'K', 'Rain',
+                'Runoff', 'Irrig', 'IrrLoss', 'Gross_Irrig', 'Num_Irrig',
+                'Mean_Irrig', 'Veff_ini', 'Veff_end', 'theta0']
+    _sumfmt = '{:8.2f} : {:s}\n'
+
+    #Seasonal water balance accumulators of ModelState
+    _accnames = ['sETref', 'sETc', 'sETcadj', 'sE', 'sT', 'sDP', 'sK',
+                 'sRain', 'sRunoff', 'sIrrig', 'sGross', 'nIrrig', 'ndays']
+
 #---------------------------------------------------------------------------
 # Main calculations
 #---------------------------------------------------------------------------
 
     class ModelState:
-
-        pass
+        """Slotted container for the state variables of the model.
+
+        All fields are float except i, ilast, nIrrig, ndays (int);
+        solmthd, rfcrp (str); roff, cons_p, aq_Ks (bool); evnt, elast
+        (list); and lth, ldep (ndarray).
+        """
+
+        __slots__ = (
+            #Day counter and event tracking
+            'i','ilast','evnt','elast',
+            #Crop parameters
+            'Kcbini','Kcbmid','Kcbend','Lini','Ldev','Lmid','Lend',
+            'hini','hmax','Zrini','Zrmax','pbase',
+            #Land preparation parameters
+            'Lprp','Puddays','Zp','lamb',
+            #Soil parameters
+            'thetaFC','thetaWP','thetaS','thetaR','Wdpud','Ksat',
+            'Bundh','Ze','REW','CN2','TEW','l','n','m',
+            #Options
+            'solmthd','wndht','rfcrp','roff','cons_p','aq_Ks',
+            #Daily inputs
+            'ETref','rain','wndsp','rhmin','idep','ieff','updfc',
+            #Crop state
+            'tKcb','Kcb','h','Zr','Kcmax','fc','few','fw','p',
+            #Evapotranspiration
+            'Kr','Ke','Kc','Ks','Kcadj','E','ETc','ETcadj','T',
+            #Soil water balance
+            'De','DPe','irrloss','runoff','DP','TAW','DAW','RAW',
+            'Veff','Vp','Vs','Vr','Ds','Dr','fDr','fDs','theta0',
+            'Se','K','DPh',
+            #Layered soil water contents and root zone depth
+            'lth','ldep','lZr',
+            #Seasonal water balance accumulators
+            'sETref','sETc','sETcadj','sE','sT','sDP','sK','sRain',
+            'sRunoff','sIrrig','sGross','nIrrig','ndays')
+
+        def copy(self):
+            """Return an independent copy of the model state."""
+
+            new = self.__class__()
+            for name in self.__slots__:
+                if hasattr(self, name):
+                    value = getattr(self, name)
+                    if isinstance(value, (list, np.ndarray)):
+                        value = value.copy()
+                    setattr(new, name, value)
+            return new
+
+        def snapshot(self):
+            """Return the model state as a dictionary of values."""
+
+            state = {}
+            for name in self.__slots__:
+                value = getattr(self, name, None)
+                if value is None:
+                    continue
+                if value.__class__ is list:
+                    value = list(value)
+                elif value.__class__ is np.ndarray:
+                    value = value.copy()
+                state[name] = value
+            return state
 
     def run(self):
         """Initialize model, conduct simulations, update self.odata"""
 
-
-        tcurrent = self.startDate
-        tdelta = datetime.timedelta(days=1)
-
-        #Initialize model state
+        #Preallocate output buffers for the kept columns and days; kept
+        #days are every ostep days from the first simulated day
+        ndays = max((self.endDate - self.startDate).days + 1, 0)
+        if self.summary:
+            ocols = []
+        elif self.ocols is None:
+            ocols = self.cnames
+        else:
+            ocols = [c for c in self.cnames if c in self.ocols]
+        tcols = [c for c in ocols if c in self.cnames[:5]]
+        vcols = [c for c in ocols if c not in self.cnames[:5]]
+        ostep = self.ostep
+        first = -(self.startDate - self._ostart).days % ostep
+        ovals = np.empty((len(range(first, ndays, ostep)), len(vcols)))
+        if vcols:
+            onames = dict(zip(self.cnames[5:], [
+                'ETref','ETc','ETcadj','T','E','p','Ks','h','Zr','fc',
+                'tKcb','Kcb','Kcmax','Kc','Kcadj','Ke','Kr','fw','few',
+                'De','DPe','idep','irrloss','rain','runoff','DP','TAW',
+                'DAW','RAW','Veff','Vp','Vs','Vr','Ds','Dr','fDr','fDs',
+                'theta0','Se','K']))
+            fetch = operator.attrgetter(*[onames[c] for c in vcols])
+            sidx = np.array([kernel.SNAMES.index(onames[c])
+                             for c in vcols])
+
+        #Days advanced by the compiled timestep keep the state packed,
+        #and their results are read from the packed state
+        for j, (mykey, io, ks) in enumerate(self._days(False)):
+            #Write results to the output buffer
+            if vcols and (j - first) % ostep == 0:
+                if ks is None:
+                    ovals[(j - first) // ostep] = fetch(io)
+                else:
+                    ovals[(j - first) // ostep] = ks[sidx]
+
+        #Assemble self.odata once from the output buffers
+        if ocols:
+            i0 = 0 if self.istate is None else self.istate['i'] + 1
+            cal = self._calendar(self.startDate, ndays, i0)
+            cal = cal.iloc[first::ostep]
+            self.odata = pd.concat(
+                [cal[tcols], pd.DataFrame(ovals, index=cal.index,
+                                          columns=vcols)],
+                axis=1)
+
+    def rerun(self, start, end=None):
+        """Recompute the simulation from day start onward.
+
+        Days before start keep their outputs and states, so a daily
+        refresh after new weather, irrigation, or update data arrive
+        only simulates the days that may have changed. The state at the
+        end of the previous day must be available in self.snapshots,
+        e.g., from a run with keepstates=True.
+
+        Parameters
+        ----------
+        start : str
+            First day to recompute, year and doy ('yyyy-ddd')
+        end : str, optional
+            New simulation end year and doy ('yyyy-ddd') (default =
+            None, i.e., keep the current end)
+
+        Raises
+        ------
+        KeyError
+            If the state of the day before start was not saved.
+        """
+
+        tstart = datetime.datetime.strptime(start, '%Y-%j')
+        if end is not None:
+            self.endDate = datetime.datetime.strptime(end, '%Y-%j')
+        if tstart <= self._ostart:
+            self.startDate = self._ostart
+            self.run()
+            return
+
+        pkey = (tstart - datetime.timedelta(days=1)).strftime('%Y-%j')
+        if pkey not in self.snapshots:
+            raise KeyError('No saved model state for ' + pkey + '; '
+                           'use keepstates=True or snapdays.')
+        odata = self.odata[self.odata.index < start]
+        snapshots = {key: snap for key, snap in self.snapshots.items()
+                     if key <= pkey}
+
+        #Continue from the saved state of the previous day
+        istate = self.istate
+        self.startDate = tstart
+        self.istate = snapshots[pkey]
+        try:
+            self.run()
+        finally:
+            self.startDate = self._ostart
+            self.istate = istate
+        if not self.odata.empty or not odata.empty:
+            self.odata = pd.concat([odata, self.odata])
+        snapshots.update(self.snapshots)
+        self.snapshots = snapshots
+
+    def iter_days(self):
+        """Initialize model and yield the state after each simulated day.
+
+        The simulation advances only as the generator is consumed, so
+        results may be streamed elsewhere or the season stopped early.
+        self.state and self.swbdata are set when the generator is
+        exhausted or closed, covering the days simulated so far.
+
+        Yields
+        ------
+        mykey : str
+            Year-DOY ('yyyy-ddd') of the simulated day
+        io : ModelState
+            Model state at the end of the day. The same object is
+            updated in place on the next day; use io.snapshot() to keep
+            a record.
+        """
+
+        days = self._days(True)
+        try:
+            for mykey, io, ks in days:
+                yield mykey, io
+        finally:
+            days.close()
+
+    def _days(self, sync):
+        """Simulate the season day by day, see iter_days().
+
+        Parameters
+        ----------
+        sync : boolean
+            If True, the full model state is copied to io each day. If
+            False, on days advanced by the compiled timestep only the
+            variables in kernel.SYNC are copied, and the other state
+            variables stay packed in the kernel work array.
+
+        Yields
+        ------
+        mykey : str
+            Year-DOY ('yyyy-ddd') of the simulated day
+        io : ModelState
+            Model state at the end of the day
+        ks : ndarray or None
+            Packed state variables (see kernel.SNAMES) on days advanced
+            by the compiled timestep if sync is False, otherwise None
+        """
+
+        #Initialize model parameters
         io = self.ModelState()
         io.i = 0
         io.Kcbini  = self.par.Kcbini
@@ -220,11 +464,8 @@ class Model:
         io.hmax    = self.par.hmax
         io.thetaFC = self.par.thetaFC
         io.thetaWP = self.par.thetaWP
-        io.theta0  = self.par.theta0
         io.thetaS  = self.par.thetaS
         io.thetaR  = self.par.thetaR
-        io.Wdpud   = self.par.Wdpud
-        io.Ksat    = self.par.Ksat
         io.Zrini   = self.par.Zrini
         io.Zrmax   = self.par.Zrmax
         io.Bundh   = self.par.Bundh * 1000
@@ -232,6 +473,317 @@ class Model:
         io.Ze      = self.par.Ze
         io.REW     = self.par.REW
         io.CN2     = float(self.par.CN2)
+        io.Lprp    = self.par.Lprp
+        io.Puddays = self.par.Puddays
+        io.Zp      = self.par.Zp
+        io.wndht  = self.wth.wndht
+        io.rfcrp  = self.wth.rfcrp
+        io.roff   = self.roff
+        io.cons_p = self.cons_p
+        io.aq_Ks  = self.aq_Ks
+        io.l = 0.50
+        io.n = 1.3055
+        io.m = 1 - 1/io.n
+        self._kfunc = vangenuchten.Conductivity.get(io.n, io.l)
+
+        #Day offset of the simulation start in the season; a run from a
+        #saved state continues the day counter of that state
+        i0 = 0 if self.istate is None else self.istate['i'] + 1
+        sstart = self.startDate - datetime.timedelta(days=i0)
+
+        #Number of days from the season start to the end, of which the
+        #first nprep days are land preparation
+        ndays = max((self.endDate - sstart).days + 1, 0)
+        nprep = self._prepdays(ndays)
+        #A run from the start of land preparation up to the crop season
+        #splits the seasonal sums anew; a later rerun keeps the split
+        if i0 <= nprep:
+            self._prepsplit = None
+
+        #Initial state of land preparation or of the crop season
+        if nprep > 0:
+            self._initprep(io)
+        else:
+            self._initcrop(io, self.par.theta0, self.par.Ksat,
+                           self.par.Wdpud)
+        #Initial water content for the seasonal water balance data
+        self._veffini = io.Veff
+
+        #Compile autoirrigation conditions
+        airules = []
+        if self.autoirr is not None:
+            lastirr = None
+            if self.irr is not None and not self.irr.idata.empty:
+                lastirr = self.irr.getlastdate()
+            airules = self.autoirr.compile(sstart, lastirr)
+
+        #Day index of the last irrigation and of the last watering event
+        #for each autoirrigation set (the day before the crop season
+        #before the first event)
+        io.ilast = nprep - 1
+        io.evnt = [ai.evnt for ai in airules]
+        io.elast = [nprep - 1] * len(io.evnt)
+
+        #Seasonal water balance accumulators
+        io.sETref = io.sETc = io.sETcadj = io.sE = io.sT = io.sDP = 0.0
+        io.sK = io.sRain = io.sRunoff = io.sIrrig = io.sGross = 0.0
+        io.nIrrig = io.ndays = 0
+
+        #Resume from a saved model state
+        if self.istate is not None:
+            for name, value in self.istate.items():
+                if isinstance(value, (list, np.ndarray)):
+                    value = value.copy()
+                setattr(io, name, value)
+            io.i = i0
+
+        #Use the compiled daily timestep if requested and available; its
+        #run constants and the state are packed once the crop season has
+        #started, and the state stays packed until the season ends. The
+        #layered soil method and the hourly timestep always use the
+        #Python timestep, the latter with compiled hourly substeps.
+        kp = yks = None
+        jit = (self.jit and kernel.NUMBA and self.sol is None and
+               not self.hourly)
+        self._substep = kernel.substep
+        if not self.jit:
+            self._substep = getattr(kernel.substep, 'py_func',
+                                    kernel.substep)
+        if jit:
+            ks = np.zeros(len(kernel.SNAMES))
+            if i0 >= nprep:
+                kp = kernel.params(io, self.ponded)
+                kernel.pack(io, ks)
+                yks = None if sync else ks
+
+        snapdays = set(self.snapdays)
+        self.snapshots = {}
+
+        #Year-DOY keys from the season start
+        wkeys = pd.date_range(sstart, periods=ndays,
+                              freq='D').strftime('%Y-%j').tolist()
+
+        #Weather from the season start as arrays by day offset, with
+        #missing ETref computed once for the Weather object
+        wwin = self.wth.getwindow(sstart, self.endDate)
+        wetref = wwin['ETref'].tolist()
+        wrain = wwin['Rain'].tolist()
+        wwndsp = np.where(np.isnan(wwin['Wndsp']), 2.0, wwin['Wndsp'])
+        wwndsp = wwndsp.tolist()
+        #Calculate RHmin from dewpoint temperature where missing
+        tmax = wwin['Tmax']
+        tdew = np.where(np.isnan(wwin['Tdew']), wwin['Tmin'], wwin['Tdew'])
+        #ASCE (2005) Eqs. 7 and 8
+        emax = 0.6108*np.exp((17.27*tmax)/(tmax+237.3))
+        ea   = 0.6108*np.exp((17.27*tdew)/(tdew+237.3))
+        wrhmin = np.where(np.isnan(wwin['RHmin']), ea/emax*100.,
+                          wwin['RHmin'])
+        wrhmin = np.where(np.isnan(wrhmin), 45., wrhmin).tolist()
+        #Forecasted precipitation for each autoirrigation set
+        fcrain = self.wth.getfcrain(sstart, self.endDate,
+                                    [ai.fpday for ai in airules])
+        wfcrain = [fcrain[ai.fpday].tolist() for ai in airules]
+
+        #Updates for Kcb, h, and fc by day offset (NaN if unavailable)
+        wupd = {var: np.full(ndays, np.nan) for var in ['Kcb','h','fc']}
+        if self.upd is not None:
+            udata = self.upd.udata.reindex(wkeys)
+            for var in wupd:
+                wupd[var] = udata[var].to_numpy(dtype=float)
+
+        #Precompute the seasonal crop development curves from the first
+        #day of the crop season (NaN during land preparation)
+        wtKcb = wKcb = wh = wZr = [float('NaN')] * nprep
+        if nprep < ndays:
+            crop = self._cropcurves(io, np.array(wwndsp[nprep:]),
+                                    np.array(wrhmin[nprep:]),
+                                    wupd['Kcb'][nprep:], wupd['h'][nprep:],
+                                    self.puddled)
+            wtKcb = wtKcb + crop['tKcb'].tolist()
+            wKcb = wKcb + crop['Kcb'].tolist()
+            wh = wh + crop['h'].tolist()
+            wZr = wZr + crop['Zr'].tolist()
+        wupdfc = wupd['fc'].tolist()
+
+        #Fractions of the daily ET and rain in each hour by day offset
+        if self.hourly:
+            hwin = self.wth.gethourly(sstart, self.endDate)
+            self._hwet = self._hourfrac(hwin['ETref'], True)
+            self._hwrain = self._hourfrac(hwin['Rain'], False)
+
+        #The initial state is the state at the end of the previous day
+        pkey = (self.startDate - datetime.timedelta(days=1)).strftime('%Y-%j')
+        if self.keepstates or pkey in snapdays:
+            self.snapshots[pkey] = io.snapshot()
+            self.snapshots[pkey]['i'] = i0 - 1
+
+        try:
+            while io.i < ndays:
+                mykey = wkeys[io.i]
+
+                #The crop season starts from the final state of land
+                #preparation
+                if io.i == nprep and nprep > 0:
+                    prep = self._sums(io, self._veffini)
+                    base = {name: getattr(io, name)
+                            for name in self._accnames}
+                    self._initcrop(io, io.theta0, io.K, io.Vp)
+                    self._prepsplit = (prep, base, io.Veff,
+                                       sstart + datetime.timedelta(days=nprep))
+                    if jit:
+                        kp = kernel.params(io, self.ponded)
+                        kernel.pack(io, ks)
+                        yks = None if sync else ks
+
+                #Update ModelState object
+                io.ETref = wetref[io.i]
+                io.rain = wrain[io.i]
+                io.wndsp = wwndsp[io.i]
+                io.rhmin = wrhmin[io.i]
+
+                if io.i < nprep:
+                    #Advance a land preparation (puddling) timestep
+                    self._puddle(io)
+                else:
+                    self._irrigate(io, mykey, airules, wfcrain)
+
+                    #Crop development and fc update for the day
+                    io.tKcb = wtKcb[io.i]
+                    io.Kcb = wKcb[io.i]
+                    io.h = wh[io.i]
+                    io.Zr = wZr[io.i]
+                    io.updfc = wupdfc[io.i]
+
+                    #Advance timestep
+                    if kp is None:
+                        self._advance(io)
+                    else:
+                        kernel.day(io, kp, ks)
+                    self._track(io)
+                self._tally(io)
+
+                #Copy the packed state to io where the full state is used
+                if kp is not None and (sync or self.keepstates or
+                                       mykey in snapdays):
+                    kernel.unpack(io, ks)
+
+                #Save the model state at the end of requested days
+                if self.keepstates or mykey in snapdays:
+                    self.snapshots[mykey] = io.snapshot()
+
+                yield mykey, io, yks
+                io.i+=1
+        except GeneratorExit:
+            #Stopped early; keep the state of the last completed day
+            if kp is not None:
+                kernel.unpack(io, ks)
+            self._finish(io, io.i)
+            raise
+        if kp is not None:
+            kernel.unpack(io, ks)
+        self._finish(io, ndays - 1)
+
+    def _prepdays(self, ndays):
+        """Return the number of land preparation days of the season.
+
+        Parameters
+        ----------
+        ndays : int
+            Number of days from the season start to the end
+
+        Returns
+        -------
+        nprep : int
+            Days of land preparation before the crop season starts,
+            par.Lprp if landprep is True and 0 otherwise (at most ndays)
+        """
+
+        if not self.landprep:
+            return 0
+        return min(int(self.par.Lprp), ndays)
+
+    def _initprep(self, io):
+        """Set the initial state of land preparation (puddling).
+
+        Parameters
+        ----------
+        io : ModelState
+            Model state with the parameters initialized, updated in place
+        """
+
+        io.theta0  = self.par.theta0
+        io.Ksat    = self.par.Ksat
+        io.Wdpud   = self.par.Wdpud
+
+        io.fw = 1.0
+        io.Kcb = 0.0 # NOTE: See page 207 of FAO-56 (Bare soil case)
+        io.fc = 0.0 # NOTE: See page 207 of FAO-56 (Bare soil case)
+        io.Ks = 0.0 # NOTE: No crop growth so no stress
+        io.h = 0.0 # NOTE: No crop growth -> Kcmax = 1.2
+        io.ieff = 100.0
+
+        io.p = -99.999
+        io.Zr = -99.999
+        io.tKcb = -99.999
+        io.RAW = 0.0
+
+        #Decay rate of K while puddling, reaching Ksat**0.33 at the end
+        io.lamb = 1 / io.Puddays * math.log(io.Ksat**0.33 / io.Ksat)
+
+        # Initial K set by traditional van Genuchten method
+        io.Se = sorted([0, (io.theta0 - io.thetaR)/ (io.thetaS - io.thetaR), 1])[1]
+        Kini = self._kfunc(io.Se, io.Ksat)
+
+        #Total evaporable water (TEW, mm) - FAO-56 Eq. 73
+        io.TEW = 1000. * (io.thetaFC - 0.50 * io.thetaWP) * io.Ze
+        #Initial depth of evaporation (De, mm) - FAO-56 page 153
+        io.De = 1000. * (io.thetaFC - 0.50 * io.thetaWP) * io.Ze
+        #Initial puddle drainable available water (DAW, mm)
+        io.DAW = 1000. * (io.thetaS - io.thetaFC) * io.Zp
+        #Initial puddle residual available water (TAW, mm)
+        io.TAW = 1000. * (io.thetaFC - io.thetaWP) * io.Zp
+
+        #Initial effective available moisture (Veff, mm)
+        #NOTE: This accounts for all the water in the paddy and can exceed 
+        #TAW + DAW, hence the different nomenclature to prevent confusion. 
+        # Also, note that theta0 cannot exceed thetaWP.
+        io.Veff = 1000 * (io.theta0 - io.thetaWP) * io.Zp
+        # Initial ponding depth (Vp, mm)
+        io.Vp = sorted([0.0, io.Veff - io.DAW - io.TAW, io.Bundh])[1]
+        # Initial saturation depth (Vs, mm)
+        io.Vs = sorted([0.0, io.Veff - io.Vp - io.TAW, io.DAW])[1]
+        # Initial residual soil moisture (Vr, mm)
+        io.Vr = sorted([0.0, io.Veff - io.Vp - io.Vs, io.TAW])[1]
+
+        #Initial depletion of saturation (Ds, mm)
+        io.Ds = sorted([0.0, io.DAW - io.Vs, io.DAW])[1]
+        #Initial root zone depletion (Dr, mm) - FAO-56 Eq. 87
+        io.Dr = sorted([0.0, io.TAW - io.Vr, io.TAW])[1]
+
+        io.DP = sorted([0.0, io.Vs + io.Vp, Kini])[1]
+
+        #Initial puddle depletion fraction (fDr, mm/mm)
+        io.fDr = 1.0 - ((io.TAW - io.Dr) / io.TAW)
+        io.fDs = 1.0 - ((io.DAW - io.Dr) / io.DAW)
+
+    def _initcrop(self, io, theta0, Ksat, Wdpud):
+        """Set the initial state of the crop season.
+
+        Parameters
+        ----------
+        io : ModelState
+            Model state with the parameters initialized, updated in place
+        theta0 : float
+            Initial volumetric soil water content (cm3/cm3)
+        Ksat : float
+            Saturated hydraulic conductivity (mm/d)
+        Wdpud : float
+            Water depth in the puddle (mm)
+        """
+
+        io.theta0  = theta0
+        io.Ksat    = Ksat
+        io.Wdpud   = Wdpud
         if self.sol is None:
             io.solmthd = 'D' #Default homogeneous soil from Parameters
             #Total evaporable water (TEW, mm) - FAO-56 Eq. 73
@@ -242,332 +794,556 @@ class Model:
             io.Dr = 1000. * (io.thetaFC - io.theta0) * io.Zrini
             #Initial root zone residual available water (TAW, mm)
             io.TAW = 1000. * (io.thetaFC - io.thetaWP) * io.Zrini
-            #By default, FAO-56 doesn't consider the following variables
+        else:
+            io.solmthd = 'L' #Layered soil profile from SoilProfile
+            self._initlayers(io)
 
-            io.l = 0.50
-            io.n = 1.3055
-            io.m = 1 - 1/io.n
+        #By default, FAO-56 doesn't consider the following variables
 
-            io.Se = sorted([0, (io.theta0 - io.thetaR)/ (io.thetaS - io.thetaR), 1])[1]
-            io.K = sorted([0, io.Ksat * io.Se**0.5 * (1 - (1 - io.Se**(1/io.m))**io.m)**2, io.Ksat])[1]
+        io.Se = sorted([0, (io.theta0 - io.thetaR)/ (io.thetaS - io.thetaR), 1])[1]
+        io.K = self._kfunc(io.Se, io.Ksat)
 
-            #TAW + DAW, hence the different nomenclature to prevent confusion.
-            io.Veff = 1000 * (io.theta0 - io.thetaWP) * io.Zrini
+        #TAW + DAW, hence the different nomenclature to prevent confusion.
+        io.Veff = 1000 * (io.theta0 - io.thetaWP) * io.Zrini
 
-            io.fDs = 0
-            io.DAW = 0
-            io.Vp = 0
-            io.Vs = 0
-            io.Vr = 0
-            io.Ds = 0
-            io.DP = 0
+        io.fDs = 0
+        io.DAW = 0
+        io.Vp = 0
+        io.Vs = 0
+        io.Vr = 0
+        io.Ds = 0
+        io.DP = 0
 
 
-            # --- Initial Rice Settings ---------------------------------
-            if self.ponded:
+        # --- Initial Rice Settings ---------------------------------
+        if self.ponded:
 
-                #Initial root zone drainable available water (DAW, mm)
-                io.DAW = 1000. * (io.thetaS - io.thetaFC) * io.Zrini
+            #Initial root zone drainable available water (DAW, mm)
+            io.DAW = 1000. * (io.thetaS - io.thetaFC) * io.Zrini
 
-                #Initial effective available moisture (Vtot, mm)
-                #NOTE: This accounts for all the water in the paddy and can exceed 
-                # Initial ponding depth (Vp, mm)
-                io.Vp = sorted([0.0, io.Veff - io.DAW - io.TAW, io.Bundh])[1]
-                # Initial saturation depth (Vs, mm)
-                io.Vs = sorted([0.0, io.Veff - io.Vp - io.TAW, io.DAW])[1]
-                # Initial residual soil moisture (Vr, mm)
-                io.Vr = sorted([0.0, io.Veff - io.Vp - io.Vs, io.TAW])[1]
+            #Initial effective available moisture (Vtot, mm)
+            #NOTE: This accounts for all the water in the paddy and can exceed 
+            # Initial ponding depth (Vp, mm)
+            io.Vp = sorted([0.0, io.Veff - io.DAW - io.TAW, io.Bundh])[1]
+            # Initial saturation depth (Vs, mm)
+            io.Vs = sorted([0.0, io.Veff - io.Vp - io.TAW, io.DAW])[1]
+            # Initial residual soil moisture (Vr, mm)
+            io.Vr = sorted([0.0, io.Veff - io.Vp - io.Vs, io.TAW])[1]
 
-                #Initial depletion of saturation (Ds, mm)
-                io.Ds = sorted([0.0, io.DAW - io.Vs, io.DAW])[1]
-                #Initial root zone depletion (Dr, mm) - FAO-56 Eq. 87
-                io.Dr = sorted([0.0, io.TAW - io.Vr, io.DAW])[1]
+            #Initial depletion of saturation (Ds, mm)
+            io.Ds = sorted([0.0, io.DAW - io.Vs, io.DAW])[1]
+            #Initial root zone depletion (Dr, mm) - FAO-56 Eq. 87
+            io.Dr = sorted([0.0, io.TAW - io.Vr, io.DAW])[1]
 
-                io.DP = sorted([0.0, io.Vs + io.Vp, io.K])[1]
+            io.DP = sorted([0.0, io.Vs + io.Vp, io.K])[1]
+            #Deep percolation of the last hour for the hourly timestep
+            io.DPh = io.DP / 24.
 
-                io.fDs = 1.0 - ((io.DAW - io.Ds) / io.DAW)
+            io.fDs = 1.0 - ((io.DAW - io.Ds) / io.DAW)
 
         #Initial root zone soil water depletion fraction (fDr, mm/mm)
         io.fDr = 1.0 - ((io.TAW - io.Dr) / io.TAW)
         io.Ks = 1.0
         io.h = io.hini
         io.Zr = io.Zrini
+        io.fc = 0.0
         io.fw = 1.0
-        io.wndht  = self.wth.wndht
-        io.rfcrp  = self.wth.rfcrp
-        io.roff   = self.roff
-        io.cons_p = self.cons_p
-        io.aq_Ks  = self.aq_Ks
-        self.odata = pd.DataFrame(columns=self.cnames)
 
-        while tcurrent <= self.endDate:
-            mykey = tcurrent.strftime('%Y-%j')
-
-            #Update ModelState object
-            io.ETref = self.wth.wdata.loc[mykey,'ETref']
-            if math.isnan(io.ETref):
-                io.ETref = self.wth.compute_etref(mykey)
-            io.rain = self.wth.wdata.loc[mykey,'Rain']
-            io.wndsp = self.wth.wdata.loc[mykey,'Wndsp']
-            if math.isnan(io.wndsp):
-                io.wndsp = 2.0
-            io.rhmin = self.wth.wdata.loc[mykey,'RHmin']
-            if math.isnan(io.rhmin):
-                tmax = self.wth.wdata.loc[mykey,'Tmax']
-                tmin = self.wth.wdata.loc[mykey,'Tmin']
-                tdew = self.wth.wdata.loc[mykey,'Tdew']
-
-            # Calculate RHmin from dewpoint temperature
-                if math.isnan(tdew):
-                    tdew = tmin
-                #ASCE (2005) Eqs. 7 and 8
-                emax = 0.6108*math.exp((17.27*tmax)/(tmax+237.3))
-                ea   = 0.6108*math.exp((17.27*tdew)/(tdew+237.3))
-                io.rhmin = ea/emax*100.
-            if math.isnan(io.rhmin):
-                io.rhmin = 45.
-            io.idep = 0.0
-            io.ieff = 100
-            # io.ieff = self.autoirr.aidata.loc[0,'ieff']
-
-            if self.irr is not None:
-                if mykey in self.irr.idata.index:
-                    io.idep = self.irr.idata.loc[mykey,'Depth']
-                    io.fw = self.irr.idata.loc[mykey,'fw']
-                    io.ieff = self.irr.idata.loc[mykey,'ieff']
-
-            #Evaluate autoirrigation conditions and compute amounts
-            if self.autoirr is not None:
-                for i in range(self.autoirr.aidata.shape[0]):
-                    #Evaluate date range condition
-                    aistart= self.autoirr.aidata.loc[i,'start']
-                    aistart= datetime.datetime.strptime(aistart,'%Y-%j')
-                    aiend  = self.autoirr.aidata.loc[i,'end']
-                    aiend  = datetime.datetime.strptime(aiend,'%Y-%j')
-                    if tcurrent<aistart or tcurrent>aiend: 
-                        continue # NOTE: Continue continues to next itteration
-                                 # of loop; i.e. next row.
-
-                    #Evaluate "after last recorded irrigation" condition
-                    if self.autoirr.aidata.loc[i,'alre']:
-                        if self.irr is not None:
-                            lastirr = self.irr.getlastdate()
-                            if tcurrent <= lastirr:
-                                continue
-
-                    #Evaluate forecasted precipitation condition
-                    fpdep = self.autoirr.aidata.loc[i,'fpdep']
-                    fpday = int(self.autoirr.aidata.loc[i,'fpday'])
-                    fpact = self.autoirr.aidata.loc[i,'fpact']
-                    fcrain = 0.
-                    for j in range(fpday):
-                        fpdate = tcurrent + j*tdelta
-                        fpkey = fpdate.strftime('%Y-%j')
-                        fcrain += self.wth.wdata.loc[fpkey,'Rain']
-                    reduceirr = 0.
-                    if fcrain >= fpdep:
-                        if fpact == 'cancel':
-                            continue
-                        elif fpact == 'reduce':
-                            reduceirr = fcrain
-                        elif fpact not in ['proceed']:
-                            continue
-                    
-                    #Evaluate management allowed depletion (mm/mm)
-                    if io.fDs <= self.autoirr.aidata.loc[i,'madDs']:
-                        continue
-                    if io.fDr <= self.autoirr.aidata.loc[i,'mad']:
-                        continue
-                    if io.Dr >= self.autoirr.aidata.loc[i,'madDr']:
-                        continue
-                    if io.Vp >= self.autoirr.aidata.loc[i,'madVp']:
-                        continue
-
-                    #Evaluate critical Ks
-                    if io.Ks >= self.autoirr.aidata.loc[i,'ksc']:
-                        continue
-
-                    #Evaluate days since last irrigation (dsli)
-                    idays = self.odata[self.odata['Irrig']>0.]
-                    idays = pd.to_datetime(idays.index,format='%Y-%j')
-                    if idays.size > 0:
-                        dsli = (tcurrent-max(idays)).days
-                    else:
-                        dsli = ((tcurrent-self.startDate).days)+1
-                    if dsli < self.autoirr.aidata.loc[i,'dsli']:
-                        continue
-                    
-                    #Evaluate days since last watering event
-                    evnt = self.autoirr.aidata.loc[i,'evnt']
-                    edays = self.odata[(self.odata['Irrig']-
-                                        self.odata['IrrLoss']+
-                                        self.odata['Rain']-
-                                        self.odata['Runoff'])>=evnt]
-                    edays = pd.to_datetime(edays.index,format='%Y-%j')
-                    if edays.size > 0:
-                        dsle = (tcurrent-max(edays)).days
-                    else:
-                        dsle = ((tcurrent-self.startDate).days)+1
-                    if dsle < self.autoirr.aidata.loc[i,'dsle']:
-                        continue
-
-                    #All conditions were met, need to autoirrigate
-                    #Default rate is root-zone soil water depletion (Dr)
-                    # rate = max([0.0,io.Dr + io.Ds - reduceirr])
-
-#-------------------------------------------------------------------------
-
-                    wdpth = self.autoirr.aidata.loc[i,'wdpth']
-                    rate = max([0.0, io.Dr + io.Ds + wdpth - reduceirr])
-
-                    if io.fDs >= self.autoirr.aidata.loc[i,'madDs']:
-                        wdpth = self.autoirr.aidata.loc[i,'wdpth']
-                        rate = max([0.0, io.Dr + io.Ds + wdpth - reduceirr])
-
-                    if io.Vp <= self.autoirr.aidata.loc[i,'madVp']:
-                        wdpth = self.autoirr.aidata.loc[i,'wdpth']
-                        rate = max([0.0, io.Dr + io.Ds + wdpth - reduceirr])
-
-#-------------------------------------------------------------------------
-
-                    #Alternatively, the default rate may be modified:
-                    #Use a contant rate
-                    icon  = self.autoirr.aidata.loc[i,'icon']
-                    if not math.isnan(icon):
-                        rate = max([0.0, icon - reduceirr])
-                    #Target a specific root-zone soil water depletion
-                    itdr  = self.autoirr.aidata.loc[i,'itdr']
-                    if not math.isnan(itdr):
-                        rate = max([0.0,io.Dr - reduceirr - itdr])
-                    #Target a fractional root-zone soil water depletion
-                    itfdr = self.autoirr.aidata.loc[i,'itfdr']
-                    if not math.isnan(itfdr):
-                        itdr2 = io.TAW-io.TAW*(1.0-itfdr)
-                        rate = max([0.0,io.Dr - reduceirr - itdr2])
-
-
-                    #Update fraction wetted (fw) for autoirrigation
-                    io.fw=self.autoirr.aidata.loc[i,'fw']
-
-                    #Specify the final autoirrigation rate
-                    io.idep=rate
-                    break
-
-            #Obtain updates for Kcb, h, and fc, if available
-            io.updKcb = float('NaN')
-            io.updh = float('NaN')
-            io.updfc = float('NaN')
-            if self.upd is not None:
-                io.updKcb = self.upd.getdata(mykey,'Kcb')
-                io.updh = self.upd.getdata(mykey,'h')
-                io.updfc = self.upd.getdata(mykey,'fc')
-
-            #Advance timestep
-            self._advance(io)
-
-            #Append results to self.odata
-            year = tcurrent.strftime('%Y')
-            doy = tcurrent.strftime('%j') #Day of Year
-            dow = tcurrent.strftime('%a') #Day of Week
-            dat = tcurrent.strftime('%Y-%m-%d') #Date yyyy-mm-dd
-
-            data = [
-                dat, year, doy, dow, str(io.i),
-                io.ETref, io.ETc, io.ETcadj, io.T, io.E,
-                io.p, io.Ks, io.h, io.Zr, io.fc,
-                io.tKcb, io.Kcb, io.Kcmax, io.Kc, io.Kcadj, io.Ke, io.Kr,
-                io.fw, io.few, io.De, io.DPe,
-                io.idep, io.irrloss, io.rain, io.runoff,
-                io.DP, io.TAW, io.DAW, io.RAW, io.Veff, io.Vp, io.Vs, io.Vr,
-                io.Ds, io.Dr, io.fDr, io.fDs, io.theta0, io.Se, io.K
-            ]
-            self.odata.loc[mykey] = data
-
-            tcurrent = tcurrent + tdelta
-            io.i+=1
+    def _initlayers(self, io):
+        """Set the initial state of the layered soil profile.
+
+        The SoilProfile layers are resampled to 1-cm soil cells from the
+        surface to the bottom of the deepest layer. Root zone totals are
+        read from cumulative sums of the cells, interpolated at the root
+        depth. thetaFC, thetaWP, and theta0 are set to the means of the
+        initial root zone, and TEW to the value of the top layer.
+
+        Parameters
+        ----------
+        io : ModelState
+            Model state with the parameters initialized, updated in place
+        """
+
+        sdata = self.sol.sdata
+        dpths = np.array(sdata.index, dtype=int)
+        #Layer of each 1-cm cell by the bottom depths of the layers
+        lyr = np.searchsorted(dpths, np.arange(1, dpths[-1]+1))
+        lfc = sdata['thetaFC'].to_numpy(dtype=float)[lyr]
+        lwp = sdata['thetaWP'].to_numpy(dtype=float)[lyr]
+
+        #Cumulative field capacity and wilting point water (mm) from the
+        #surface by depth (cm), shared for the run
+        self._lgrid = np.arange(dpths[-1]+1, dtype=float)
+        self._lfc = lfc
+        self._lcfc = np.concatenate([[0.], np.cumsum(10. * lfc)])
+        self._lcwp = np.concatenate([[0.], np.cumsum(10. * lwp)])
+
+        #Water content of each cell and cumulative depletion below field
+        #capacity (mm) from the surface by depth (cm)
+        io.lth = sdata['theta0'].to_numpy(dtype=float)[lyr]
+        io.ldep = np.concatenate([[0.], np.cumsum(10. * (lfc - io.lth))])
+        #Root zone depth (cm) integrated in TAW and Dr
+        io.lZr = min(io.Zrini * 100., self._lgrid[-1])
+        FC = float(np.interp(io.lZr, self._lgrid, self._lcfc))
+        WP = float(np.interp(io.lZr, self._lgrid, self._lcwp))
+
+        #Total evaporable water (TEW, mm) - FAO-56 Eq. 73
+        io.TEW = 1000. * (lfc[0] - 0.50 * lwp[0]) * io.Ze
+        #Initial depth of evaporation (De, mm) - FAO-56 page 153
+        io.De = io.TEW
+        #Initial root zone depletion (Dr, mm) - FAO-56 Eq. 87
+        io.Dr = float(np.interp(io.lZr, self._lgrid, io.ldep))
+        #Initial root zone residual available water (TAW, mm)
+        io.TAW = FC - WP
+        #Root zone means of the soil water contents (cm3/cm3)
+        io.thetaFC = FC / (10. * io.lZr)
+        io.thetaWP = WP / (10. * io.lZr)
+        io.theta0 = (FC - io.Dr) / (10. * io.lZr)
+
+    def _finish(self, io, last):
+        """Save the final model state and seasonal water balance data.
+
+        Parameters
+        ----------
+        io : ModelState
+            Model state at the end of the last simulated day
+        last : int
+            Season day offset of the last simulated day
+        """
+
+        #Model state at the end of the last day, for resuming later
+        self.state = io.snapshot()
+        self.state['i'] = last
 
         #Save seasonal water balance data to self.swbdata dictionary
-        sdoy = self.startDate.strftime("%Y-%j")
-        edoy = self.endDate.strftime("%Y-%j")
-        self.swbdata = {
-            'ETref': sum(self.odata['ETref']),
-            'ETc': sum(self.odata['ETc']),
-            'ETcadj': sum(self.odata['ETcadj']),
-            'E': sum(self.odata['E']),
-            'T': sum(self.odata['T']),
-            'DP': sum(self.odata['DP']),
-            'K': self.odata['K'].mean(),  # Mean of Hydraulic konductivity
-            'Rain': sum(self.odata['Rain']),
-            'Runoff': sum(self.odata['Runoff']),
-            'Irrig': sum(self.odata['Irrig']),
-            'IrrLoss': sum(self.odata['Irrig'] *  (100 - io.ieff)/100),
-            # 'Gross_Irrig': sum(self.odata['Irrig'] + self.odata['Irrig'] * (100 - io.ieff)/100),
-            'Gross_Irrig': sum(self.odata['Irrig'] + self.odata['Irrig'] * 0.3),
-            'Num_Irrig': len(self.odata[self.odata['Irrig'] > 0]),  # Count of non-zero irrigation values
-            'Mean_Irrig': self.odata[self.odata['Irrig'] > 0]['Irrig'].mean(),  # Mean of non-zero irrigation values
-            'Veff_ini': 1000 * (self.par.theta0 - io.thetaWP) * io.Zrini,
-            'Veff_end': self.odata.loc[edoy, 'Veff'],
-            'theta0': self.odata.loc[edoy, 'theta0'],
+        self.swbdata = self._sums(io, self._veffini)
+
+        #Split the sums at the first day of the crop season
+        self.swbphases = {}
+        self._phasedates = {}
+        if self._prepsplit is not None:
+            prep, base, veffini, cropdate = self._prepsplit
+            self.swbphases['landprep'] = prep
+            self.swbphases['crop'] = self._sums(io, veffini, base)
+            self._phasedates['landprep'] = (
+                cropdate - datetime.timedelta(days=int(self.par.Lprp)),
+                cropdate - datetime.timedelta(days=1))
+            self._phasedates['crop'] = (cropdate, self.endDate)
+
+    def _sums(self, io, veffini, base=None):
+        """Return the seasonal water balance data of the model state.
+
+        Parameters
+        ----------
+        io : ModelState
+            Model state at the end of the last summed day
+        veffini : float
+            Initial water content of the summed days (mm)
+        base : dict, optional
+            Accumulators at the start of the summed days, by name in
+            _accnames (default = None, sums from the season start)
+
+        Returns
+        -------
+        swbdata : dict
+            Seasonal water balance data by key in _sumkeys
+        """
+
+        acc = {name: getattr(io, name) for name in self._accnames}
+        if base is not None:
+            acc = {name: acc[name] - base[name] for name in acc}
+
+        return {
+            'ETref': acc['sETref'],
+            'ETc': acc['sETc'],
+            'ETcadj': acc['sETcadj'],
+            'E': acc['sE'],
+            'T': acc['sT'],
+            'DP': acc['sDP'],
+            'K': acc['sK'] / acc['ndays'] if acc['ndays'] else float('NaN'),  # Mean of Hydraulic konductivity
+            'Rain': acc['sRain'],
+            'Runoff': acc['sRunoff'],
+            'Irrig': acc['sIrrig'],
+            'IrrLoss': acc['sIrrig'] * (100 - io.ieff)/100,
+            'Gross_Irrig': acc['sGross'],
+            'Num_Irrig': acc['nIrrig'],  # Count of non-zero irrigation values
+            'Mean_Irrig': acc['sIrrig'] / acc['nIrrig'] if acc['nIrrig'] else float('NaN'),  # Mean of non-zero irrigation values
+            'Veff_ini': veffini,
+            'Veff_end': io.Veff,
+            'theta0': io.theta0,
         }
 
+    @staticmethod
+    def _calendar(start, ndays, day0=0):
+        """Build the calendar columns of the simulation window at once.
+
+        Parameters
+        ----------
+        start : datetime
+            First day of the simulation window
+        ndays : int
+            Number of days in the simulation window
+        day0 : int, optional
+            Day number of the first day (default = 0)
+
+        Returns
+        -------
+        cal : DataFrame
+            Date, Year, DOY, DOW, and Day columns indexed by Year-DOY
+            ('yyyy-ddd')
+        """
+
+        dates = pd.date_range(start, periods=ndays, freq='D')
+        return pd.DataFrame({'Date': dates.strftime('%Y-%m-%d'),
+                             'Year': dates.strftime('%Y'),
+                             'DOY': dates.strftime('%j'),
+                             'DOW': dates.strftime('%a'),
+                             'Day': np.arange(day0, day0+ndays).astype(str)},
+                            index=dates.strftime('%Y-%j'))
+
+    @staticmethod
+    def _hourfrac(hvals, even):
+        """Return the fraction of the daily total in each hour.
+
+        Days with missing hours or a zero total are spread evenly over
+        the hours (even=True) or put in the first hour (even=False).
+
+        Parameters
+        ----------
+        hvals : ndarray
+            Hourly values of shape (days, 24)
+        even : bool
+            How to spread days without usable hourly values
+
+        Returns
+        -------
+        frac : ndarray
+            Hourly fractions of shape (days, 24), summing to 1 by day
+        """
+
+        hvals = np.maximum(hvals, 0.0)
+        total = hvals.sum(axis=1)
+        usable = np.isfinite(total) & (total > 0.0)
+        frac = np.zeros(hvals.shape)
+        if even:
+            frac[:] = 1.0 / 24.
+        else:
+            frac[:, 0] = 1.0
+        frac[usable] = hvals[usable] / total[usable, None]
+        return frac
+
+    @staticmethod
+    def _cropcurves(io, wndsp, rhmin, updKcb, updh, puddled=False):
+        """Precompute the seasonal crop development curves.
+
+        The basal crop coefficient (tKcb, Kcb), plant height (h), and
+        root depth (Zr) depend only on the day of the season, the
+        climatic adjustment of Kcbmid and Kcbend, and Update data, so
+        they are computed for the whole season at once.
+
+        Parameters
+        ----------
+        io : ModelState
+            Initialized model state with crop parameters
+        wndsp : ndarray
+            Daily wind speed (m/s)
+        rhmin : ndarray
+            Daily minimum relative humidity (%)
+        updKcb : ndarray
+            Daily Kcb updates, NaN or <= 0 if not available
+        updh : ndarray
+            Daily h updates, NaN or <= 0 if not available
+        puddled : bool, optional
+            If True, Zr is Zrmax for the whole season (default = False)
+
+        Returns
+        -------
+        crop : dict
+            Float arrays of tKcb, Kcb, h, and Zr by day offset
+        """
+
+        ndays = len(wndsp)
+        i = np.arange(ndays)
+
+        #Climatic adjustment of Kcbmid and Kcbend - FAO-56 Eq. 70
+        u2 = wndsp * (4.87/math.log(67.8*io.wndht-5.42))
+        u2 = np.clip(u2, 1.0, 6.0)
+        rhmin = np.clip(rhmin, 20.0, 80.0)
+        adj = (0.04*(u2-2.0)-0.004*(rhmin-45.0))*(io.hmax/3.0)**.3
+        Kcbmid = io.Kcbmid + adj
+        Kcbend = io.Kcbend + adj
+
+        #Growth stages from FAO-56 Tables 11 and 17; stages 2 and 4
+        #are linear transitions between Kcbini, Kcbmid, and Kcbend
+        s1 = io.Lini
+        s2 = s1 + io.Ldev
+        s3 = s2 + io.Lmid
+        s4 = s3 + io.Lend
+        stage = np.select([i<=s1, i<=s2, i<=s3, i<=s4], [1,2,3,4], 5)
+        level = np.select([stage==1, stage==3, stage==5],
+                          [io.Kcbini, Kcbmid, Kcbend], np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = np.select([stage==2, stage==4],
+                              [(Kcbmid-io.Kcbini)/(s2-s1),
+                               (Kcbmid-Kcbend)/(s3-s4)], 0.0)
+        fixed = (stage % 2) == 1
+        tKcb = Model._accumulate(level, slope, fixed, io.Kcbini)
+
+        #Overwrite Kcb if updates are available; Kcb >= Kcbini
+        upd = updKcb > 0
+        level = np.where(upd, updKcb, level)
+        level = np.where(level > io.Kcbini, level, io.Kcbini)
+        Kcb = Model._accumulate(level, slope, fixed | upd, io.Kcbini,
+                                io.Kcbini)
+
+        #Plant height (h, m), non-decreasing unless updated
+        h = io.hini+(io.hmax-io.hini)*(Kcb-io.Kcbini)/(io.Kcbmid-
+                                                      io.Kcbini)
+        h = np.maximum(h, 0.001)
+        upd = np.flatnonzero(updh > 0)
+        bounds = [0] + upd.tolist() + [ndays]
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            if a == b:
+                continue
+            start = updh[a] if a in upd else max(io.hini, h[a])
+            seg = np.maximum.accumulate(np.concatenate([[start],
+                                                        h[a+1:b]]))
+            h[a:b] = seg
+
+        #Root depth (Zr, m) - FAO-56 page 279; based on DOY
+        if puddled:
+            Zr = np.full(ndays, float(io.Zrmax))
+        else:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                Zr = io.Zrini + (io.Zrmax-io.Zrini)*i/(io.Lini + io.Ldev)
+            Zr = np.maximum.accumulate(np.maximum(np.maximum(Zr, 0.001),
+                                                  io.Zrini))
+            #Zr is fixed at Zrmax once it reached Zrmax the day before
+            prev = np.concatenate([[io.Zrini], Zr[:-1]])
+            Zr = np.where(np.maximum.accumulate(prev >= io.Zrmax),
+                          io.Zrmax, Zr)
+
+        return {'tKcb': tKcb, 'Kcb': Kcb, 'h': h, 'Zr': Zr}
+
+    @staticmethod
+    def _accumulate(level, slope, fixed, first, floor=None):
+        """Accumulate daily increments between fixed values.
+
+        Parameters
+        ----------
+        level : ndarray
+            Values on fixed days
+        slope : ndarray
+            Daily increments on other days
+        fixed : ndarray
+            Boolean flags of days taking the value of level
+        first : float
+            Value before the first day
+        floor : float, optional
+            Lower bound applied to the value each day (default = None)
+
+        Returns
+        -------
+        value : ndarray
+            Daily values
+        """
+
+        value = np.where(fixed, level, np.nan)
+        free = np.flatnonzero(~fixed)
+        if free.size == 0:
+            return value
+        #Runs of consecutive days with increments
+        breaks = np.flatnonzero(np.diff(free) > 1) + 1
+        for run in np.split(free, breaks):
+            a, b = run[0], run[-1] + 1
+            start = value[a-1] if a > 0 else first
+            #Sequential sums, as for daily += updates
+            seg = np.cumsum(np.concatenate([[start], slope[a:b]]))[1:]
+            if floor is not None:
+                #Running sum bounded below by floor each day
+                S = np.cumsum(slope[a:b])
+                low = np.minimum.accumulate(S)
+                bounded = floor + S - np.minimum(floor - start, low)
+                seg = np.where(low >= floor - start, seg, bounded)
+            value[a:b] = seg
+        return value
+
+    def _irrigate(self, io, mykey, airules, wfcrain):
+        """Set the irrigation depth, fw, and ieff for the day.
+
+        Parameters
+        ----------
+        io : ModelState
+            Model state at the start of day io.i
+        mykey : str
+            Year-DOY ('yyyy-ddd') of the day
+        airules : list
+            Compiled autoirrigation conditions
+        wfcrain : list
+            Forecasted precipitation for each autoirrigation set by day
+            offset
+        """
+
+        io.idep = 0.0
+        io.ieff = 100
+        # io.ieff = self.autoirr.aidata.loc[0,'ieff']
+
+        if self.irr is not None:
+            if mykey in self.irr.idata.index:
+                io.idep = self.irr.idata.loc[mykey,'Depth']
+                io.fw = self.irr.idata.loc[mykey,'fw']
+                io.ieff = self.irr.idata.loc[mykey,'ieff']
+
+        #Evaluate autoirrigation conditions and compute amounts
+        for ai in airules:
+            #Evaluate date range and "after last recorded
+            #irrigation" conditions
+            if io.i < ai.istart or io.i > ai.iend:
+                continue
+
+            #Evaluate forecasted precipitation condition
+            fcrain = wfcrain[ai.k][io.i]
+            reduceirr = 0.
+            if fcrain >= ai.fpdep:
+                if ai.fpact == 'cancel':
+                    continue
+                elif ai.fpact == 'reduce':
+                    reduceirr = fcrain
+                elif ai.fpact not in ['proceed']:
+                    continue
+
+            #Evaluate management allowed depletion (mm/mm)
+            if io.fDs <= ai.madDs:
+                continue
+            if io.fDr <= ai.mad:
+                continue
+            if io.Dr >= ai.madDr:
+                continue
+            if io.Vp >= ai.madVp:
+                continue
+
+            #Evaluate critical Ks
+            if io.Ks >= ai.ksc:
+                continue
+
+            #Evaluate days since last irrigation (dsli)
+            if io.i-io.ilast < ai.dsli:
+                continue
+
+            #Evaluate days since last watering event
+            if io.i-io.elast[ai.k] < ai.dsle:
+                continue
+
+            #All conditions were met, need to autoirrigate
+            #Default rate refills Dr and Ds plus the water depth
+            rate = max([0.0, io.Dr + io.Ds + ai.wdpth - reduceirr])
+
+            #Alternatively, the default rate may be modified:
+            #Use a contant rate
+            if ai.useicon:
+                rate = max([0.0, ai.icon - reduceirr])
+            #Target a specific root-zone soil water depletion
+            if ai.useitdr:
+                rate = max([0.0,io.Dr - reduceirr - ai.itdr])
+            #Target a fractional root-zone soil water depletion
+            if ai.useitfdr:
+                itdr2 = io.TAW-io.TAW*(1.0-ai.itfdr)
+                rate = max([0.0,io.Dr - reduceirr - itdr2])
+
+            #Update fraction wetted (fw) for autoirrigation
+            io.fw=ai.fw
+
+            #Specify the final autoirrigation rate
+            io.idep=rate
+            break
+
+    def _track(self, io):
+        """Track the day of the last irrigation and watering events."""
+
+        if io.idep > 0.:
+            io.ilast = io.i
+        wevnt = io.idep - io.irrloss + io.rain - io.runoff
+        for k, evnt in enumerate(io.evnt):
+            if wevnt >= evnt:
+                io.elast[k] = io.i
+
+    def _tally(self, io):
+        """Add the day to the seasonal water balance accumulators."""
+
+        io.sETref += io.ETref
+        io.sETc += io.ETc
+        io.sETcadj += io.ETcadj
+        io.sE += io.E
+        io.sT += io.T
+        io.sDP += io.DP
+        io.sK += io.K
+        io.sRain += io.rain
+        io.sRunoff += io.runoff
+        io.sIrrig += io.idep
+        io.sGross += io.idep + io.idep * 0.3
+        if io.idep > 0:
+            io.nIrrig += 1
+        io.ndays += 1
+
+    def _rootzone(self, io):
+        """Integrate the layered soil profile over the root zone.
+
+        When the roots grow, TAW and the root zone means of thetaFC and
+        thetaWP are read from the cumulative sums of the soil cells at
+        the new root depth, and the depletion below field capacity of
+        the newly rooted soil is added to Dr.
+        """
+
+        lZr = min(io.Zr * 100., self._lgrid[-1])
+        if lZr <= io.lZr:
+            return
+        grid = self._lgrid
+        io.Dr += float(np.interp(lZr, grid, io.ldep) -
+                       np.interp(io.lZr, grid, io.ldep))
+        io.lZr = lZr
+        FC = float(np.interp(lZr, grid, self._lcfc))
+        WP = float(np.interp(lZr, grid, self._lcwp))
+        io.TAW = FC - WP
+        io.thetaFC = FC / (10. * lZr)
+        io.thetaWP = WP / (10. * lZr)
+
+    def _percolate(self, io):
+        """Route deep percolation through the layers below the root zone.
+
+        DP from the root zone fills the soil cells below it to field
+        capacity from the top down; the cells filled are found from the
+        cumulative sum of their deficits. Water left after the deepest
+        cell drains from the profile.
+        """
+
+        k0 = int(io.lZr)
+        th = io.lth[k0:]
+        lfc = self._lfc[k0:]
+        if th.size == 0:
+            return
+        #Deficit below field capacity (mm) of the cells below the roots,
+        #the top cell only for its part below the root zone
+        frac = k0 + 1. - io.lZr
+        need = np.maximum(10. * (lfc - th), 0.)
+        need[0] *= frac
+        cneed = np.cumsum(need)
+        n = int(np.searchsorted(cneed, io.DP, side='right'))
+        th[:n] = np.maximum(th[:n], lfc[:n])
+        if n < th.size:
+            rest = io.DP - (cneed[n-1] if n > 0 else 0.)
+            th[n] += rest / (10. * (frac if n == 0 else 1.))
+        io.ldep = np.concatenate([[0.], np.cumsum(10. * (self._lfc -
+                                                         io.lth))])
+
     def _advance(self, io):
         """Advance the model by one daily timestep. """
 
-        #Basal crop coefficient (Kcb)
+        #Wind speed and minimum relative humidity for Kcmax
         #From FAO-56 Tables 11 and 17
         u2 = io.wndsp * (4.87/math.log(67.8*io.wndht-5.42))
         u2 = sorted([1.0,u2,6.0])[1]
         rhmin = sorted([20.0,io.rhmin,80.0])[1]
 
-        Kcbmid = io.Kcbmid + (0.04*(u2-2.0)-0.004*(rhmin-45.0))*(io.hmax/3.0)**.3
-        # Kcbmid = io.Kcbmid 
-        Kcbend = io.Kcbend + (0.04*(u2-2.0)-0.004*(rhmin-45.0))*(io.hmax/3.0)**.3
-
-        s1 = io.Lini
-        s2 = s1 + io.Ldev
-        s3 = s2 + io.Lmid
-        s4 = s3 + io.Lend
-        if 0<=io.i<=s1:
-            io.tKcb = io.Kcbini
-            io.Kcb = io.Kcbini
-        elif s1<io.i<=s2:
-            io.tKcb += (Kcbmid-io.Kcbini)/(s2-s1)
-            io.Kcb += (Kcbmid-io.Kcbini)/(s2-s1)
-        elif s2<io.i<=s3:
-            io.tKcb = Kcbmid
-            io.Kcb = Kcbmid
-        elif s3<io.i<=s4:
-            io.tKcb += (Kcbmid-Kcbend)/(s3-s4)
-            io.Kcb += (Kcbmid-Kcbend)/(s3-s4)
-        elif s4<io.i:
-            io.tKcb = Kcbend
-            io.Kcb = Kcbend
-        #Overwrite Kcb if updates are available
-        if io.updKcb > 0: io.Kcb = io.updKcb
-        io.Kcb = max([io.Kcbini,io.Kcb])
-
-        #Plant height (h, m)
-        io.h = max([io.hini+(io.hmax-io.hini)*(io.Kcb-io.Kcbini)/
-                    (io.Kcbmid-io.Kcbini),0.001,io.h])
-
-        #Overwrite h if updates are available
-        if io.updh > 0: io.h = io.updh
-
-        # ------------------------------------------------
-        # NOTE: This should be double checked with Gerardo
-        # ------------------------------------------------
-
-        if io.Zr < io.Zrmax and not self.puddled:
-        #Root depth (Zr, m) - FAO-56 page 279; based on Kc <- pyfao original Method
-            # io.Zr = max([io.Zrini + (io.Zrmax-io.Zrini)*(io.tKcb-io.Kcbini)/
-            #              (io.Kcbmid-io.Kcbini),0.001,io.Zr])
-
-        #Root depth (Zr, m) - FAO-56 page 279; based on DOY <- CROPWAT 8.0 method
-            io.Zr = max([io.Zrini + (io.Zrmax-io.Zrini)*io.i/
-                       (io.Lini + io.Ldev),0.001,io.Zr])
-        else:
-            io.Zr = io.Zrmax
-
         #Upper limit crop coefficient (Kcmax) - FAO-56 Eq. 72
         if io.rfcrp == 'S':
             io.Kcmax = max([1.2+(0.04*(u2-2.0)-0.004*(rhmin-45.0))*
@@ -577,8 +1353,6 @@ class Model:
 
         #Canopy cover fraction (fc, 0.0-0.99) - FAO-56 Eq. 76
         fc = sorted([0.0, ((io.Kcb - io.Kcbini) / (io.Kcmax - io.Kcbini))**(1.0 + 0.5 * io.h), 0.99])[1]
-        if not hasattr(io, 'fc'):
-            io.fc = 0.0  # Initialize with a default value
 
         # Ensure io.fc does not decrease
         if fc >= io.fc:
@@ -667,7 +1441,10 @@ class Model:
         io.ETc = io.Kc * io.ETref
 
         # Total available water (TAW, mm) - FAO-56 Eq. 82
-        io.TAW = 1000.0 * (io.thetaFC - io.thetaWP) * io.Zr
+        if io.solmthd == 'L':
+            self._rootzone(io)
+        else:
+            io.TAW = 1000.0 * (io.thetaFC - io.thetaWP) * io.Zr
 
         if self.ponded:
             #Root zone drainable available water (DAW, mm)
@@ -723,48 +1500,168 @@ class Model:
         io.T = (io.Ks * io.Kcb) * io.ETref
         
 
-        # Total soil moisture in puddle (Veff, mm)
-        Veff = io.Veff + effrain + effirr - io.ETcadj - io.DP
-        io.Veff = max([Veff, 0.0])
+        if self.hourly:
+            #Ponded water balance in hourly substeps; DP is the deep
+            #percolation removed during the day
+            io.Veff, io.DPh, io.DP = self._substep(
+                io.Veff, io.DPh, effrain, effirr, io.ETcadj,
+                self._hwrain[io.i], self._hwet[io.i], io.Zr, io.thetaWP,
+                io.thetaS, io.thetaR, io.Ksat, self._kfunc.m,
+                self._kfunc.l, self._kfunc._im, io.TAW, io.DAW, io.Bundh)
+        else:
+            # Total soil moisture in puddle (Veff, mm)
+            Veff = io.Veff + effrain + effirr - io.ETcadj - io.DP
+            io.Veff = max([Veff, 0.0])
 
         # # Modify Ksat based on vanGenuchten and previous Theta0
         io.theta0 = io.Veff/(1000*io.Zr) + io.thetaWP
         io.Se = sorted([0, (io.theta0 - io.thetaR)/ (io.thetaS - io.thetaR), 1])[1]
-        io.K = sorted([0, io.Ksat * io.Se**0.5 * (1 - (1 - io.Se**(1/io.m))**io.m)**2, io.Ksat])[1]
+        io.K = self._kfunc(io.Se, io.Ksat)
+
+        #Water balance methods; ponded soils use the default method only
+        #(solmthd 'D'), non-ponded soils the default or layered soil
+        #method (solmthd 'D' or 'L')
+        if self.ponded and io.solmthd == 'D':
+
+            # Ponding depth (Vp, mm)
+            io.Vp = sorted([0.0, io.Veff - io.DAW - io.TAW, io.Bundh])[1]
+            # Saturation depth (Vs, mm)
+            io.Vs = sorted([0.0, io.Veff - io.Vp - io.TAW, io.DAW])[1]
+            # Residual soil moisture (Vr, mm)
+            io.Vr = sorted([0.0, io.Veff - io.Vp - io.Vs, io.TAW])[1]
+
+            # Deep percolation: If drainable water in
+            if not self.hourly:
+                io.DP = sorted([0.0, io.Vs, io.K])[1]
 
-        #Water balance methods
-        if io.solmthd == 'D':
-            if self.ponded:
+            #Root zone saturated soil water depletion (Ds,mm)
+            io.Ds = max(0.0, io.DAW - io.Vs)
+            #Root zone residual soil water depletion (Dr,mm)
+            io.Dr = max(0.0, io.TAW - io.Vr)
 
-                # Ponding depth (Vp, mm)
-                io.Vp = sorted([0.0, io.Veff - io.DAW - io.TAW, io.Bundh])[1]
-                # Saturation depth (Vs, mm)
-                io.Vs = sorted([0.0, io.Veff - io.Vp - io.TAW, io.DAW])[1]
-                # Residual soil moisture (Vr, mm)
-                io.Vr = sorted([0.0, io.Veff - io.Vp - io.Vs, io.TAW])[1]
+            #Saturation zone soil water depletion fraction (fDr, mm/mm)
+            io.fDs = 1.0 - ((io.DAW - io.Ds) / io.DAW)
 
-                # Deep percolation: If drainable water in
-                io.DP = sorted([0.0, io.Vs, io.K])[1]
 
-                #Root zone saturated soil water depletion (Ds,mm)
-                io.Ds = max(0.0, io.DAW - io.Vs)
-                #Root zone residual soil water depletion (Dr,mm)
-                io.Dr = max(0.0, io.TAW - io.Vr)
+#--- Original Code --------------------------------------------------------
+        elif io.solmthd in ['D','L']:
+            #Deep percolation (DP, mm) - FAO-56 Eq. 88
+            #Boundary layer is considered at the root zone depth (Zr)
+            DP = effrain + effirr - io.ETcadj - io.Dr
+            io.DP = max([DP,0.0])
 
-                #Saturation zone soil water depletion fraction (fDr, mm/mm)
-                io.fDs = 1.0 - ((io.DAW - io.Ds) / io.DAW)
+            #Root zone soil water depletion (Dr,mm) - FAO-56 Eqs.85 & 86
+            Dr = io.Dr - effrain - effirr + io.ETcadj + io.DP
+            io.Dr = sorted([0.0, Dr, io.TAW])[1]
 
+            #Percolation into the soil layers below the root zone
+            if io.solmthd == 'L' and io.DP > 0.0:
+                self._percolate(io)
 
-#--- Original Code --------------------------------------------------------
-            else:
-                #Deep percolation (DP, mm) - FAO-56 Eq. 88
-                #Boundary layer is considered at the root zone depth (Zr)
-                DP = effrain + effirr - io.ETcadj - io.Dr
-                io.DP = max([DP,0.0])
+        #Root zone soil water depletion fraction (fDr, mm/mm)
+        io.fDr = 1.0 - ((io.TAW - io.Dr) / io.TAW)
+
+    def _puddle(self, io):
+        """Advance the model by one daily timestep of land preparation.
+
+        The field is irrigated to saturation until puddling starts
+        par.Puddays days before the end of land preparation, then
+        refilled to Wdpud above saturation whenever the ponded water is
+        gone. K decays exponentially from Ksat while puddling.
+        """
+
+        io.idep = 0.0
+        io.ieff = 100.0
+
+        if io.i < io.Lprp - io.Puddays:
+            io.idep = io.Ds + io.Dr
+        # During puddling irrigate when WD 0, refill to desired level defined in Wdpud
+        elif io.Vp == 0: 
+            io.idep = io.Ds + io.Dr + io.Wdpud
+
+        #Losses due to irrigation inefficiency (irrloss, mm)
+        io.irrloss = io.idep * (1 - io.ieff / 100.)
+
+        #Effective irrigation (mm)
+        effirr = max(0, io.idep - io.irrloss)
+
+        io.runoff = 0 # NOTE: Placeholder
+
+        #Effective precipitation (mm)
+        effrain = max(0, io.rain - io.runoff)
+        
+        # K (mm/day); based on Gerardos code
+        io.K = sorted([io.Ksat**0.33,  # this needs to be confirmed with literature
+                        io.Ksat * math.exp(io.lamb * (io.i + 1 - io.Lprp + io.Puddays)), 
+                        io.Ksat])[1]
+
+
+        #Upper limit crop coefficient (Kcmax) - FAO-56 Eq. 72
+        u2 = io.wndsp * (4.87/math.log(67.8*io.wndht-5.42))
+        u2 = sorted([1.0,u2,6.0])[1]
+        rhmin = sorted([20.0,io.rhmin,80.0])[1]
+
+        io.Kcmax = 1.2+(0.04*(u2-2.0)-0.004*(rhmin-45.0)) * (io.h/3.0)**.3
+        #Exposed & wetted soil fraction (few, 0.01-1.0) - FAO-56 Eq. 75
+        io.few = sorted([0.01,min([1.0-io.fc, io.fw]),1.0])[1]
+
+        #Evaporation reduction coefficient (Kr, 0-1) - FAO-56 Eq. 74
+        # NOTE: The assumption is that soil stays wetted throughout the puddling process
+        io.Kr = 1.0 
+        if io.Dr > 0:
+            io.Kr = sorted([0.0,(io.TEW-io.De)/(io.TEW-io.REW),1.0])[1]
+
+        io.Ke = min([io.Kr*(io.Kcmax-io.Kcb), io.few*io.Kcmax])
+
+        #Soil water evaporation (E, mm) - FAO-56 Eq. 69
+        io.E = io.Ke * io.ETref
+
+        #Deep percolation under exposed soil (DPe, mm) - FAO-56 Eq. 79
+        DPe = effrain + effirr/io.fw - io.De
+        io.DPe = sorted([0.0, DPe, io.K])[1]
+
+        #Cumulative depth of evaporation (De, mm) - FAO-56 Eqs. 77 & 78
+        De = io.De - effrain - effirr/io.fw + io.E/io.fw + io.DPe
+        io.De = sorted([0.0,De,io.TEW])[1]
+
+        #Crop coefficient (Kc) - FAO-56 Eq. 69
+        io.Kc = io.Ke + io.Kcb
+
+        #Non-stressed crop evapotranspiration (ETc, mm) - FAO-56 Eq. 69
+        io.ETc = io.Kc * io.ETref
+
+        #Adjusted crop coefficient (Kcadj) - FAO-56 Eq. 80
+        io.Kcadj = io.Ks * io.Kcb + io.Ke
+
+        #Adjusted crop evapotranspiration (ETcadj, mm) - FAO-56 Eq. 80
+        io.ETcadj = io.Kcadj * io.ETref
+
+        #Adjusted crop transpiration (T, mm)
+        io.T = (io.Ks * io.Kcb) * io.ETref
+
+
+        Veff = io.Veff + effrain + effirr - io.E - io.DP
+        io.Veff = max([Veff, 0.0])
+
+        # Ponding depth (Vp, mm)
+        io.Vp = sorted([0.0, io.Veff - io.DAW - io.TAW, io.Bundh])[1]
+        # Saturation depth (Vs, mm)
+        io.Vs = sorted([0.0, io.Veff - io.Vp - io.TAW, io.DAW])[1]
+        # Residual soil moisture (Vr, mm)
+        io.Vr = sorted([0.0, io.Veff - io.Vp - io.Vs, io.TAW])[1]
+
+        # Deep percolation: If drainable water available
+        io.DP = sorted([0.0, io.Vs + io.Vp, io.K])[1]
+
+        #Root zone saturated soil water depletion (Ds,mm)
+        io.Ds = max(0.0, io.DAW - io.Vs)
+        #Root zone residual soil water depletion (Dr,mm)
+        io.Dr = max(0.0, io.TAW - io.Vr)
+
+        #Root zone soil water depletion fraction (fDr, mm/mm)
+        io.fDr = 1.0 - ((io.TAW - io.Dr) / io.TAW)
 
-                #Root zone soil water depletion (Dr,mm) - FAO-56 Eqs.85 & 86
-                Dr = io.Dr - effrain - effirr + io.ETcadj + io.DP
-                io.Dr = sorted([0.0, Dr, io.TAW])[1]
+        #Saturation zone soil water depletion fraction (fDr, mm/mm)
+        io.fDs = 1.0 - ((io.DAW - io.Ds) / io.DAW)
 
-            #Root zone soil water depletion fraction (fDr, mm/mm)
-            io.fDr = 1.0 - ((io.TAW - io.Dr) / io.TAW)
+        io.theta0 = io.Veff / (1000*io.Zp) + io.thetaWP
@@ -17,16 +17,24 @@ American Society of Civil Engineers, Reston, VA.
 
 The refet.py module contains the following:
     ascedaily - function to compute daily ASCE Standardized Reference ET
+    ascedaily_array - function to compute daily ASCE Standardized
+                      Reference ET for NumPy arrays of daily weather
     ascehourly - function to compute hourly ASCE Std. Reference ET
+    ascehourly_array - function to compute hourly ASCE Std. Reference
+                       ET for NumPy arrays of hourly weather
+    hourly_to_daily - function to sum hourly values to daily totals
 
 01/07/2016 Initial Python script by Kelly Thorp
 11/04/2021 Finalized updates for inclusion in pyfao56 Python package
 08/01/2022 Added the ASCE hourly reference ET algorithm
 08/03/2022 Added functionality to input vapor pressure
+06/28/2025 Added the array version of the daily reference ET algorithm
+06/28/2025 Added the array version of the hourly reference ET algorithm
 ########################################################################
 """
 
 import math
+import numpy as np
 
 def ascedaily(rfcrp,z,lat,doy,israd,tmax,tmin,
               vapr=float('NaN'),tdew=float('NaN'),
@@ -171,6 +179,157 @@ def ascedaily(rfcrp,z,lat,doy,israd,tmax,tmin,
 
     return etsz
 
+def ascedaily_array(rfcrp,z,lat,doy,israd,tmax,tmin,
+                    vapr=float('NaN'),tdew=float('NaN'),
+                    rhmax=float('NaN'),rhmin=float('NaN'),
+                    wndsp=float('NaN'),wndht=2.0):
+    """Compute daily ASCE Standardized Reference ET for arrays of days
+
+    The computations are those of ascedaily, evaluated for all days at
+    once. The daily inputs may be NumPy arrays or scalars that broadcast
+    together, and NaN marks missing data as in ascedaily.
+
+    Parameters
+    ----------
+    rfcrp : str
+        'S' for the short reference crop (0.12-m grass)
+        'T' for the tall reference crop (0.50-m alfalfa)
+    z : float
+        Weather site elevation above mean sea level (m)
+    lat : float
+        Latitude of the weather site (decimal degrees)
+    doy : ndarray
+        Day number of the year between 1 and 366
+    israd : ndarray
+        Incoming solar radiation (MJ m^-2 d^-1)
+    tmax : ndarray
+        Daily maximum air temperature (deg C)
+    tmin : ndarray
+        Daily minimum air temperature (deg C)
+    vapr : ndarray, optional (but recommended)
+        Daily average vapor pressure (kPa) (default = NaN)
+    tdew : ndarray, optional (but recommended)
+        Daily average dew point temperature (deg C) (default = NaN)
+    rhmax : ndarray, optional
+        Daily maximum relative humidity (%) (default = NaN)
+    rhmin : ndarray, optional
+        Daily minimum relative humidity (%) (default = NaN)
+    wndsp : ndarray, optional  (but recommended)
+        Daily average wind speed (m s^-1) (default = NaN)
+    wndht : float, optional (but recommended)
+        Height of wind measurement above the ground (m) (default = 2.0)
+
+    Returns
+    -------
+    etsz  : ndarray
+        Daily standardized reference evapotranspiration for the
+        short or tall reference crop (mm)
+    """
+
+    doy, israd, tmax, tmin, vapr, tdew, rhmax, rhmin, wndsp = \
+        np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in
+                              [doy, israd, tmax, tmin, vapr, tdew,
+                               rhmax, rhmin, wndsp]])
+
+    #tavg : Mean daily air temperature (deg C)
+    #ASCE (2005) Eq. 2
+    tavg = (tmax+tmin)/2.0
+
+    #patm (float) : Mean atmospheric pressure at weather station (kPa)
+    #ASCE (2005) Eq. 3
+    patm = 101.3*((293.0-0.0065*z)/293.0)**5.26
+
+    #psycon (float) : Psychrometric constant (kPa (deg C)^-1)
+    #ASCE (2005) Eq. 4
+    psycon = 0.000665*patm
+
+    #Udelta : Slope of the saturation vapor pressure
+    #temperature curve (kPa (deg C)^-1)
+    #ASCE (2005) Eq. 5
+    Udelta = 2503.0*np.exp(17.27*tavg/(tavg+237.3))
+    Udelta = Udelta/((tavg+237.3)**2.0)
+
+    #es : Saturation vapor pressure (kPa)
+    #ASCE (2005) Eqs. 6 and 7
+    emax = 0.6108*np.exp((17.27*tmax)/(tmax+237.3))
+    emin = 0.6108*np.exp((17.27*tmin)/(tmin+237.3))
+    es = (emax+emin)/2.0
+
+    #ea : Actual vapor pressure (kPa) ASCE (2005) Table 3
+    #The first available input of each day is used, as in ascedaily
+    hasvapr = ~np.isnan(vapr)
+    hastdew = ~np.isnan(tdew)
+    hasrhmax = ~np.isnan(rhmax)
+    hasrhmin = ~np.isnan(rhmin)
+    #ASCE (2005) Appendix E
+    tdew = np.where(hastdew, tdew, tmin - 2.0)
+    #ASCE (2005) Eq. 8
+    ea = 0.6108*np.exp((17.27*tdew)/(tdew+237.3))
+    #ASCE (2005) Eq. 13
+    ea = np.where(hasrhmin & ~hastdew, emax*rhmin/100., ea)
+    #ASCE (2005) Eq. 12
+    ea = np.where(hasrhmax & ~hastdew, emin*rhmax/100., ea)
+    #ASCE (2005) Eq. 11
+    ea = np.where(hasrhmax & hasrhmin & ~hastdew,
+                  (emin*rhmax/100. + emax*rhmin/100.)/2.0, ea)
+    #ASCE (2005) Table 3
+    ea = np.where(hasvapr, vapr, ea)
+
+    #rns : Net shortwave radiation (MJ m^-2 d^-1)
+    #ASCE (2005) Eq. 16
+    albedo = 0.23
+    rns = (1.0-albedo)*israd
+
+    #ra : Extraterrestrial radiation (MJ m^-2 d^-1)
+    #ASCE (2005) Eqs. 21-27
+    latrad = lat*math.pi/180.0 #Eq. 22
+    dr = 1.0+0.033*np.cos(2.0*math.pi/365.0*doy) #Eq. 23
+    ldelta = 0.409*np.sin(2.0*math.pi/365.0*doy-1.39) #Eq. 24
+    ws = np.arccos(-1.0*math.tan(latrad)*np.tan(ldelta)) #Eq. 27
+    ra1 = ws*math.sin(latrad)*np.sin(ldelta) #Eq. 21
+    ra2 = math.cos(latrad)*np.cos(ldelta)*np.sin(ws) #Eq. 21
+    ra = 24.0/math.pi*4.92*dr*(ra1+ra2) #Eq. 21
+
+    #rso : Clear sky solar radiation (MJ m^-2 d^-1)
+    #ASCE (2005) Eq. 19
+    rso = (0.75+2e-5*z)*ra
+
+    #rnl : Net longwave radiation (MJ m^-2 d^-1)
+    #ASCE (2005) Eqs. 17 and 18
+    ratio = np.clip(israd/rso, 0.3, 1.0)
+    fcd = np.clip(1.35*ratio-0.35, 0.05, 1.0) #Eq. 18
+    tk4 = ((tmax+273.16)**4.0+(tmin+273.16)**4.0)/2.0 #Eq. 17
+    rnl = 4.901e-9*fcd*(0.34-0.14*np.sqrt(ea))*tk4 #Eq. 17
+
+    #rn : Net radiation (MJ m^-2 d^-1)
+    #ASCE (2005) Eq. 15
+    rn = rns-rnl
+
+    #g (float) : Soil heat flux (MJ m^-2 d^-1)
+    #ASCE (2005) Eq. 30
+    g = 0.0
+
+    #u2 : Wind profile relationship (m s^-1)
+    #ASCE (2005) Eq. 33 and Appendix E
+    wndsp = np.where(np.isnan(wndsp), 2.0, wndsp)
+    u2 = wndsp * (4.87/math.log(67.8*wndht-5.42))
+
+    #Aerodynamic roughness and surface resistance constants
+    #ASCE (2005) Table 1
+    if rfcrp == 'S': #Short reference crop (0.12-m grass)
+        Cn = 900.0  #K mm s^3 Mg^-1 d^-1
+        Cd = 0.34   #s m^-1
+    elif rfcrp == 'T': #Tall reference crop (0.50-m alfalfa)
+        Cn = 1600.0 #K mm s^3 Mg^-1 d^-1
+        Cd = 0.38   #s m^-1
+
+    #etsz : Standardized daily reference crop ET (mm d^-1)
+    #ASCE (2005) Eq. 1
+    etsz = 0.408*Udelta*(rn-g)+psycon*(Cn/(tavg+273.0))*u2*(es-ea)
+    etsz = etsz/(Udelta+psycon*(1.0+Cd*u2))
+
+    return etsz
+
 def ascehourly(rfcrp,z,lat,lon,lzn,doy,sct,israd,tavg,vapr=float('NaN'),
                tdew=float('NaN'),rhum=float('NaN'),tmin=float('NaN'),               
                wndsp=float('NaN'),wndht=2.0,tl=1.0,csreq='D',fcdpt=1.0):
@@ -357,3 +516,217 @@ def ascehourly(rfcrp,z,lat,lon,lzn,doy,sct,israd,tavg,vapr=float('NaN'),
     etsz = etsz/(Udelta+psycon*(1.0+Cd*u2))
 
     return (etsz, fcd)
+
+def ascehourly_array(rfcrp,z,lat,lon,lzn,doy,sct,israd,tavg,
+                     vapr=float('NaN'),tdew=float('NaN'),
+                     rhum=float('NaN'),tmin=float('NaN'),
+                     wndsp=float('NaN'),wndht=2.0,tl=1.0,csreq='D',
+                     fcdpt=1.0):
+    """Compute hourly ASCE Standardized Reference ET for arrays of hours
+
+    The computations are those of ascehourly, evaluated for all hours
+    at once. The hourly inputs may be NumPy arrays or scalars that
+    broadcast together, and NaN marks missing data as in ascehourly.
+    The hours must be in time order: at night, the cloudiness (fcd) of
+    the last daytime hour is carried forward, as when ascehourly is
+    called hour by hour with fcdpt from the previous call.
+
+    Parameters
+    ----------
+    rfcrp : str
+        'S' for the short reference crop (0.12-m grass)
+        'T' for the tall reference crop (0.50-m alfalfa)
+    z : float
+        Weather site elevation above mean sea level (m)
+    lat : float
+        Latitude of the weather site (decimal degrees)
+    lon : float
+        Longitude of the weather site (decimal degrees)
+    lzn : float
+        Longitude of the center of the local time zone (decimal degrees)
+    doy : ndarray
+        Day number of the year between 1 and 366
+    sct : ndarray
+        Standard clock time at the midpoint of the period (h)
+    israd : ndarray
+        Incoming solar radiation (MJ m^-2 h^-1)
+    tavg : ndarray
+        Average air temperature (deg C)
+    vapr : ndarray, optional (but recommended)
+        Average vapor pressure (kPa) (default = NaN)
+    tdew : ndarray, optional (but recommended)
+        Average dew point temperature (deg C) (default = NaN)
+    rhum : ndarray, optional
+        Average relative humidity (%) (default = NaN)
+    tmin : ndarray, optional
+        Daily minimum air temperature (deg C) (default = NaN)
+    wndsp : ndarray, optional  (but recommended)
+        Average wind speed (m s^-1) (default = NaN)
+    wndht : float, optional (but recommended)
+        Height of wind measurement above the ground (m) (default = 2.0)
+    tl : float, optional
+        Length of the calculation period (h) (default = 1.0)
+    csreq : str, optional
+        'S' for the simple Eq. 47 for clear sky solar radiation
+        'D' for the complex method in Appendix D (default = 'D')
+    fcdpt : float, optional
+        Cloudiness value (fcd) before the first hour (default = 1.0)
+
+    Returns
+    -------
+    etsz : ndarray
+        Hourly standardized reference evapotranspiration for the
+        short or tall reference crop (mm)
+    fcd : ndarray
+        Cloudiness value of each hour
+    """
+
+    doy, sct, israd, tavg, vapr, tdew, rhum, tmin, wndsp = \
+        np.broadcast_arrays(*[np.atleast_1d(np.asarray(x, dtype=float))
+                              for x in [doy, sct, israd, tavg, vapr,
+                                        tdew, rhum, tmin, wndsp]])
+
+    #patm (float) : Mean atmospheric pressure at weather station (kPa)
+    #ASCE (2005) Eq. 34
+    patm = 101.3*((293.0-0.0065*z)/293.0)**5.26
+
+    #psycon (float) : Psychrometric constant (kPa (deg C)^-1)
+    #ASCE (2005) Eq. 35
+    psycon = 0.000665*patm
+
+    #Udelta : Slope of the saturation vapor pressure
+    #temperature curve (kPa (deg C)^-1)
+    #ASCE (2005) Eq. 36
+    Udelta = 2503.0*np.exp(17.27*tavg/(tavg+237.3))
+    Udelta = Udelta/((tavg+237.3)**2.0)
+
+    #es : Saturation vapor pressure (kPa)
+    #ASCE (2005) Eq. 37
+    es = 0.6108*np.exp((17.27*tavg)/(tavg+237.3))
+
+    #ea : Actual vapor pressure (kPa) ASCE (2005) Table 4
+    #The first available input of each hour is used, as in ascehourly
+    hastdew = ~np.isnan(tdew)
+    #ASCE (2005) Appendix E
+    tdew = np.where(hastdew, tdew, tmin - 2.0)
+    #ASCE (2005) Eq. 38
+    ea = 0.6108*np.exp((17.27*tdew)/(tdew+237.3))
+    #ASCE (2005) Eq. 41
+    ea = np.where(~np.isnan(rhum) & ~hastdew, es*rhum/100., ea)
+    #ASCE (2005) Table 4
+    ea = np.where(~np.isnan(vapr), vapr, ea)
+
+    #rns : Net shortwave radiation (MJ m^-2 h^-1)
+    #ASCE (2005) Eq. 43
+    albedo = 0.23
+    rns = (1.0-albedo)*israd
+
+    #ra : Extraterrestrial radiation (MJ m^-2 h^-1)
+    #ASCE (2005) Eqs. 48-58
+    dr = 1.0+0.033*np.cos(2.0*math.pi/365.0*doy) #Eq. 50
+    ldelta = 0.409*np.sin(2.0*math.pi/365.0*doy-1.39) #Eq. 51
+    b = 2.0*math.pi*(doy-81.0)/364.0 #Eq. 58
+    sc = 0.1645*np.sin(2.0*b)-0.1255*np.cos(b)-0.025*np.sin(b) #57
+    wmid = math.pi/12.0*((sct+0.06667*(lzn-lon)+sc)-12.) #Eq. 55
+    w1 = wmid-math.pi*tl/24.0 #Eq. 53
+    w2 = wmid+math.pi*tl/24.0 #Eq. 54
+    latrad = lat*math.pi/180.0 #Eq. 49
+    ws = np.arccos(-1.0*math.tan(latrad)*np.tan(ldelta)) #Eq. 59
+    w1 = np.maximum(w1, -1.0*ws) #Eq. 56
+    w2 = np.maximum(w2, -1.0*ws) #Eq. 56
+    w1 = np.minimum(w1, ws) #Eq. 56
+    w2 = np.minimum(w2, ws) #Eq. 56
+    w1 = np.minimum(w1, w2) #Eq. 56
+    ra1 = (w2-w1)*math.sin(latrad)*np.sin(ldelta) #Eq. 48
+    ra2 = math.cos(latrad)*np.cos(ldelta) #Eq. 48
+    ra3 = np.sin(w2)-np.sin(w1) #Eq. 48
+    ra = 12.0/math.pi*4.92*dr*(ra1+ra2*ra3) #Eq. 48
+    ra = np.where((wmid < -1.0*ws) | (wmid > ws), 0.0, ra)
+
+    #rso : Clear sky solar radiation (MJ m^-2 h^-1)
+    #ASCE (2005) Eq. 47 and Appendix D
+    beta1 = math.sin(latrad)*np.sin(ldelta)
+    beta2 = math.cos(latrad)*np.cos(ldelta)*np.cos(wmid)
+    beta = np.arcsin(beta1+beta2) #Eq. 62 or D.6
+    if csreq == 'S':
+        rso = (0.75+2e-5*z)*ra #Eq. 47
+    else:
+        #Evaluated where the sun is high enough, zero elsewhere
+        high = beta >= 0.3
+        sinb = np.sin(np.where(high, beta, 0.3))
+        pwat = 0.14*ea*patm+2.1 #Eq. D.3
+        kt = 1.0
+        kb1 = -0.00146*patm/(kt*sinb)
+        kb2 = 0.075*(pwat/sinb)**0.4
+        kb = 0.98*np.exp(kb1-kb2) #Eq. D.2
+        kd = np.where(kb >= 0.15, 0.35-0.36*kb, 0.18+0.82*kb) #Eq. D.4
+        rso = np.where(high, (kb + kd)*ra, 0.0) #Eq. D.1
+
+    #rnl : Net longwave radiation (MJ m^-2 h^-1)
+    #ASCE (2005) Eqs. 44, 45, and 62
+    day = ~((beta < 0.3) | (rso <= 0.0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.clip(israd/rso, 0.3, 1.0) #Eq. 45
+    fcd = np.clip(1.35*ratio-0.35, 0.05, 1.0) #Eq. 45
+    #Nighttime hours take fcd from the last daytime hour
+    last = np.maximum.accumulate(np.where(day, np.arange(day.size), -1))
+    fcd = np.where(last >= 0, fcd[np.maximum(last, 0)], fcdpt)
+    tk4 = (tavg+273.16)**4.0 #Eq. 44
+    rnl = 2.042e-10*fcd*(0.34-0.14*np.sqrt(ea))*tk4 #Eq. 44
+
+    #rn : Net radiation (MJ m^-2 h^-1)
+    #ASCE (2005) Eq. 42
+    rn = rns-rnl
+
+    #g : Soil heat flux (MJ m^-2 h^-1)
+    #ASCE (2005) Eqs. 65 and 66
+    #Aerodynamic roughness and surface resistance constants
+    #ASCE (2005) Table 1
+    night = rn < 0.0
+    if rfcrp == 'S': #Short reference crop (0.12-m grass)
+        Cn = 37.0 #K mm s^3 Mg^-1 h^-1
+        g = np.where(night, 0.5*rn, 0.1*rn)
+        Cd = np.where(night, 0.96, 0.24) #!s m^-1
+    elif rfcrp == 'T': #Tall reference crop (0.50-m alfalfa)
+        Cn = 66.0 #K mm s^3 Mg^-1 h^-1
+        g = np.where(night, 0.2*rn, 0.04*rn)
+        Cd = np.where(night, 1.7, 0.25) #!s m^-1
+
+    #u2 : Wind profile relationship (m s^-1)
+    #ASCE (2005) Eq. 67 and Appendix E
+    wndsp = np.where(np.isnan(wndsp), 2.0, wndsp)
+    u2 = wndsp * (4.87/math.log(67.8*wndht-5.42))
+
+    #etsz : Standardized hourly reference crop ET (mm h^-1)
+    #ASCE (2005) Eq. 1
+    etsz = 0.408*Udelta*(rn-g)+psycon*(Cn/(tavg+273.0))*u2*(es-ea)
+    etsz = etsz/(Udelta+psycon*(1.0+Cd*u2))
+
+    return (etsz, fcd)
+
+def hourly_to_daily(day,values):
+    """Sum hourly values to daily totals
+
+    Parameters
+    ----------
+    day : ndarray
+        Day label of each hour, e.g., Year-DOY strings ('yyyy-ddd') or
+        integers (year*1000+doy)
+    values : ndarray
+        Hourly values, e.g., hourly reference ET (mm)
+
+    Returns
+    -------
+    days : ndarray
+        Sorted unique day labels
+    totals : ndarray
+        Daily totals of values, NaN for days with any missing hour
+    counts : ndarray
+        Number of hours of each day
+    """
+
+    days, inverse, counts = np.unique(np.asarray(day), return_inverse=True,
+                                      return_counts=True)
+    totals = np.bincount(inverse, weights=np.asarray(values, dtype=float),
+                         minlength=days.size)
+    return (days, totals, counts)
@@ -15,11 +15,13 @@ The soil_profile.py module contains the following:
 
 08/10/2022 Initial Python functions developed by Josh Brekel, USDA-ARS
 09/27/2022 Finalized updates for inclusion in the pyfao56 Python package
+06/29/2025 Read the soil profile data block in one vectorized pass
 ########################################################################
 """
 
 import pandas as pd
 import datetime
+import io
 
 class SoilProfile:
     """A class for managing layered soil profile data in pyfao56.
@@ -155,13 +157,15 @@ class SoilProfile:
                 ts = lines[3].strip().split('stamp:')[1].strip()
                 ts = datetime.datetime.strptime(ts,'%m/%d/%Y %H:%M:%S')
                 self.tmstmp = ts
-            for line in lines[endast+2:]:
-                line = line.strip().split()
-                depth = int(line[0])
-                data = list()
-                for i in list(range(1, 4)):
-                    data.append(float(line[i]))
-                self.sdata.loc[depth] = data
+            text = ''.join(lines[endast+2:])
+            if text.strip():
+                dtypes = {cname: float for cname in self.cnames}
+                dtypes['Depth'] = int
+                sdata = pd.read_csv(io.StringIO(text), sep=r'\s+',
+                                    header=None, dtype=dtypes,
+                                    names=['Depth'] + self.cnames)
+                sdata.index = pd.Index(sdata['Depth'].to_numpy())
+                self.sdata = sdata[self.cnames]
 
     def customload(self):
         """Override this function to customize loading soil data."""
@@ -0,0 +1,338 @@
+"""
+########################################################################
+The sweep.py module contains the Sweep class, which evaluates many
+autoirrigation scenarios of one FAO-56 Model setup by sharing the
+simulation days that the scenarios have in common.
+
+The sweep.py module contains the following:
+    Sweep - A class for running one Model setup with several
+            AutoIrrigate objects, forking the model state only on days
+            when the autoirrigation decisions differ
+
+Scenarios differ only in their autoirrigation conditions, so two
+scenarios follow the same trajectory until the first day their
+irrigation decisions differ. Sweep runs the first scenario with Model
+and keeps its daily states. Each further scenario is checked against
+those states day by day, by evaluating its conditions with
+Model._irrigate. At the first day with a different decision, the
+scenario is continued with Model from the saved state of the day before.
+Scenarios that take the same decision on that day share the new branch
+too.
+
+06/26/2025 Initial sweep over autoirrigation scenarios
+########################################################################
+"""
+
+import pandas as pd
+import datetime
+from .model import Model
+
+class Sweep:
+    """A class for autoirrigation sweeps that share simulation days.
+
+    Attributes
+    ----------
+    startDate : datetime
+        Simulation start date
+    endDate : datetime
+        Simulation end date
+    par : Parameters object
+        Parameter data shared by all scenarios
+    wth : Weather object
+        Weather data shared by all scenarios
+    autoirrs : list
+        AutoIrrigate object of each scenario
+    irr : Irrigation object
+        Irrigation data shared by all scenarios
+    upd : Update object
+        State variable updates shared by all scenarios
+    ponded, puddled, roff, cons_p, aq_Ks, jit, summary : bool
+        Model options shared by all scenarios, see Model
+    nscen : int
+        Number of scenarios
+    forks : DataFrame
+        For each scenario, the scenario it follows until it forks
+        ('Parent', -1 for the first scenario), the Year-DOY of the first
+        day simulated separately ('Fork', None if it never forks), and
+        the number of days simulated separately ('Days')
+    swbdata : DataFrame
+        Seasonal water balance data, one row per scenario (see
+        Model.swbdata)
+
+    Methods
+    -------
+    run()
+        Conduct the simulations and update self.forks and self.swbdata
+    getodata(k)
+        Return the daily outputs of scenario k as in Model.odata
+    """
+
+    class Branch:
+        """A trajectory simulated by one Model run.
+
+        Attributes
+        ----------
+        mdl : Model
+            Model run of the branch from its first day to the end
+        k : int
+            Scenario that created the branch
+        start : int
+            Season day offset of the first day of the branch
+        parent : Branch
+            Branch followed before the first day (None for the root)
+        children : dict
+            Branches forked from this one, keyed by the season day of
+            the fork and the irrigation decision taken on that day
+        rules, fcrain : list
+            Compiled autoirrigation conditions and forecasted
+            precipitation of scenario k
+        keys : list
+            Year-DOY of each season day offset
+        states : dict
+            Model state at the end of each day from the day before
+            start, by season day offset
+        decisions : dict
+            Irrigation decision of scenario k by season day offset
+        ios : dict
+            ModelState objects built from states for evaluating
+            decisions, by season day offset
+        """
+
+        __slots__ = ('mdl','k','start','parent','children','rules',
+                     'fcrain','keys','states','decisions','ios')
+
+    def __init__(self, start, end, par, wth, autoirr, irr=None, upd=None,
+                 ponded=False, puddled=False, roff=False, cons_p=False,
+                 aq_Ks=False, jit=False, summary=False, comment=''):
+        """Initialize the Sweep class attributes.
+
+        Parameters
+        ----------
+        start : str
+            Simulation start year and doy ('yyyy-ddd')
+        end : str
+            Simulation end year and doy ('yyyy-ddd')
+        par : Parameters object
+            Parameter data
+        wth : Weather object
+            Weather data
+        autoirr : sequence of AutoIrrigate objects
+            Autoirrigation conditions, one object per scenario
+        irr : Irrigation object, optional
+            Irrigation data (default = None)
+        upd : Update object, optional
+            State variable updates (default = None)
+        ponded, puddled, roff, cons_p, aq_Ks, jit, summary : bool
+            Model options, see Model (default = False)
+        comment : str, optional
+            User-defined file descriptions or metadata (default = '')
+        """
+
+        self.startDate = datetime.datetime.strptime(start, '%Y-%j')
+        self.endDate = datetime.datetime.strptime(end, '%Y-%j')
+        self.par = par
+        self.wth = wth
+        self.autoirrs = list(autoirr)
+        self.irr = irr
+        self.upd = upd
+        self.ponded = ponded
+        self.puddled = puddled
+        self.roff = roff
+        self.cons_p = cons_p
+        self.aq_Ks = aq_Ks
+        self.jit = jit
+        self.summary = summary
+        self.nscen = len(self.autoirrs)
+        self.comment = comment
+        self.tmstmp = datetime.datetime.now()
+        self.forks = pd.DataFrame()
+        self.swbdata = pd.DataFrame()
+        self._branches = []
+        self._rules = []
+
+    def _simulate(self, k, state=None, first=0):
+        """Run scenario k with Model from season day first.
+
+        Parameters
+        ----------
+        k : int
+            Scenario to simulate
+        state : dict, optional
+            Model state at the end of the day before first (default =
+            None, i.e., start of the season)
+        first : int, optional
+            Season day offset of the first day (default = 0)
+
+        Returns
+        -------
+        branch : Branch
+            The new branch with its daily model states
+        """
+
+        ndays = (self.endDate - self.startDate).days + 1
+        keys = pd.date_range(self.startDate - datetime.timedelta(days=1),
+                             periods=ndays+1, freq='D').strftime('%Y-%j')
+        keys = keys.tolist()
+        mdl = Model(keys[first+1], self.endDate.strftime('%Y-%j'),
+                    self.par, self.wth, irr=self.irr,
+                    autoirr=self.autoirrs[k], upd=self.upd,
+                    ponded=self.ponded, puddled=self.puddled,
+                    roff=self.roff, cons_p=self.cons_p, aq_Ks=self.aq_Ks,
+                    jit=self.jit, summary=self.summary, state=state,
+                    snapdays=keys[first:], comment=self.comment)
+        mdl.run()
+
+        branch = self.Branch()
+        branch.mdl = mdl
+        branch.k = k
+        branch.start = first
+        branch.parent = None
+        branch.children = {}
+        branch.rules, branch.fcrain = self._rules[k]
+        branch.keys = keys[1:]
+        #Daily states by season day offset, from the day before first
+        branch.states = {mdl.snapshots[key]['i']: mdl.snapshots[key]
+                         for key in keys[first:]}
+        branch.decisions = {}
+        branch.ios = {}
+        return branch
+
+    def _compile(self):
+        """Compile the autoirrigation conditions of all scenarios.
+
+        Returns
+        -------
+        rules : list
+            Compiled autoirrigation conditions and forecasted
+            precipitation by day offset for each scenario
+        """
+
+        lastirr = None
+        if self.irr is not None and not self.irr.idata.empty:
+            lastirr = self.irr.getlastdate()
+        rules = [[] if ai is None else ai.compile(self.startDate, lastirr)
+                 for ai in self.autoirrs]
+        fcrain = self.wth.getfcrain(self.startDate, self.endDate,
+                                    [ai.fpday for r in rules for ai in r])
+        fcrain = {fpday: fc.tolist() for fpday, fc in fcrain.items()}
+        return [(r, [fcrain[ai.fpday] for ai in r]) for r in rules]
+
+    def _decide(self, branch, i, rules, fcrain, elast):
+        """Return the irrigation decision for season day i on a branch.
+
+        Parameters
+        ----------
+        branch : Branch
+            Branch providing the model state at the start of day i
+        i : int
+            Season day offset
+        rules, fcrain : list
+            Compiled autoirrigation conditions and forecasted
+            precipitation of the scenario
+        elast : list
+            Day of the last watering event for each rule of the scenario
+
+        Returns
+        -------
+        decision : tuple
+            Irrigation depth and fraction wetted (fw) of the day
+        """
+
+        state = branch.states[i-1]
+        io = branch.ios.get(i)
+        if io is None:
+            io = Model.ModelState()
+            for name, value in state.items():
+                setattr(io, name, value)
+            io.i = i
+            branch.ios[i] = io
+        io.fw = state['fw']
+        io.evnt = [ai.evnt for ai in rules]
+        io.elast = list(elast)
+        branch.mdl._irrigate(io, branch.keys[i], rules, fcrain)
+        return (io.idep, io.fw)
+
+    def run(self):
+        """Conduct the simulations, update self.forks and self.swbdata"""
+
+        ndays = (self.endDate - self.startDate).days + 1
+        self._rules = self._compile()
+        self._branches = []
+        rows = []
+        root = None
+        for k in range(self.nscen):
+            if root is None:
+                root = self._simulate(k)
+                self._branches.append(root)
+                rows.append([-1, None, ndays])
+                continue
+
+            #Follow the existing branches while the decisions agree
+            rules, fcrain = self._rules[k]
+            elast = [-1] * len(rules)
+            branch = root
+            i = 0
+            fork = None
+            while i < ndays:
+                if i not in branch.decisions:
+                    state = branch.states[i-1]
+                    branch.decisions[i] = self._decide(
+                        branch, i, branch.rules, branch.fcrain,
+                        state['elast'])
+                decision = self._decide(branch, i, rules, fcrain, elast)
+                if decision != branch.decisions[i]:
+                    child = branch.children.get((i, decision))
+                    if child is None:
+                        fork = i
+                        break
+                    branch = child
+                #Track watering events of the scenario on day i
+                state = branch.states[i]
+                wevnt = (state['idep'] - state['irrloss'] +
+                         state['rain'] - state['runoff'])
+                for j, ai in enumerate(rules):
+                    if wevnt >= ai.evnt:
+                        elast[j] = i
+                i += 1
+
+            if fork is None:
+                #The scenario never forks from the branch
+                self._branches.append(branch)
+                rows.append([branch.k, None, 0])
+                continue
+
+            #Continue the scenario from the state before the fork day
+            state = dict(branch.states[fork-1])
+            state['evnt'] = [ai.evnt for ai in rules]
+            state['elast'] = list(elast)
+            child = self._simulate(k, state, fork)
+            child.parent = branch
+            branch.children[(fork, decision)] = child
+            self._branches.append(child)
+            rows.append([branch.k, child.keys[fork], ndays - fork])
+
+        self.forks = pd.DataFrame(rows, columns=['Parent','Fork','Days'])
+        self.swbdata = pd.DataFrame([b.mdl.swbdata for b in
+                                     self._branches])
+
+    def getodata(self, k):
+        """Return the daily outputs of scenario k as in Model.odata.
+
+        Parameters
+        ----------
+        k : int
+            Scenario index (0 to nscen-1)
+
+        Returns
+        -------
+        odata : DataFrame
+            Daily outputs indexed by Year-DOY ('yyyy-ddd')
+        """
+
+        branch = self._branches[k]
+        frames = [branch.mdl.odata]
+        while branch.parent is not None:
+            end = branch.start
+            branch = branch.parent
+            frames.append(branch.mdl.odata.iloc[:end-branch.start])
+        return pd.concat(frames[::-1])
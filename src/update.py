@@ -8,11 +8,13 @@ The update.py module contains the following:
         calculations
 
 11/17/2021 Finalized updates for inclusion in the pyfao56 Python package
+06/29/2025 Read the update data block in one vectorized pass
 ########################################################################
 """
 
 import pandas as pd
 import datetime
+import io
 
 class Update:
     """A class for managing update data for FAO-56 calculations.
@@ -141,13 +143,16 @@ class Update:
                 ts = datetime.datetime.strptime(ts,'%m/%d/%Y %H:%M:%S')
                 self.tmstmp = ts
             self.udata = pd.DataFrame(columns=['Kcb','h','fc'])
-            for line in lines[endast+2:]:
-                line = line.strip().split()
-                year = line[0][:4]
-                doy = line[0][-3:]
-                key = '{:04d}-{:03d}'.format(int(year),int(doy))
-                self.udata.loc[key] = [float(line[1]),float(line[2]),
-                                       float(line[3])]
+            text = ''.join(lines[endast+2:])
+            if text.strip():
+                udata = pd.read_csv(io.StringIO(text), sep=r'\s+',
+                                    header=None,
+                                    names=['Year-DOY','Kcb','h','fc'],
+                                    dtype={'Year-DOY': str, 'Kcb': float,
+                                           'h': float, 'fc': float})
+                keys = udata['Year-DOY'].str
+                udata.index = pd.Index(keys[:4] + '-' + keys[-3:])
+                self.udata = udata[['Kcb','h','fc']]
 
     def customload(self):
         """Override this function to customize loading update data."""
@@ -0,0 +1,110 @@
+"""
+########################################################################
+The vangenuchten.py module contains tools for evaluating the unsaturated
+hydraulic conductivity of the van Genuchten-Mualem model, as used for
+the percolation of ponded rice soils in pyfao56.
+
+van Genuchten, M. Th., 1980. A closed-form equation for predicting the
+hydraulic conductivity of unsaturated soils. Soil Science Society of
+America Journal 44(5):892-898.
+
+The vangenuchten.py module contains the following:
+    Conductivity - A class for evaluating K(Se) for a given set of
+                   shape parameters, shared among all soils and
+                   scenarios with the same parameters
+
+06/24/2025 Initial shared van Genuchten conductivity evaluator
+########################################################################
+"""
+
+import numpy as np
+
+class Conductivity:
+    """A class for evaluating van Genuchten-Mualem conductivity.
+
+    K = Ksat * Se**l * (1 - (1 - Se**(1/m))**m)**2, with m = 1 - 1/n.
+    The exponents depend only on n and l, so they are computed once and
+    the evaluator is shared through get(). Se at or beyond the bounds
+    returns 0 or Ksat without evaluating the powers, which covers most
+    days of a saturated ponded soil.
+
+    Attributes
+    ----------
+    n : float
+        van Genuchten shape parameter n
+    m : float
+        van Genuchten shape parameter m (1 - 1/n)
+    l : float
+        Pore connectivity parameter
+
+    Methods
+    -------
+    get(n,l=0.5)
+        Return a shared evaluator for n and l, creating it if needed
+    """
+
+    _shared = {}
+
+    def __init__(self, n, l=0.5):
+        """Initialize the Conductivity class attributes.
+
+        Parameters
+        ----------
+        n : float
+            van Genuchten shape parameter n (m = 1 - 1/n)
+        l : float, optional
+            Pore connectivity parameter (default = 0.5)
+        """
+
+        self.n = n
+        self.m = 1 - 1/n
+        self.l = l
+        self._im = 1/self.m
+
+    def __call__(self, Se, Ksat):
+        """Return K(Se), limited to the range 0 to Ksat.
+
+        Parameters
+        ----------
+        Se : float or ndarray
+            Effective saturation (0-1)
+        Ksat : float or ndarray
+            Saturated hydraulic conductivity (mm/d)
+
+        Returns
+        -------
+        K : float or ndarray
+            Unsaturated hydraulic conductivity (mm/d)
+        """
+
+        if isinstance(Se, np.ndarray):
+            K = Ksat * Se**self.l * (1 - (1 - Se**self._im)**self.m)**2
+            return np.clip(K, 0, Ksat)
+        if Se <= 0:
+            return 0.0
+        if Se >= 1:
+            return Ksat
+        K = Ksat * Se**self.l * (1 - (1 - Se**self._im)**self.m)**2
+        return sorted([0, K, Ksat])[1]
+
+    @classmethod
+    def get(cls, n, l=0.5):
+        """Return a shared evaluator for n and l, creating it if needed.
+
+        Parameters
+        ----------
+        n : float
+            van Genuchten shape parameter n
+        l : float, optional
+            Pore connectivity parameter (default = 0.5)
+
+        Returns
+        -------
+        kfunc : Conductivity
+            The memoized evaluator for (n, l)
+        """
+
+        key = (float(n), float(l))
+        if key not in cls._shared:
+            cls._shared[key] = cls(n, l)
+        return cls._shared[key]
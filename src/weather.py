@@ -10,12 +10,21 @@ The weather.py module contains the following:
 01/07/2016 Initial Python functions developed by Kelly Thorp
 11/04/2021 Finalized updates for inclusion in the pyfao56 Python package
 08/03/2022 Added an input variable for measured vapor pressure
+06/27/2025 Added hourly weather data for the hourly ponded timestep
+06/28/2025 Added a cached bulk fill of missing reference ET
+06/29/2025 Read the daily weather data block in one vectorized pass
+06/30/2025 Added a binary cache of wdata for its source file
 ########################################################################
 """
 
 import pandas as pd
+import numpy as np
 from . import refet
 import datetime
+import io
+import os
+import json
+import hashlib
 
 class Weather:
     """A class for managing weather data for FAO-56 calculations.
@@ -34,6 +43,11 @@ class Weather:
         Weather station latitude (decimal degrees)
     wndht : float
         Weather station wind speed measurement height (m)
+    lon : float
+        Weather station longitude (decimal degrees), for hourly ETref
+    lzn : float
+        Longitude of the center of the local time zone (decimal
+        degrees), for hourly ETref
     cnames : list
         Column names for wdata
     wdata : DataFrame
@@ -52,6 +66,22 @@ class Weather:
             Rain  - Daily precipitation (mm)
             ETref - Daily reference ET (mm)
             MorP  - Measured ('M') or Predicted ('P') data
+    hnames : list
+        Column names for hdata
+    hdata : DataFrame
+        Optional hourly weather data as float
+        index - Year, day of year, and hour as string ('yyyy-ddd-hh'),
+                for the hour starting at hh (00-23) standard clock time
+        columns - ['Srad','Tavg','Vapr','Tdew','RHum','Wndsp','Rain',
+                   'ETref']
+            Srad  - Incoming solar radiation (MJ/m2)
+            Tavg  - Hourly average air temperature (deg C)
+            Vapr  - Hourly average vapor pressure (kPa)
+            Tdew  - Hourly average dew point temperature (deg C)
+            RHum  - Hourly average relative humidity (%)
+            Wndsp - Hourly average wind speed (m/s)
+            Rain  - Hourly precipitation (mm)
+            ETref - Hourly reference ET (mm)
 
     Methods
     -------
@@ -62,9 +92,26 @@ class Weather:
     customload()
         Users can override for custom weather loading, for example from
         meteorological network webpages
+    savecache(source)
+        Save self.wdata to a binary cache next to its source file
+    loadcache(source)
+        Load self.wdata from the binary cache of a source file, if the
+        source is unchanged since the cache was saved
     compute_etref(index)
         Compute ASCE standardized reference ET for the weather data at
         index in self.wdata
+    fill_etref()
+        Return ETref of self.wdata with missing values computed for all
+        days at once
+    getwindow(start,end,pad=0)
+        Return date-aligned NumPy arrays of self.wdata between start
+        and end, with missing ETref computed
+    getfcrain(start,end,fpdays)
+        Return forward rolling sums of Rain between start and end for
+        each forecast window length in fpdays
+    gethourly(start,end)
+        Return hourly ETref and Rain of self.hdata between start and
+        end as day by hour NumPy arrays
     """
 
     def __init__(self,filepath=None,comment=''):
@@ -86,9 +133,16 @@ class Weather:
         self.z     = float('NaN')
         self.lat   = float('NaN')
         self.wndht = float('NaN')
+        self.lon   = float('NaN')
+        self.lzn   = float('NaN')
         self.cnames = ['Srad','Tmax','Tmin','Vapr','Tdew','RHmax',
                        'RHmin','Wndsp','Rain','ETref','MorP']
         self.wdata = pd.DataFrame(columns=self.cnames)
+        self.hnames = ['Srad','Tavg','Vapr','Tdew','RHum','Wndsp','Rain',
+                       'ETref']
+        self.hdata = pd.DataFrame(columns=self.hnames)
+        self._etref = None
+        self._etrefkey = None
 
         if filepath is not None:
             self.loadfile(filepath)
@@ -187,22 +241,163 @@ class Weather:
             self.lat = float(lines[endast+3][:12])
             self.wndht = float(lines[endast+4][:12])
             self.wdata = pd.DataFrame(columns=self.cnames)
-            for line in lines[endast+8:]:
-                line = line.strip().split()
-                year = line[0][:4]
-                doy = line[0][-3:]
-                key = '{:04d}-{:03d}'.format(int(year),int(doy))
-                data = list()
-                for i in list(range(1,11)):
-                    data.append(float(line[i]))
-                data.append(line[11].strip())
-                self.wdata.loc[key] = data
+            text = ''.join(lines[endast+8:])
+            if text.strip():
+                #Text columns keep 'NaN' as written
+                floats = self.cnames[:-1]
+                dtypes = {cname: float for cname in floats}
+                dtypes.update({'Year-DOY': str, 'MorP': str})
+                wdata = pd.read_csv(io.StringIO(text), sep=r'\s+',
+                                    header=None, dtype=dtypes,
+                                    names=['Year-DOY'] + self.cnames,
+                                    keep_default_na=False,
+                                    na_values={cname: ['NaN','nan']
+                                               for cname in floats})
+                keys = wdata['Year-DOY'].str
+                wdata.index = pd.Index(keys[:4] + '-' + keys[-3:])
+                self.wdata = wdata[self.cnames]
 
     def customload(self):
         """Override this function to customize loading weather data."""
 
         pass
 
+    def savecache(self, source):
+        """Save wdata to a binary cache next to its source file.
+
+        The numeric columns are saved as one float array with a
+        contiguous row per column (source + '.npy'), which loadcache()
+        memory-maps, the Year-DOY index and MorP as a second array
+        (source + '.keys.npy'), and the modification time, size, and
+        SHA-256 hash of the source as a JSON file (source + '.json').
+        The station metadata (rfcrp, z, lat, wndht) is not cached.
+        A message is printed if the cache cannot be written, e.g., if
+        source is not found or its directory is read-only.
+
+        Parameters
+        ----------
+        source : str
+            Filepath of the file that self.wdata was loaded from
+        """
+
+        #Files are written under temporary names and then renamed, so
+        #concurrent processes never read a partly written cache
+        tmp = '.{:d}.tmp'.format(os.getpid())
+        data = np.array([self.wdata[cname].to_numpy(dtype=float)
+                         for cname in self.cnames[:-1]])
+        keys = self.wdata.index.to_numpy(dtype=str)
+        morp = self.wdata['MorP'].fillna('NaN').to_numpy(dtype=str)
+        index = np.empty(len(keys), dtype=[('Year-DOY', keys.dtype),
+                                           ('MorP', morp.dtype)])
+        index['Year-DOY'] = keys
+        index['MorP'] = morp
+        try:
+            stat = os.stat(source)
+            for ext, array in [('.npy', data), ('.keys.npy', index)]:
+                with open(source + ext + tmp, 'wb') as f:
+                    np.save(f, array, allow_pickle=False)
+                os.replace(source + ext + tmp, source + ext)
+            self._savemeta(source, stat, self._sha256(source))
+        except OSError:
+            print('The weather cache for the filepath cannot be saved.')
+
+    def _savemeta(self, source, stat, sha256):
+        """Write the JSON file of the cache for source.
+
+        Parameters
+        ----------
+        source : str
+            Filepath of the file that the cache is saved for
+        stat : os.stat_result
+            Status of source
+        sha256 : str
+            SHA-256 hex digest of source
+
+        Raises
+        ------
+        OSError
+            If the JSON file cannot be written.
+        """
+
+        tmp = source + '.json' + '.{:d}.tmp'.format(os.getpid())
+        meta = {'mtime': stat.st_mtime_ns, 'size': stat.st_size,
+                'sha256': sha256, 'cnames': self.cnames}
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, source + '.json')
+
+    def loadcache(self, source):
+        """Load wdata from the binary cache of a source file.
+
+        The cache is used only if the source is unchanged since
+        savecache(). The modification time and size are checked first;
+        if only the modification time differs, the SHA-256 hash of the
+        source decides, and a matching hash is saved with the new
+        modification time. The numeric columns of self.wdata are
+        memory-mapped from the cache without copying; changes to them
+        are copied on write and never saved to the cache.
+
+        Parameters
+        ----------
+        source : str
+            Filepath of the file that the cache was saved for
+
+        Returns
+        -------
+        loaded : bool
+            True if self.wdata was loaded from the cache, False if the
+            cache is missing or out of date
+        """
+
+        try:
+            stat = os.stat(source)
+            f = open(source + '.json', 'r')
+        except FileNotFoundError:
+            return False
+        try:
+            meta = json.load(f)
+        except ValueError:
+            return False
+        finally:
+            f.close()
+        if meta.get('cnames') != self.cnames:
+            return False
+        if stat.st_size != meta['size']:
+            return False
+        if stat.st_mtime_ns != meta['mtime']:
+            sha256 = self._sha256(source)
+            if sha256 != meta['sha256']:
+                return False
+            #Unchanged source with a new modification time (e.g., a new
+            #checkout); skip the hash next time where possible
+            try:
+                self._savemeta(source, stat, sha256)
+            except OSError:
+                pass
+        try:
+            data = np.load(source + '.npy', mmap_mode='c')
+            index = np.load(source + '.keys.npy')
+        except (FileNotFoundError, ValueError):
+            return False
+        if data.shape != (len(self.cnames) - 1, len(index)):
+            return False
+        wdata = pd.DataFrame(data.T, columns=self.cnames[:-1],
+                             index=pd.Index(index['Year-DOY'].tolist()),
+                             copy=False)
+        wdata['MorP'] = index['MorP'].tolist()
+        self.wdata = wdata
+        return True
+
+    @staticmethod
+    def _sha256(filepath):
+        """Return the SHA-256 hex digest of a file."""
+
+        sha = hashlib.sha256()
+        with open(filepath, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha.update(block)
+        return sha.hexdigest()
+
     def compute_etref(self,index):
         """Compute ASCE standardized reference ET for data at index.
 
@@ -232,3 +427,208 @@ class Weather:
                                 self.wdata.loc[index,'Wndsp'],
                                 self.wndht)
         return ETref
+
+    def fill_etref(self):
+        """Return ETref of wdata with missing values computed.
+
+        Missing ETref is computed with refet.ascedaily_array for all
+        days of self.wdata in one pass. The result is kept on the
+        object and reused while wdata, z, lat, wndht, and rfcrp are
+        unchanged, so many simulations with the same weather compute it
+        once. The check covers changes made to self.wdata in place; it
+        hashes the numeric columns, which costs about as much as a
+        small window of computed ETref. self.wdata itself is not
+        modified.
+
+        Returns
+        -------
+        etref : Series
+            Daily reference ET (mm) indexed as self.wdata
+        """
+
+        cols = self.cnames[:-1]
+        key = (self.rfcrp, self.z, self.lat, self.wndht,
+               len(self.wdata),
+               hash(self.wdata[cols].to_numpy(dtype=float).tobytes()))
+        if (self._etref is not None and key == self._etrefkey and
+                self._etref.index is self.wdata.index):
+            return self._etref
+        self._etref = pd.Series(self._calcetref(self.wdata),
+                                index=self.wdata.index)
+        self._etrefkey = key
+        return self._etref
+
+    def _calcetref(self, wdata):
+        """Return ETref of wdata with missing values computed.
+
+        Parameters
+        ----------
+        wdata : DataFrame
+            Rows of self.wdata
+
+        Returns
+        -------
+        etref : ndarray
+            Daily reference ET (mm) of each row of wdata
+        """
+
+        etref = wdata['ETref'].to_numpy(dtype=float, copy=True)
+        calc = np.isnan(etref)
+        if calc.any():
+            wdata = wdata[calc]
+            doy = [float(index[-3:]) for index in wdata.index]
+            etref[calc] = refet.ascedaily_array(
+                self.rfcrp, self.z, self.lat, doy,
+                wdata['Srad'].to_numpy(dtype=float),
+                wdata['Tmax'].to_numpy(dtype=float),
+                wdata['Tmin'].to_numpy(dtype=float),
+                wdata['Vapr'].to_numpy(dtype=float),
+                wdata['Tdew'].to_numpy(dtype=float),
+                wdata['RHmax'].to_numpy(dtype=float),
+                wdata['RHmin'].to_numpy(dtype=float),
+                wdata['Wndsp'].to_numpy(dtype=float),
+                self.wndht)
+        return etref
+
+    def getwindow(self,start,end,pad=0):
+        """Return date-aligned NumPy arrays of wdata from start to end.
+
+        Element k of each array holds the data for start plus k days,
+        so a daily loop can index the weather by integer day offset
+        instead of looking up Year-DOY keys in self.wdata.
+
+        Parameters
+        ----------
+        start : datetime
+            First day of the window
+        end : datetime
+            Last day of the window
+        pad : int, optional
+            Number of days after end to append where available in
+            self.wdata, e.g., for forecasted precipitation (default = 0)
+
+        Returns
+        -------
+        wwin : dict
+            Float arrays for each numeric column in self.cnames, with
+            missing ETref of the window computed as in fill_etref()
+
+        Raises
+        ------
+        KeyError
+            If a day between start and end is missing from self.wdata.
+        """
+
+        index = self.wdata.index
+        ndays = max((end - start).days + 1, 0)
+        #Rows of the window in wdata: the rows between its first and
+        #last days if wdata holds unique days in order, else a lookup of
+        #each day
+        rows = np.arange(0)
+        if ndays > 0:
+            i0, i1 = index.get_indexer([start.strftime('%Y-%j'),
+                                        end.strftime('%Y-%j')])
+            rows = np.arange(i0, i1 + 1)
+            if (i0 < 0 or i1 - i0 != ndays - 1 or not index.is_unique or
+                    not index.is_monotonic_increasing):
+                keys = pd.date_range(start, end, freq='D').strftime('%Y-%j')
+                rows = index.get_indexer(keys)
+                if (rows < 0).any():
+                    raise KeyError(keys[int(np.argmax(rows < 0))])
+        if pad > 0:
+            tdelta = datetime.timedelta(days=1)
+            extra = [(end + k*tdelta).strftime('%Y-%j')
+                     for k in range(1, pad + 1)]
+            erows = index.get_indexer(extra)
+            if (erows < 0).any():
+                erows = erows[:int(np.argmax(erows < 0))]
+            rows = np.concatenate([rows, erows])
+        wdata = self.wdata.iloc[rows]
+        wwin = {cname: wdata[cname].to_numpy(dtype=float)
+                for cname in self.cnames if cname != 'MorP'}
+        wwin['ETref'] = self._calcetref(wdata)
+        return wwin
+
+    def getfcrain(self,start,end,fpdays):
+        """Return forward rolling sums of Rain from start to end.
+
+        Element k of the array for a window length fpday holds the
+        total Rain from start plus k days through the following
+        fpday-1 days, i.e., the forecasted precipitation considered
+        by autoirrigation on that day. Days beyond the end of the
+        weather record do not contribute to the sum.
+
+        Parameters
+        ----------
+        start : datetime
+            First day of the window
+        end : datetime
+            Last day of the window
+        fpdays : iterable of int
+            Forecast window lengths (days)
+
+        Returns
+        -------
+        fcrain : dict
+            Float arrays of forecasted precipitation (mm) keyed by
+            window length
+        """
+
+        ndays = (end - start).days + 1
+        fpdays = set(int(fpday) for fpday in fpdays)
+        pad = max(list(fpdays) + [1]) - 1
+        rain = self.getwindow(start, end, pad)['Rain']
+        rain = np.concatenate([rain, np.zeros(ndays + pad - rain.size)])
+        fcrain = {}
+        for fpday in fpdays:
+            fc = np.zeros(ndays)
+            for j in range(fpday):
+                fc += rain[j:j+ndays]
+            fcrain[fpday] = fc
+        return fcrain
+
+    def gethourly(self,start,end):
+        """Return hourly ETref and Rain of hdata from start to end.
+
+        Row k of each array holds the 24 hours of start plus k days.
+        Hours missing from self.hdata are NaN. Missing hourly ETref is
+        computed from the other hourly data with refet.ascehourly_array,
+        carrying the cloudiness (fcd) from one hour to the next.
+
+        Parameters
+        ----------
+        start : datetime
+            First day of the window
+        end : datetime
+            Last day of the window
+
+        Returns
+        -------
+        hwin : dict
+            Float arrays of shape (days, 24) for 'ETref' and 'Rain'
+        """
+
+        days = pd.date_range(start, end, freq='D').strftime('%Y-%j')
+        keys = ['{:s}-{:02d}'.format(day, hr) for day in days
+                for hr in range(24)]
+        hdata = self.hdata.reindex(keys)
+        etref = hdata['ETref'].to_numpy(dtype=float, copy=True)
+        rain = hdata['Rain'].to_numpy(dtype=float)
+        calc = np.isnan(etref) & hdata['Srad'].notna().to_numpy() & \
+               hdata['Tavg'].notna().to_numpy()
+        if calc.any():
+            doy = np.repeat([float(day[-3:]) for day in days], 24)
+            sct = np.tile(np.arange(24) + 0.5, len(days))#Midpoint
+            hdata = hdata[calc]
+            etref[calc] = refet.ascehourly_array(
+                self.rfcrp, self.z, self.lat, self.lon, self.lzn,
+                doy[calc], sct[calc],
+                hdata['Srad'].to_numpy(dtype=float),
+                hdata['Tavg'].to_numpy(dtype=float),
+                hdata['Vapr'].to_numpy(dtype=float),
+                hdata['Tdew'].to_numpy(dtype=float),
+                hdata['RHum'].to_numpy(dtype=float),
+                wndsp=hdata['Wndsp'].to_numpy(dtype=float),
+                wndht=self.wndht)[0]
+        return {'ETref': etref.reshape(-1, 24),
+                'Rain': rain.reshape(-1, 24)}
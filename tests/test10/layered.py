@@ -0,0 +1,83 @@
+"""
+########################################################################
+The layered.py module contains a function to check the mass balance of
+the layered soil water balance method (SoilProfile) with the corn data
+of test5 at the Limited Irrigation Research Farm (LIRF) in Greeley,
+Colorado. Run it from the repository root:
+
+    python -m tests.test10.layered
+
+The layered.py module contains the following:
+    run - function to setup and run the model with a layered soil
+          profile and check its mass balance
+
+07/01/2025 Script developed to check the layered soil mass balance
+########################################################################
+"""
+
+import os
+import numpy as np
+from src.irrigation import Irrigation
+from src.model import Model
+from src.parameters import Parameters
+from src.soil_profile import SoilProfile
+from src.weather import Weather
+
+def depletion(state):
+    """Return the soil water depletion (mm) of the full soil profile.
+
+    The depletion of the root zone (Dr) plus the depletion of the
+    soil layers below it, from the saved model state.
+    """
+
+    grid = np.arange(len(state['ldep']), dtype=float)
+    below = state['ldep'][-1] - np.interp(state['lZr'], grid, state['ldep'])
+    return state['Dr'] + below
+
+def run(tol=1e-6):
+    """Run the layered soil method and check its mass balance"""
+
+    #Input files from test5
+    test5_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, 'test5')
+    par = Parameters()
+    par.loadfile(os.path.join(test5_dir, 'E12FF2022.par'))
+    #Residual water content, not in the parameter file of test5
+    par.thetaR = 0.05
+    wth = Weather(os.path.join(test5_dir, 'LIRF.wth'))
+    irr = Irrigation(os.path.join(test5_dir, 'E12FF2022.irr'))
+    #Heavier irrigation so that water percolates below the root zone
+    irr.idata['Depth'] = irr.idata['Depth'] * 3.
+    sol = SoilProfile(os.path.join(test5_dir, 'E12FF2022.sol'))
+    #A deep, dry bottom layer that stores all water percolated from the
+    #root zone, so that no water drains from the profile
+    sol.sdata.loc[2000] = [0.144, 0.072, 0.072]
+
+    mdl = Model('2022-129', '2022-299', par, wth, irr=irr, sol=sol,
+                keepstates=True)
+    mdl.run()
+    o = mdl.odata
+    inputs = o['Rain'] - o['Runoff'] + o['Irrig'] - o['IrrLoss']
+
+    #Root zone: DP + change in storage = inputs - ET on each day
+    #without root growth, where the change in storage is -change in Dr
+    dS = -o['Dr'].diff()
+    same = (o['Zr'].diff() == 0.).to_numpy()
+    err = (o['DP'] + dS - (inputs - o['ETcadj'])).to_numpy()[same]
+    print('Root zone: {:d} days, max error {:.2e} mm, DP {:.1f} mm'
+          .format(int(same.sum()), np.abs(err).max(), o['DP'].sum()))
+    assert o['DP'].sum() > 0.
+    assert np.abs(err).max() < tol
+
+    #Full profile: water percolated from the root zone stays in the
+    #profile, so the change in storage = inputs - ET for the season
+    keys = list(mdl.snapshots)
+    dS = depletion(mdl.snapshots[keys[0]]) - \
+         depletion(mdl.snapshots[keys[-1]])
+    net = (inputs - o['ETcadj']).sum()
+    print('Soil profile: change in storage {:.3f} mm, inputs - ET {:.3f} mm'
+          .format(dS, net))
+    assert abs(dS - net) < tol
+
+if __name__ == '__main__':
+    run()
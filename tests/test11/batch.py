@@ -0,0 +1,136 @@
+"""
+########################################################################
+The batch.py module contains a function to check that a BatchModel run
+of many scenarios gives the same outputs and output files as a plain
+Model run of each scenario. Run it from the repository root:
+
+    python -m tests.test11.batch
+
+The batch.py module contains the following:
+    run - function to setup and run the BatchModel and the Model runs
+          and compare their outputs
+
+07/02/2025 Scripts developed for comparing BatchModel against Model runs
+########################################################################
+"""
+
+import copy
+import datetime
+import os
+import tempfile
+import time
+import numpy as np
+from src.batch import BatchModel
+from src.irrigation import Irrigation
+from src.model import Model
+from tests.test11 import rice2018
+
+def run():
+    """Compare a BatchModel of many scenarios with Model runs"""
+
+    par, wth = rice2018.setup()
+    data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            os.pardir, os.pardir, 'data')
+    irr = Irrigation(os.path.join(data_dir, 'CSSRI_DSR_2018.irr'))
+
+    #Each scenario is (start, end, Parameters, Model keyword arguments)
+    scen = []
+    #Saturation depletion thresholds for ponded DSR
+    for j in range(12):
+        airr = rice2018.autoirr(madDs=0.3 + 0.05 * j)
+        scen.append((rice2018.START, rice2018.END, par,
+                     dict(autoirr=airr, ponded=True, aq_Ks=True)))
+    #Later sowing dates, with seasons of different lengths
+    for days in [5, 12, 20]:
+        start = datetime.datetime.strptime(rice2018.START, '%Y-%j')
+        start = (start + datetime.timedelta(days=days)).strftime('%Y-%j')
+        scen.append((start, rice2018.END, par,
+                     dict(autoirr=rice2018.autoirr(madDs=0.5),
+                          ponded=True, aq_Ks=True)))
+    #Other Model options, root depth, and an irrigation schedule
+    scen.append((rice2018.START, rice2018.END, par,
+                 dict(autoirr=rice2018.autoirr(madDs=0.5), ponded=True,
+                      puddled=True, cons_p=True)))
+    scen.append((rice2018.START, rice2018.END, par,
+                 dict(autoirr=rice2018.autoirr(madDs=0.5), ponded=True,
+                      roff=True, aq_Ks=True)))
+    deep = copy.deepcopy(par)
+    deep.Zrmax = 0.9
+    scen.append((rice2018.START, rice2018.END, deep,
+                 dict(autoirr=rice2018.autoirr(madDs=0.5), ponded=True)))
+    scen.append((rice2018.START, rice2018.END, par,
+                 dict(irr=irr, ponded=True, aq_Ks=True)))
+    #Non-ponded soil with the default autoirrigation threshold
+    scen.append((rice2018.START, rice2018.END, par,
+                 dict(autoirr=rice2018.autoirr(mad=0.3))))
+
+    #Arguments given as one item per scenario
+    names = ['irr','autoirr','ponded','puddled','roff','cons_p','aq_Ks']
+    kwargs = {name: [s[3].get(name, None if name in ['irr','autoirr']
+                                    else False) for s in scen]
+              for name in names}
+
+    start = time.time()
+    bmdl = BatchModel([s[0] for s in scen], [s[1] for s in scen],
+                      [s[2] for s in scen], wth, **kwargs)
+    bmdl.run()
+    print('BatchModel of {:d} scenarios: {:f} s'.format(len(scen),
+                                                        time.time() - start))
+
+    start = time.time()
+    for k, s in enumerate(scen):
+        mdl = Model(s[0], s[1], s[2], wth, **s[3])
+        mdl.run()
+        if k == 0:
+            mdl0 = mdl
+        #The lock-step arrays compute in a different order than Model
+        assert rice2018.compare(bmdl.getodata(k), bmdl.swbdata.iloc[k],
+                                mdl, tol=1e-9), k
+    print('Model runs: {:f} s'.format(time.time() - start))
+
+    #Output files of a scenario written through getmodel()
+    files = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name, m in [('batch', bmdl.getmodel(0)), ('model', mdl0)]:
+            for ext, save in [('out', m.savefile), ('sum', m.savesums)]:
+                filepath = os.path.join(tmpdir, name + '.' + ext)
+                save(filepath)
+                with open(filepath, 'r') as f:
+                    #All but the timestamp
+                    files[name, ext] = [line for line in
+                                        f.read().splitlines() if not
+                                        line.startswith('Timestamp:')]
+    for ext in ['out', 'sum']:
+        print('{}: {}'.format(ext, files['batch', ext] ==
+                                   files['model', ext]))
+        assert files['batch', ext] == files['model', ext]
+
+    #Weather of a day appended in place after a first run, and a day
+    #without the data to compute reference ET
+    full = wth.wdata.copy()
+    last = full.index.get_loc(rice2018.END)
+    wth.wdata = full.iloc[:last].copy()
+    airr = rice2018.autoirr(madDs=0.5)
+    end = full.index[last-1]
+    BatchModel(rice2018.START, end, par, wth, autoirr=airr, ponded=True,
+               aq_Ks=True).run()
+    wth.wdata.loc[rice2018.END] = full.loc[rice2018.END]
+    bmdl = BatchModel(rice2018.START, rice2018.END, par, wth,
+                      autoirr=airr, ponded=True, aq_Ks=True)
+    bmdl.run()
+    mdl = Model(rice2018.START, rice2018.END, par, wth, autoirr=airr,
+                ponded=True, aq_Ks=True)
+    mdl.run()
+    assert rice2018.compare(bmdl.getodata(0), bmdl.swbdata.iloc[0], mdl,
+                            tol=1e-9)
+    wth.wdata.loc[rice2018.END, ['Srad','ETref']] = np.nan
+    try:
+        BatchModel(rice2018.START, rice2018.END, par, wth, autoirr=airr,
+                   ponded=True, aq_Ks=True).run()
+    except ValueError as e:
+        print(e)
+    else:
+        raise AssertionError('BatchModel without reference ET')
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,93 @@
+"""
+########################################################################
+The engines.py module contains a function to check that the daily
+timestep of BatchModel (BatchModel._advance) follows the daily timestep
+of Model (Model._advance, and the compiled kernel.day with jit=True)
+for every combination of the Model options. BatchModel evaluates the
+branches of Model._advance with boolean masks, so a change to one
+timestep must be made to the other. Run it from the repository root:
+
+    python -m tests.test11.engines
+
+The engines.py module contains the following:
+    run - function to setup and run every option combination through
+          the BatchModel and Model engines and compare their outputs
+
+07/05/2025 Scripts developed for comparing the daily timesteps
+########################################################################
+"""
+
+import copy
+import itertools
+import os
+import time
+import numpy as np
+import pandas as pd
+from src.batch import BatchModel
+from src.irrigation import Irrigation
+from src.model import Model
+from src.update import Update
+from tests.test11 import rice2018
+
+#Boolean Model options
+OPTIONS = ['ponded', 'puddled', 'roff', 'cons_p', 'aq_Ks']
+
+def run():
+    """Compare BatchModel and Model for every option combination"""
+
+    par, wth = rice2018.setup()
+    data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            os.pardir, os.pardir, 'data')
+    irr = Irrigation(os.path.join(data_dir, 'CSSRI_DSR_2018.irr'))
+
+    #Updates of Kcb, h, and fc on some days of the season
+    upd = Update()
+    upd.udata = pd.DataFrame({'Kcb': [0.3, np.nan, 1.0],
+                              'h': [0.2, np.nan, 0.8],
+                              'fc': [np.nan, 0.5, 0.9]},
+                             index=['2018-170', '2018-190', '2018-220'])
+    deep = copy.deepcopy(par)
+    deep.Zrmax = 0.9
+
+    #Every option combination with each water supply, update, and root
+    #depth; autoirrigation refills ponded soils to saturation and
+    #non-ponded soils to field capacity
+    scen = []
+    for values in itertools.product([False, True], repeat=len(OPTIONS)):
+        opts = dict(zip(OPTIONS, values))
+        if opts['ponded']:
+            auto = rice2018.autoirr(madDs=0.5)
+        else:
+            auto = rice2018.autoirr(mad=0.3)
+        scen.append((par, dict(opts, autoirr=auto)))
+        scen.append((par, dict(opts, irr=irr)))
+        scen.append((deep, dict(opts, upd=upd)))
+
+    for rfcrp in ['S', 'T']:
+        wth.rfcrp = rfcrp
+        kwargs = {name: [s[1].get(name) for s in scen]
+                  for name in ['irr', 'autoirr', 'upd']}
+        for name in OPTIONS:
+            kwargs[name] = [s[1][name] for s in scen]
+
+        start = time.time()
+        bmdl = BatchModel(rice2018.START, rice2018.END,
+                          [s[0] for s in scen], wth, **kwargs)
+        bmdl.run()
+        print('{}: BatchModel of {:d} scenarios: {:f} s'.format(
+            rfcrp, len(scen), time.time() - start))
+
+        start = time.time()
+        for k, s in enumerate(scen):
+            for jit in [False, True]:
+                mdl = Model(rice2018.START, rice2018.END, s[0], wth,
+                            jit=jit, **s[1])
+                mdl.run()
+                #The lock-step arrays compute in a different order
+                assert rice2018.compare(bmdl.getodata(k),
+                                        bmdl.swbdata.iloc[k], mdl,
+                                        tol=1e-9), (rfcrp, k, jit, s[1])
+        print('{}: Model runs: {:f} s'.format(rfcrp, time.time() - start))
+
+if __name__ == '__main__':
+    run()
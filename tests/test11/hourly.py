@@ -0,0 +1,92 @@
+"""
+########################################################################
+The hourly.py module contains a function to check the hourly ponded
+timestep (Model with hourly=True) against plain daily Model runs. Run
+it from the repository root:
+
+    python -m tests.test11.hourly
+
+The hourly.py module contains the following:
+    run - function to setup and run the hourly and daily timesteps and
+          compare their outputs
+
+07/02/2025 Scripts developed for comparing hourly against daily Model runs
+########################################################################
+"""
+
+import copy
+import numpy as np
+import pandas as pd
+from src.model import Model
+from tests.test11 import rice2018
+
+def run():
+    """Compare hourly and daily Model runs"""
+
+    par, wth = rice2018.setup()
+    airr = rice2018.autoirr(madDs=0.4)
+
+    #Hourly data from the daily data: ETref over the daylight hours and
+    #rain in the afternoon
+    shape = np.zeros(24)
+    shape[6:19] = np.sin(np.pi * (np.arange(6, 19) - 5.5) / 13.)
+    days = wth.wdata.loc[rice2018.START:rice2018.END]
+    keys = ['{}-{:02d}'.format(day, hr) for day in days.index
+            for hr in range(24)]
+    hdata = pd.DataFrame(np.nan, index=keys, columns=wth.hnames)
+    hdata['ETref'] = np.outer(days['ETref'], shape / shape.sum()).ravel()
+    hdata['Rain'] = np.outer(days['Rain'], np.eye(24)[15]).ravel()
+    wth.hdata = hdata
+
+    #Without percolation (Ksat = 0) the hourly substeps give the daily
+    #water balance
+    dry = copy.deepcopy(par)
+    dry.Ksat = 0.0
+    daily = Model(rice2018.START, rice2018.END, dry, wth, autoirr=airr,
+                  ponded=True)
+    daily.run()
+    hourly = Model(rice2018.START, rice2018.END, dry, wth, autoirr=airr,
+                   ponded=True, hourly=True)
+    hourly.run()
+    print('Hourly equals daily without percolation: {}'.format(
+        rice2018.compare(hourly.odata, hourly.swbdata, daily, tol=1e-9)))
+    assert rice2018.compare(hourly.odata, hourly.swbdata, daily, tol=1e-9)
+
+    #With percolation, the outputs that do not depend on the soil water
+    #balance equal those of the daily timestep, and the hourly water
+    #balance closes on each day
+    daily = Model(rice2018.START, rice2018.END, par, wth, ponded=True,
+                  autoirr=airr, aq_Ks=True)
+    daily.run()
+    hourly = Model(rice2018.START, rice2018.END, par, wth, ponded=True,
+                   autoirr=airr, aq_Ks=True, hourly=True, keepstates=True)
+    hourly.run()
+    cnames = ['Date','Year','DOY','DOW','Day','ETref','tKcb','Kcb','h',
+              'Zr','Rain']
+    assert hourly.odata[cnames].equals(daily.odata[cnames])
+    o = hourly.odata
+    dV = o['Veff'].diff().iloc[1:]
+    net = (o['Rain'] - o['Runoff'] + o['Irrig'] - o['IrrLoss'] -
+           o['ETcadj'] - o['DP']).iloc[1:]
+    err = float((dV - net).abs().max())
+    print('Hourly water balance: max error {:.2e} mm, DP {:.1f} mm '
+          '(daily {:.1f} mm)'.format(err, hourly.swbdata['DP'],
+                                     daily.swbdata['DP']))
+    assert err < 1e-9
+
+    #Compiled hourly substeps give the outputs of the Python substeps
+    compiled = Model(rice2018.START, rice2018.END, par, wth, ponded=True,
+                     autoirr=airr, aq_Ks=True, hourly=True, jit=True)
+    compiled.run()
+    assert rice2018.compare(compiled.odata, compiled.swbdata, hourly,
+                            tol=1e-9)
+
+    #A rerun of the hourly timestep gives the full run
+    full = copy.deepcopy(hourly)
+    hourly.rerun('2018-200')
+    print('Hourly rerun: {}'.format(rice2018.compare(
+        hourly.odata, hourly.swbdata, full)))
+    assert rice2018.compare(hourly.odata, hourly.swbdata, full)
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,84 @@
+"""
+########################################################################
+The phases.py module contains a function to check that the seasonal
+sums of a Model run with land preparation (landprep=True), split at the
+first day of the crop season (Model.swbphases), equal the sums of the
+two-step workflow: a Landprep run followed by a Model run of the crop
+season from the final puddling state. Run it from the repository root:
+
+    python -m tests.test11.phases
+
+The phases.py module contains the following:
+    run - function to setup and run the model both ways and compare the
+          land preparation and crop season sums
+
+07/04/2025 Scripts developed for comparing the sums of the two phases
+########################################################################
+"""
+
+import datetime
+import numpy as np
+from src.landprep import Landprep
+from src.model import Model
+from tests.test11 import rice2018
+
+def _prep(par):
+    """Set the land preparation parameters"""
+
+    par.Lprp = 6
+    par.Puddays = 4
+    par.Zp = 0.5
+    par.Wdpud = 50
+    return par
+
+def _equal(swb1, swb2, keys):
+    """Return True if swb1 and swb2 are close for the keys"""
+
+    return all(np.isclose(swb1[key], swb2[key], rtol=1e-9, atol=1e-9,
+                          equal_nan=True) for key in keys)
+
+def run():
+    """Compare the phase sums with the two-step workflow"""
+
+    #Land preparation and crop season in one run
+    par, wth = rice2018.setup()
+    _prep(par)
+    start = datetime.datetime.strptime(rice2018.START, '%Y-%j')
+    crop = (start + datetime.timedelta(days=par.Lprp)).strftime('%Y-%j')
+    prepend = (start + datetime.timedelta(days=par.Lprp - 1))
+    prepend = prepend.strftime('%Y-%j')
+    mdl = Model(rice2018.START, rice2018.END, par, wth,
+                autoirr=rice2018.autoirr(), ponded=True, puddled=True,
+                cons_p=True, landprep=True, snapdays=['2018-200'])
+    mdl.run()
+
+    #Two-step workflow
+    par, wth = rice2018.setup()
+    _prep(par)
+    ldp = Landprep(rice2018.START, prepend, par, wth)
+    ldp.run()
+    par.theta0 = ldp.state['theta0']
+    par.Wdpud = ldp.state['Vp']
+    par.Ksat = ldp.state['K']
+    crp = Model(crop, rice2018.END, par, wth, autoirr=rice2018.autoirr(),
+                ponded=True, puddled=True, cons_p=True)
+    crp.run()
+
+    keys = Model._sumkeys
+    print('landprep: {}'.format(_equal(mdl.swbphases['landprep'],
+                                       ldp.swbdata, Landprep._sumkeys)))
+    assert _equal(mdl.swbphases['landprep'], ldp.swbdata, Landprep._sumkeys)
+    print('crop: {}'.format(_equal(mdl.swbphases['crop'], crp.swbdata,
+                                   keys)))
+    assert _equal(mdl.swbphases['crop'], crp.swbdata, keys)
+
+    #A rerun within the crop season keeps the split
+    phases = mdl.swbphases
+    mdl.rerun('2018-201')
+    for phase in ['landprep', 'crop']:
+        print('rerun {}: {}'.format(phase, _equal(mdl.swbphases[phase],
+                                                  phases[phase], keys)))
+        assert _equal(mdl.swbphases[phase], phases[phase], keys)
+
+if __name__ == '__main__':
+    run()
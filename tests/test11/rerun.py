@@ -0,0 +1,95 @@
+"""
+########################################################################
+The rerun.py module contains a function to check that Model.rerun gives
+the same outputs as a plain Model run of the full season, for a daily
+refresh that appends the weather of each new day to Weather.wdata in
+place and for rain edited in place on a day in the season. Run it from
+the repository root:
+
+    python -m tests.test11.rerun
+
+The rerun.py module contains the following:
+    run - function to setup and rerun the model and compare its outputs
+          with plain Model runs
+
+07/02/2025 Scripts developed for comparing Model.rerun against Model runs
+########################################################################
+"""
+
+import copy
+import datetime
+from src.model import Model
+from tests.test11 import rice2018
+
+def run():
+    """Compare Model.rerun with plain Model runs"""
+
+    par, wth = rice2018.setup()
+    airr = rice2018.autoirr(madDs=0.4)
+    start = datetime.datetime.strptime(rice2018.START, '%Y-%j')
+    end = datetime.datetime.strptime(rice2018.END, '%Y-%j')
+
+    full = wth.wdata.copy()
+    for opts in [{}, {'ostep':3}, {'jit':True}]:
+        #Daily refresh: run to mid-season with the weather up to then,
+        #then append the weather of each new day in place and recompute
+        #from the day before, whose forecasted rain was not available
+        day = start + datetime.timedelta(days=40)
+        wth.wdata = full.loc[:day.strftime('%Y-%j')].copy()
+        mdl = Model(rice2018.START, day.strftime('%Y-%j'), par, wth,
+                    autoirr=airr, ponded=True, aq_Ks=True,
+                    keepstates=True, **opts)
+        mdl.run()
+        while day < end:
+            prev = day.strftime('%Y-%j')
+            day += datetime.timedelta(days=1)
+            key = day.strftime('%Y-%j')
+            wth.wdata.loc[key] = full.loc[key]
+            mdl.rerun(prev, key)
+        ref = Model(rice2018.START, rice2018.END, par, wth, autoirr=airr,
+                    ponded=True, aq_Ks=True, **opts)
+        ref.run()
+        print('Daily refresh {}: {}'.format(opts, rice2018.compare(
+            mdl.odata, mdl.swbdata, ref)))
+        assert rice2018.compare(mdl.odata, mdl.swbdata, ref)
+
+        #New weather data: heavy rain on a day in the season, edited in
+        #place, rerun from that day
+        rday = (start + datetime.timedelta(days=70)).strftime('%Y-%j')
+        wth.wdata.loc[rday, 'Rain'] = 80.0
+        mdl.rerun(rday)
+        ref2 = Model(rice2018.START, rice2018.END, par, wth, autoirr=airr,
+                     ponded=True, aq_Ks=True, **opts)
+        ref2.run()
+        print('New weather {}: {}'.format(opts, rice2018.compare(
+            mdl.odata, mdl.swbdata, ref2)))
+        assert rice2018.compare(mdl.odata, mdl.swbdata, ref2)
+        rain = ref.swbdata['Rain'] + 80.0 - full.loc[rday, 'Rain']
+        assert abs(ref2.swbdata['Rain'] - rain) < 1e-9
+    wth.wdata = full
+
+    #A state saved only for the day before the rerun (snapdays)
+    rday = start + datetime.timedelta(days=30)
+    pday = (rday - datetime.timedelta(days=1)).strftime('%Y-%j')
+    mdl = Model(rice2018.START, rice2018.END, par, wth, autoirr=airr,
+                ponded=True, aq_Ks=True, snapdays=[pday])
+    mdl.run()
+    ref = copy.deepcopy(mdl)
+    mdl.rerun(rday.strftime('%Y-%j'))
+    print('Rerun from snapdays: {}'.format(rice2018.compare(
+        mdl.odata, mdl.swbdata, ref)))
+    assert rice2018.compare(mdl.odata, mdl.swbdata, ref)
+
+    #No saved state for the day before the rerun
+    mdl = Model(rice2018.START, rice2018.END, par, wth, autoirr=airr,
+                ponded=True, aq_Ks=True)
+    mdl.run()
+    try:
+        mdl.rerun(rday.strftime('%Y-%j'))
+    except KeyError as e:
+        print(e)
+    else:
+        raise AssertionError('rerun without a saved state')
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,121 @@
+"""
+########################################################################
+The rice2018.py module contains functions to setup pyfao56 for ponded
+direct seeded rice (DSR) at the Central Soil Salinity Research
+Institute (CSSRI) in Karnal, India in 2018. The test scripts of test11
+compare the runs of Sweep, BatchModel, Model.rerun, and the hourly
+timestep against plain Model runs of this setup.
+
+The rice2018.py module contains the following:
+    setup - function to return the parameters and weather data
+    autoirr - function to return an AutoIrrigate object with one
+              autoirrigation set for the season
+    compare - function to compare the outputs of two Model runs
+
+07/02/2025 Scripts developed for comparing runs against plain Model runs
+########################################################################
+"""
+
+import os
+import numpy as np
+from src.autoirrigate import AutoIrrigate
+from src.parameters import Parameters
+from src.weather import Weather
+
+#Simulation start and end, and last day of autoirrigation
+START = '2018-152'
+END = '2018-272'
+CUTOFF = '2018-258'
+
+def setup():
+    """Return the parameters and weather data for 2018 DSR at CSSRI"""
+
+    #Get the repository data directory
+    data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            os.pardir, os.pardir, 'data')
+
+    #Specify the model parameters for a 120-day season
+    par = Parameters(comment = 'DSR Rice for CSSRI Karnal')
+    par.Kcbini = 0.15
+    par.Kcbmid = 1.15
+    par.Kcbend = 0.55
+    par.Lini = 30
+    par.Ldev = 45
+    par.Lmid = 25
+    par.Lend = 20
+    par.hini = 0.05
+    par.hmax = 1.1
+    par.thetaFC = 0.276032
+    par.thetaWP = 0.153879
+    par.theta0 = par.thetaWP
+    par.thetaR = 0.095234
+    par.thetaS = 0.362040
+    par.Ksat = 32.080715
+    par.Zrini = 0.2
+    par.Zrmax = 0.6
+    par.Bundh = 0.3
+    par.pbase = 0.2
+    par.Ze = 0.1
+    par.REW = 6
+    par.CN2 = 70
+
+    #Specify the weather data from the weather file
+    wth = Weather(os.path.join(data_dir, 'CSSRI_IMD_daily_2018.wth'))
+    return par, wth
+
+def autoirr(**kwargs):
+    """Return an AutoIrrigate object with one set for the season.
+
+    Parameters
+    ----------
+    **kwargs
+        Autoirrigation conditions, see AutoIrrigate.addset; by default
+        refill to saturation with the forecast and interval conditions
+        of the CSSRI DSR runs
+    """
+
+    conditions = dict(wdpth=0, fpday=1, fpdep=1, dsli=2, dsle=2,
+                      fpact='cancel', ieff=100)
+    conditions.update(kwargs)
+    airr = AutoIrrigate()
+    airr.addset(START, CUTOFF, **conditions)
+    return airr
+
+def compare(odata, swbdata, mdl, tol=None):
+    """Return True if odata and swbdata equal the outputs of mdl.
+
+    Parameters
+    ----------
+    odata : DataFrame
+        Daily outputs to check, as in Model.odata
+    swbdata : dict or Series
+        Seasonal water balance data to check, as in Model.swbdata
+    mdl : Model
+        Plain Model run, after run()
+    tol : float, optional
+        Absolute and relative tolerance for the numeric outputs, for
+        computations in a different order (default = None, equal)
+    """
+
+    if tol is None:
+        if not odata.equals(mdl.odata):
+            return False
+    else:
+        if (list(odata.columns) != list(mdl.odata.columns) or
+                not odata.iloc[:, :5].equals(mdl.odata.iloc[:, :5])):
+            return False
+        for cname in mdl.odata.columns[5:]:
+            if not np.allclose(odata[cname].to_numpy(dtype=float),
+                               mdl.odata[cname].to_numpy(dtype=float),
+                               rtol=tol, atol=tol, equal_nan=True):
+                return False
+    for name, value in mdl.swbdata.items():
+        other = swbdata[name]
+        if np.isnan(value) and np.isnan(other):
+            continue
+        if tol is None and value != other:
+            return False
+        if tol is not None and not np.isclose(value, other, rtol=tol,
+                                              atol=tol):
+            return False
+    return True
@@ -0,0 +1,52 @@
+"""
+########################################################################
+The sums.py module contains a function to check that Model.savesums
+writes the same seasonal sums when the daily outputs are not kept
+(summary=True or ocols=[]) as in the default mode. Run it from the
+repository root:
+
+    python -m tests.test11.sums
+
+The sums.py module contains the following:
+    run - function to setup and run the model in each output mode and
+          compare the sum files
+
+07/03/2025 Scripts developed for comparing sum files among output modes
+########################################################################
+"""
+
+import os
+import tempfile
+from src.model import Model
+from tests.test11 import rice2018
+
+def run():
+    """Compare the sum files of the output modes"""
+
+    par, wth = rice2018.setup()
+    airr = rice2018.autoirr(madDs=0.4)
+
+    sums = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for mode, opts in [('default', {}), ('summary', {'summary':True}),
+                           ('ocols', {'ocols':[]})]:
+            mdl = Model(rice2018.START, rice2018.END, par, wth,
+                        autoirr=airr, ponded=True, aq_Ks=True, **opts)
+            mdl.run()
+            filepath = os.path.join(tmpdir, mode + '.sum')
+            mdl.savesums(filepath)
+            with open(filepath, 'r') as f:
+                #All but the timestamp
+                sums[mode] = [line for line in f.read().splitlines()
+                              if not line.startswith('Timestamp:')]
+
+    keys = Model._sumkeys
+    print('\n'.join(sums['default'][-len(keys):]))
+    assert [line.split(' : ')[-1] for line in
+            sums['default'][-len(keys):]] == keys
+    for mode in ['summary', 'ocols']:
+        print('{}: {}'.format(mode, sums[mode] == sums['default']))
+        assert sums[mode] == sums['default']
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,68 @@
+"""
+########################################################################
+The sweep.py module contains a function to check that a Sweep over many
+autoirrigation scenarios gives the same outputs as a plain Model run of
+each scenario. Run it from the repository root:
+
+    python -m tests.test11.sweep
+
+The sweep.py module contains the following:
+    run - function to setup and run the Sweep and the Model runs and
+          compare their outputs
+
+07/02/2025 Scripts developed for comparing Sweep against Model runs
+########################################################################
+"""
+
+import time
+from src.model import Model
+from src.sweep import Sweep
+from tests.test11 import rice2018
+
+def run():
+    """Compare a Sweep of autoirrigation scenarios with Model runs"""
+
+    par, wth = rice2018.setup()
+
+    #40 scenarios of the saturation depletion threshold, most sharing
+    #their first days with the first scenario
+    airrs = [rice2018.autoirr(madDs=0.30 + 0.005 * j) for j in range(40)]
+    #Scenarios forking from the same day with the same decision, so
+    #that the later ones share the child branch of the first
+    airrs += [rice2018.autoirr(mad=mad) for mad in [0.05, 0.06, 0.061]]
+    #Other refill depths, event limits, forecast actions, and no
+    #autoirrigation
+    airrs += [rice2018.autoirr(madDs=0.3, wdpth=5),
+              rice2018.autoirr(madDs=0.3, evnt=1),
+              rice2018.autoirr(madDs=0.3, fpact='proceed'),
+              None]
+
+    start = time.time()
+    sweep = Sweep(rice2018.START, rice2018.END, par, wth, airrs,
+                  ponded=True, aq_Ks=True)
+    sweep.run()
+    print('Sweep of {:d} scenarios: {:f} s'.format(len(airrs),
+                                                    time.time() - start))
+    print(sweep.forks)
+
+    start = time.time()
+    for k, airr in enumerate(airrs):
+        mdl = Model(rice2018.START, rice2018.END, par, wth, autoirr=airr,
+                    ponded=True, aq_Ks=True)
+        mdl.run()
+        assert rice2018.compare(sweep.getodata(k),
+                                sweep.swbdata.iloc[k], mdl), k
+    print('Model runs: {:f} s'.format(time.time() - start))
+
+    #The forks and shared branches were exercised; the mad=0.06 and
+    #mad=0.061 scenarios follow the child branch of mad=0.05
+    forks = sweep.forks
+    assert forks['Fork'].notna().sum() > 1
+    assert isinstance(forks.loc[40, 'Fork'], str)
+    assert list(forks.loc[41:42, 'Parent']) == [40, 40]
+    shared = forks[(forks['Parent'] > 0) & (forks['Days'] == 0)]
+    print('Scenarios sharing a child branch: {}'.format(list(shared.index)))
+    assert len(shared) > 0
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,76 @@
+"""
+########################################################################
+The weather.py module contains a function to check that Model runs and
+Weather.fill_etref follow changes made to Weather.wdata in place, as in
+a daily refresh that appends the weather of a new day. Run it from the
+repository root:
+
+    python -m tests.test11.weather
+
+The weather.py module contains the following:
+    run - function to edit the weather data in place and compare the
+          Model runs with runs on a fresh copy of the weather data
+
+07/03/2025 Scripts developed for checking in-place weather data changes
+########################################################################
+"""
+
+import copy
+import numpy as np
+from src.model import Model
+from tests.test11 import rice2018
+
+def run():
+    """Compare runs after in-place changes of wdata with fresh runs"""
+
+    par, wth = rice2018.setup()
+    airr = rice2018.autoirr(madDs=0.4)
+    full = wth.wdata.copy()
+
+    #Weather up to the end of the season less one day; the runs and
+    #fill_etref() compute and keep ETref for it
+    last = full.index.get_loc(rice2018.END)
+    wth.wdata = full.iloc[:last].copy()
+    wth.fill_etref()
+    mdl = Model(rice2018.START, full.index[last-1], par, wth,
+                autoirr=airr, ponded=True, aq_Ks=True)
+    mdl.run()
+
+    #Append the last day in place
+    wth.wdata.loc[rice2018.END] = full.loc[rice2018.END]
+    mdl = Model(rice2018.START, rice2018.END, par, wth, autoirr=airr,
+                ponded=True, aq_Ks=True)
+    mdl.run()
+    fresh = copy.deepcopy(wth)
+    fresh.wdata = full.iloc[:last+1].copy()
+    ref = Model(rice2018.START, rice2018.END, par, fresh, autoirr=airr,
+                ponded=True, aq_Ks=True)
+    ref.run()
+    print('Appended day: {}'.format(rice2018.compare(
+        mdl.odata, mdl.swbdata, ref)))
+    assert rice2018.compare(mdl.odata, mdl.swbdata, ref)
+    assert wth.fill_etref().index.equals(full.index[:last+1])
+
+    #Edit ETref in place, and remove it for a day to be computed
+    wth.wdata.loc['2018-200', 'ETref'] = 99.0
+    wth.wdata.loc['2018-201', 'ETref'] = np.nan
+    mdl = Model(rice2018.START, rice2018.END, par, wth, autoirr=airr,
+                ponded=True, aq_Ks=True)
+    mdl.run()
+    fresh.wdata = wth.wdata.copy()
+    ref = Model(rice2018.START, rice2018.END, par, fresh, autoirr=airr,
+                ponded=True, aq_Ks=True)
+    ref.run()
+    print('Edited ETref: {}, ETref {:.2f} and {:.2f} mm'.format(
+        rice2018.compare(mdl.odata, mdl.swbdata, ref),
+        mdl.odata.loc['2018-200', 'ETref'],
+        mdl.odata.loc['2018-201', 'ETref']))
+    assert rice2018.compare(mdl.odata, mdl.swbdata, ref)
+    assert mdl.odata.loc['2018-200', 'ETref'] == 99.0
+    assert np.isfinite(mdl.odata.loc['2018-201', 'ETref'])
+    assert wth.fill_etref()['2018-200'] == 99.0
+    assert wth.fill_etref()['2018-201'] == mdl.odata.loc['2018-201',
+                                                         'ETref']
+
+if __name__ == '__main__':
+    run()
@@ -12,6 +12,7 @@ The refet_testC.py module contains the following:
     hourly reference ET from pyfao56 and that from Ref-ET software
 
 08/01/2022 Scripts developed for comparing ET from pyfao56 and Ref-ET
+06/28/2025 Computed hourly ETo and ETr with refet.ascehourly_array
 ########################################################################
 """
 
@@ -126,44 +127,38 @@ def run(start='2003-001',end='2020-366'):
     wndht = 3.00000     #Wind speed measurement height (m)
     fcdo  = 1.0         #Initial cloudiness for ETo
     fcdr  = 1.0         #Initial cloudiness for ETr
-    etos=[]
-    etrs=[]
-    for row in azmet:
-        eto, fcdo = refet.ascehourly('S',z,lat,lon,lzn,
-                                     row[1], #doy
-                                     row[2]-.5, #sct
-                                     row[3], #israd
-                                     row[4], #tavg
-                                     float('NaN'), #vapr
-                                     row[5], #tdew
-                                     row[6], #rhum
-                                     float('NaN'), #tmin
-                                     row[7], #wndsp
-                                     wndht, #wndht
-                                     1.0, #tl
-                                     'D', #csreq
-                                     fcdo) #fcdpt
-        etos.append(eto)
-        etr, fcdr = refet.ascehourly('T',z,lat,lon,lzn,
-                                     row[1], #doy
-                                     row[2]-.5, #sct
-                                     row[3], #israd
-                                     row[4], #tavg
-                                     float('NaN'), #vapr
-                                     row[5], #tdew
-                                     row[6], #rhum
-                                     float('NaN'), #tmin
-                                     row[7], #wndsp
-                                     wndht, #wndht
-                                     1.0, #tl
-                                     'D', #csreq
-                                     fcdr) #fcdpt
-        etrs.append(etr)
+    #All hours at once, carrying cloudiness from hour to hour
+    etos, fcdo = refet.ascehourly_array('S',z,lat,lon,lzn,
+                                        azmet[:,1], #doy
+                                        azmet[:,2]-.5, #sct
+                                        azmet[:,3], #israd
+                                        azmet[:,4], #tavg
+                                        float('NaN'), #vapr
+                                        azmet[:,5], #tdew
+                                        azmet[:,6], #rhum
+                                        float('NaN'), #tmin
+                                        azmet[:,7], #wndsp
+                                        wndht, #wndht
+                                        1.0, #tl
+                                        'D', #csreq
+                                        fcdo) #fcdpt
+    etrs, fcdr = refet.ascehourly_array('T',z,lat,lon,lzn,
+                                        azmet[:,1], #doy
+                                        azmet[:,2]-.5, #sct
+                                        azmet[:,3], #israd
+                                        azmet[:,4], #tavg
+                                        float('NaN'), #vapr
+                                        azmet[:,5], #tdew
+                                        azmet[:,6], #rhum
+                                        float('NaN'), #tmin
+                                        azmet[:,7], #wndsp
+                                        wndht, #wndht
+                                        1.0, #tl
+                                        'D', #csreq
+                                        fcdr) #fcdpt
     n = len(etos)
-    etos = np.array(etos)
     etos = np.reshape(etos,(n,1))
     n = len(etrs)
-    etrs = np.array(etrs)
     etrs = np.reshape(etrs,(n,1))
     azmet = np.concatenate((azmet,etos,etrs),axis=1)
     azmet = pd.DataFrame(azmet,columns=['Year','DOY','Hour','Srad',